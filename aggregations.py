@@ -0,0 +1,119 @@
+import sys
+from firebase_admin import firestore
+from google.api_core.exceptions import GoogleAPICallError
+
+# Statistici agregate cu cost O(1) citiri: agregări count/sum server-side,
+# cu fallback pe contoarele menținute în colecția `counters`.
+COUNTERS_COLLECTION = 'counters'
+BATCH_LIMIT = 500
+
+
+def commit_in_batches(db, operations, writes_per_operation=1):
+    """Aplică operațiile (funcții care primesc un WriteBatch) în loturi de cel mult BATCH_LIMIT scrieri.
+
+    O operație cu mai multe scrieri (`writes_per_operation`) nu e împărțită între loturi, deci e atomică.
+    """
+    batch, size = db.batch(), 0
+    for operation in operations:
+        if size + writes_per_operation > BATCH_LIMIT:
+            batch.commit()
+            batch, size = db.batch(), 0
+        operation(batch)
+        size += writes_per_operation
+    if size:
+        batch.commit()
+
+
+def replace_documents(db, collection_name, documents):
+    """Rescrie pe loc colecția cu `documents` ({id: câmpuri}), pentru recalculări complete.
+
+    Fiecare document e suprascris cu set(), apoi sunt șterse doar ID-urile care nu mai apar,
+    deci cititorii nu văd în timpul rulării o colecție goală sau parțială.
+    """
+    collection = db.collection(collection_name)
+    commit_in_batches(db, (lambda batch, doc_id=doc_id, fields=fields:
+                           batch.set(collection.document(doc_id), fields)
+                           for doc_id, fields in documents.items()))
+    stale_refs = [doc.reference for doc in collection.select([]).stream() if doc.id not in documents]
+    commit_in_batches(db, (lambda batch, ref=ref: batch.delete(ref) for ref in stale_refs))
+
+
+def read_counter(db, name, field):
+    """Citește un câmp din documentul de contoare"""
+    doc = db.collection(COUNTERS_COLLECTION).document(name).get()
+    if not doc.exists:
+        return 0
+    return (doc.to_dict() or {}).get(field, 0)
+
+
+def bump_counter(db, name, writer=None, **deltas):
+    """Incrementează atomic contoarele unei colecții (ex: total=1, active=-1)"""
+    deltas = {field: firestore.Increment(delta) for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    ref = db.collection(COUNTERS_COLLECTION).document(name)
+    if writer is not None:
+        writer.set(ref, deltas, merge=True)
+    else:
+        ref.set(deltas, merge=True)
+
+
+def count(db, query, counter=None):
+    """Număr documente pentru query, calculat server-side"""
+    try:
+        result = query.count(alias='total').get()
+        return result[0][0].value
+    except (AttributeError, GoogleAPICallError):
+        if counter is not None:
+            return read_counter(db, *counter)
+        return sum(1 for _ in query.stream())
+
+
+def sum_field(db, query, field, counter=None):
+    """Suma unui câmp numeric pentru query, calculată server-side"""
+    try:
+        result = query.sum(field, alias='total').get()
+        return result[0][0].value or 0
+    except (AttributeError, GoogleAPICallError):
+        if counter is not None:
+            return read_counter(db, *counter)
+        return sum(doc.to_dict().get(field, 0) for doc in query.stream())
+
+
+def rebuild_counters(db):
+    """Recalculează contoarele din colecții (rulare unică sau după import)"""
+    counters = {
+        'employees': {'total': 0, 'active': 0},
+        'sites': {'total': 0, 'active': 0},
+        'assignments': {'total': 0, 'active': 0},
+        'timesheets': {'total': 0, 'hours': 0}
+    }
+
+    for collection in ['employees', 'sites']:
+        for doc in db.collection(collection).stream():
+            counters[collection]['total'] += 1
+            if doc.to_dict().get('active', True):
+                counters[collection]['active'] += 1
+
+    for doc in db.collection('assignments').stream():
+        counters['assignments']['total'] += 1
+        if doc.to_dict().get('end_date') is None:
+            counters['assignments']['active'] += 1
+
+    for doc in db.collection('timesheets').stream():
+        counters['timesheets']['total'] += 1
+        counters['timesheets']['hours'] += doc.to_dict().get('hours', 0)
+
+    for name, values in counters.items():
+        db.collection(COUNTERS_COLLECTION).document(name).set(values)
+    return counters
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['rebuild-counters']:
+        print("Utilizare: python aggregations.py rebuild-counters")
+        sys.exit(1)
+
+    from backend import get_db
+    for name, values in rebuild_counters(get_db()).items():
+        print(f"{name}: {values}")
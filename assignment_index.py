@@ -0,0 +1,216 @@
+import argparse
+import csv
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+# Index de intervale pentru asignări, per angajat, pe toate șantierele.
+# Intervalele unui angajat sunt sortate după start, cu maximul prefix al capetelor:
+# "există o asignare care se suprapune cu [start, end]?" devine două căutări binare.
+# Intervalele sunt închise ([start, end], inclusiv); end None = asignare în curs.
+# Indexul e per proces și poate fi în urmă cu până la INDEX_TTL secunde față de asignările scrise
+# de alte procese: înainte de o scriere, check_employee() recitește din Firestore asignările
+# angajatului respectiv (o interogare după employee_id) și reîmprospătează intrările lui din index.
+INDEX_TTL = 300
+OPEN_END = datetime.max
+
+_state = {}
+_lock = threading.Lock()
+
+
+def _naive(value):
+    # Firestore returnează date cu fus orar (UTC); formularele folosesc date fără fus orar
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def sort_key(assignment):
+    """Cheie (start_date fără fus orar, id) pentru sortarea asignărilor (dict-uri cu `id`)"""
+    start = assignment.get('start_date')
+    return _naive(start) if isinstance(start, datetime) else datetime.min, assignment['id']
+
+
+def _interval(data):
+    start = data.get('start_date')
+    if not isinstance(start, datetime):
+        return None
+    end = data.get('end_date')
+    return _naive(start), _naive(end) if isinstance(end, datetime) else OPEN_END
+
+
+class _EmployeeIntervals:
+    def __init__(self, items):
+        # items: [(start, end, assignment_id, data)]
+        self.items = sorted(items, key=lambda item: (item[0], item[2]))
+        self.starts = [item[0] for item in self.items]
+        self.prefix_max = []
+        running = None
+        for item in self.items:
+            running = item[1] if running is None or item[1] > running else running
+            self.prefix_max.append(running)
+
+    def first_overlap(self, start, end, exclude_id=None):
+        """Prima asignare (după start) care se suprapune cu [start, end], în O(log n)"""
+        limit = bisect_right(self.starts, end)
+        position = bisect_left(self.prefix_max, start, 0, limit)
+        while position < limit:
+            item = self.items[position]
+            if item[1] >= start and item[2] != exclude_id:
+                return item
+            position += 1
+        return None
+
+
+class AssignmentIndex:
+    def __init__(self, assignments=()):
+        self._employee_of = {}
+        grouped = {}
+        for assignment_id, data in assignments:
+            interval = _interval(data)
+            if interval is not None:
+                employee_id = data.get('employee_id')
+                self._employee_of[assignment_id] = employee_id
+                grouped.setdefault(employee_id, []).append((interval[0], interval[1], assignment_id, data))
+        self._by_employee = {employee_id: _EmployeeIntervals(items) for employee_id, items in grouped.items()}
+        self.built_at = time.monotonic()
+        # Indexul e partajat între sesiuni (thread-uri): modificările sunt serializate, iar
+        # citirile văd mereu un _EmployeeIntervals complet (înlocuit, nu modificat pe loc)
+        self._lock = threading.Lock()
+
+    def _replace(self, employee_id, assignment_id, item=None):
+        current = self._by_employee.get(employee_id)
+        items = [existing for existing in (current.items if current else []) if existing[2] != assignment_id]
+        if item is not None:
+            items.append(item)
+        if items:
+            self._by_employee[employee_id] = _EmployeeIntervals(items)
+        else:
+            self._by_employee.pop(employee_id, None)
+
+    def _discard(self, assignment_id):
+        employee_id = self._employee_of.pop(assignment_id, None)
+        if employee_id is not None:
+            self._replace(employee_id, assignment_id)
+
+    def upsert(self, assignment_id, data):
+        """Adaugă sau actualizează o asignare (după scrierea în Firestore)"""
+        interval = _interval(data)
+        with self._lock:
+            self._discard(assignment_id)
+            if interval is not None:
+                employee_id = data.get('employee_id')
+                self._employee_of[assignment_id] = employee_id
+                self._replace(employee_id, assignment_id, (interval[0], interval[1], assignment_id, data))
+
+    def remove(self, assignment_id):
+        with self._lock:
+            self._discard(assignment_id)
+
+    def replace_employee(self, employee_id, assignments):
+        """Înlocuiește toate asignările angajatului cu `assignments` ((id, date), citite din Firestore)"""
+        with self._lock:
+            current = self._by_employee.get(employee_id)
+            for item in (current.items if current else []):
+                self._employee_of.pop(item[2], None)
+            self._by_employee.pop(employee_id, None)
+            items = []
+            for assignment_id, data in assignments:
+                interval = _interval(data)
+                if interval is not None:
+                    self._employee_of[assignment_id] = employee_id
+                    items.append((interval[0], interval[1], assignment_id, data))
+            if items:
+                self._by_employee[employee_id] = _EmployeeIntervals(items)
+
+    def overlap(self, employee_id, start, end=None, exclude_id=None):
+        """(id, date) pentru o asignare a angajatului, pe orice șantier, suprapusă cu [start, end]"""
+        intervals = self._by_employee.get(employee_id)
+        if intervals is None:
+            return None
+        item = intervals.first_overlap(_naive(start), _naive(end) if end else OPEN_END, exclude_id=exclude_id)
+        return (item[2], item[3]) if item else None
+
+
+def find_conflicts(assignments):
+    """Toate perechile de asignări suprapuse ale aceluiași angajat, printr-un singur sweep.
+
+    `assignments` sunt (id, date); returnează [(id_a, id_b, employee_id)]. Complexitate
+    O(n log n + număr de conflicte).
+    """
+    by_employee = {}
+    for assignment_id, data in assignments:
+        interval = _interval(data)
+        if interval is not None:
+            by_employee.setdefault(data.get('employee_id'), []).append((interval[0], interval[1], assignment_id))
+
+    conflicts = []
+    for employee_id, intervals in by_employee.items():
+        intervals.sort()
+        active = []  # heap (end, id) al intervalelor încă deschise la startul curent
+        for start, end, assignment_id in intervals:
+            while active and active[0][0] < start:
+                heapq.heappop(active)
+            conflicts.extend((other_id, assignment_id, employee_id) for _, other_id in active)
+            heapq.heappush(active, (end, assignment_id))
+    return conflicts
+
+
+def _load(db):
+    return [(doc.id, doc.to_dict()) for doc in db.collection('assignments')
+            .select(['employee_id', 'employee_name', 'site_id', 'site_name', 'start_date', 'end_date'])
+            .stream()]
+
+
+def get_index(db):
+    """Indexul procesului, reconstruit din Firestore după INDEX_TTL secunde"""
+    with _lock:
+        index = _state.get('index')
+        if index is None or time.monotonic() - index.built_at > INDEX_TTL:
+            index = AssignmentIndex(_load(db))
+            _state['index'] = index
+        return index
+
+
+def check_employee(db, employee_id, start, end=None, exclude_id=None):
+    """Ca AssignmentIndex.overlap, dar pe asignările curente ale angajatului citite din Firestore"""
+    assignments = [(doc.id, doc.to_dict()) for doc in db.collection('assignments')
+                   .where('employee_id', '==', employee_id)
+                   .select(['employee_id', 'employee_name', 'site_id', 'site_name', 'start_date', 'end_date'])
+                   .stream()]
+    index = get_index(db)
+    index.replace_employee(employee_id, assignments)
+    return index.overlap(employee_id, start, end, exclude_id=exclude_id)
+
+
+def invalidate():
+    with _lock:
+        _state.pop('index', None)
+
+
+def _read_csv(path):
+    """Asignări de importat: coloane employee_id, site_id, start_date, end_date (YYYY-MM-DD)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for number, row in enumerate(csv.DictReader(f), start=1):
+            yield f"csv:{number}", {
+                'employee_id': row['employee_id'],
+                'site_id': row.get('site_id'),
+                'start_date': datetime.strptime(row['start_date'], '%Y-%m-%d'),
+                'end_date': datetime.strptime(row['end_date'], '%Y-%m-%d') if row.get('end_date') else None
+            }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Validare suprapuneri asignări")
+    parser.add_argument('command', choices=['validate'])
+    parser.add_argument('--csv', help="Validează și un fișier de import, împreună cu asignările existente")
+    args = parser.parse_args()
+
+    from backend import get_db
+    assignments = _load(get_db())
+    if args.csv:
+        assignments += list(_read_csv(args.csv))
+    conflicts = find_conflicts(assignments)
+    for first, second, employee_id in conflicts:
+        print(f"{employee_id}: {first} <-> {second}")
+    print(f"{len(assignments)} asignări verificate, {len(conflicts)} conflicte")
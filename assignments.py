@@ -2,84 +2,46 @@ import streamlit as st
 from firebase_admin import firestore
 import pandas as pd
 from datetime import datetime, timedelta
+from backend import get_db
+from audit_log import log_audit
+from sections import section_nav, section_timing
+from reference_data import get_employees, get_sites
+import aggregations
+import assignment_index
+import pagination
+import staffing
+import reconciliation
+import replica
+import timesheet_query
 
 if 'user' not in st.session_state or st.session_state.user is None:
     st.warning("⚠️ Vă rugăm să vă autentificați")
     st.stop()
 
-db = firestore.client()
+db = get_db()
 
-def log_audit(actor, action, entity, entity_id, details):
-    db.collection('audit_log').add({
-        'timestamp': datetime.now(),
-        'actor': actor,
-        'action': action,
-        'entity': entity,
-        'entity_id': entity_id,
-        'details': details
-    })
-
-def check_overlap(employee_id, site_id, start_date, end_date, exclude_id=None):
-    """Verifică dacă există suprapuneri de asignări"""
-    assignments = db.collection('assignments')\
-        .where('employee_id', '==', employee_id)\
-        .where('site_id', '==', site_id)\
-        .stream()
-    
-    for assignment in assignments:
-        if exclude_id and assignment.id == exclude_id:
-            continue
-        
-        data = assignment.to_dict()
-        existing_start = data['start_date']
-        existing_end = data.get('end_date')
-        
-        # Convertire la datetime dacă e necesar
-        if not isinstance(existing_start, datetime):
-            continue
-        
-        # Dacă asignarea existentă nu are end_date, e activă
-        if existing_end is None:
-            if end_date is None or start_date <= datetime.now():
-                return True, assignment.id
-        else:
-            # Verificare suprapunere intervale
-            if not isinstance(existing_end, datetime):
-                continue
-            
-            # Suprapunere dacă:
-            # start_date este între existing_start și existing_end
-            # sau end_date este între existing_start și existing_end
-            # sau intervalul nou cuprinde intervalul existent
-            if (existing_start <= start_date <= existing_end or
-                (end_date and existing_start <= end_date <= existing_end) or
-                (start_date <= existing_start and (end_date is None or end_date >= existing_end))):
-                return True, assignment.id
-    
-    return False, None
+def check_overlap(employee_id, start_date, end_date, exclude_id=None):
+    """Verifică dacă angajatul are deja o asignare suprapusă, pe orice șantier (înainte de scriere)"""
+    # Indexul procesului poate să nu conțină încă asignările create din alte procese (INDEX_TTL)
+    overlap = assignment_index.check_employee(db, employee_id, start_date, end_date, exclude_id=exclude_id)
+    if overlap is None:
+        return False, None, None
+    return True, overlap[0], overlap[1]
 
 st.title("📋 Gestionare Asignări")
 st.markdown("Gestionează asignările angajaților la șantiere")
 
-tab1, tab2, tab3 = st.tabs(["📋 Lista Asignări", "➕ Asignare Nouă", "📊 Vizualizare"])
-
-# Helper functions
-def get_employees():
-    employees = list(db.collection('employees').where('active', '==', True).stream())
-    return {emp.id: emp.to_dict()['full_name'] for emp in employees}
+TABS = ["📋 Lista Asignări", "➕ Asignare Nouă", "📊 Vizualizare"]
+active_tab = section_nav('assignments_section', TABS)
 
-def get_sites():
-    sites = list(db.collection('sites').where('active', '==', True).stream())
-    return {site.id: site.to_dict()['name'] for site in sites}
-
-with tab1:
+if active_tab == TABS[0]:
     st.subheader("📋 Asignări Active și Istoric")
     
     # Filtre
     col1, col2, col3 = st.columns(3)
     
-    employees = get_employees()
-    sites = get_sites()
+    employees = get_employees(db)
+    sites = get_sites(db)
     
     with col1:
         filter_employee = st.selectbox("Angajat", ["Toți"] + list(employees.values()))
@@ -88,46 +50,73 @@ with tab1:
     with col3:
         filter_status = st.selectbox("Status", ["Toate", "Active", "Încheiate"])
     
-    # Obținere asignări
-    assignments = list(db.collection('assignments').stream())
+    employee_ids = timesheet_query.ids_for_names(employees, [filter_employee]) if filter_employee != "Toți" else None
+    site_ids = timesheet_query.ids_for_names(sites, [filter_site]) if filter_site != "Toate" else None
     
-    # Filtrare
-    filtered = []
-    for assignment in assignments:
-        data = assignment.to_dict()
-        data['id'] = assignment.id
-        
-        if filter_employee != "Toți" and data.get('employee_name') != filter_employee:
-            continue
-        if filter_site != "Toate" and data.get('site_name') != filter_site:
-            continue
+    page_size = pagination.page_size_select('assignments_list')
+    pager = pagination.pager('assignments_list', (filter_employee, filter_site, filter_status, page_size))
+    
+    # O pagină la un moment dat, descrescător după start_date: asignările active din replica în
+    # memorie, istoricul prin interogări paginate (cursor pe start_date + ID)
+    if employee_ids == [] or site_ids == []:
+        # Numele selectat nu mai are ID în replică: nicio asignare
+        page, next_cursor = [], None
+    elif filter_status == "Active":
+        active_assignments = [a for a in replica.records(db, 'assignments')
+                              if (employee_ids is None or a.get('employee_id') in employee_ids)
+                              and (site_ids is None or a.get('site_id') in site_ids)]
+        # Listenerul aduce date cu fus orar, scrierile locale (replica.upsert) fără: se compară fără fus
+        active_assignments.sort(key=assignment_index.sort_key, reverse=True)
+        page, next_cursor = pagination.slice_page(active_assignments, page_size, pager['cursors'][-1])
+    else:
+        query = db.collection('assignments')
+        for field, ids in [('employee_id', employee_ids), ('site_id', site_ids)]:
+            if ids is not None:
+                query = query.where(field, '==', ids[0]) if len(ids) == 1 else query.where(field, 'in', ids)
+        query = query.order_by('start_date', direction=firestore.Query.DESCENDING)
+        # Asignările încheiate sunt majoritatea istoricului: filtrul client-side umple pagina repede
+        predicate = (lambda snapshot: snapshot.get('end_date') is not None) if filter_status == "Încheiate" else None
+        snapshots, next_cursor = pagination.fetch_page(query, 'start_date', page_size,
+                                                       cursor=pager['cursors'][-1], predicate=predicate)
+        page = [dict(snapshot.to_dict(), id=snapshot.id) for snapshot in snapshots]
+    
+    if page:
+        st.success(f"✅ Pagina {len(pager['cursors'])}: {len(page)} asignări")
         
-        is_active = data.get('end_date') is None
-        if filter_status == "Active" and not is_active:
-            continue
-        if filter_status == "Încheiate" and is_active:
-            continue
+        def period(assignment):
+            start_date, end_date = assignment.get('start_date'), assignment.get('end_date')
+            start_str = start_date.strftime('%d.%m.%Y') if isinstance(start_date, datetime) else 'N/A'
+            end_str = end_date.strftime('%d.%m.%Y') if isinstance(end_date, datetime) else 'În curs'
+            return start_str, end_str
         
-        filtered.append(data)
-    
-    if filtered:
-        st.success(f"✅ Găsite {len(filtered)} asignări")
+        # Un singur tabel pentru pagina curentă
+        df = pd.DataFrame([{
+            'Angajat': assignment.get('employee_name', 'N/A'),
+            'Șantier': assignment.get('site_name', 'N/A'),
+            'De la': period(assignment)[0],
+            'Până la': period(assignment)[1],
+            'Status': "🟢 Activ" if assignment.get('end_date') is None else "⚫ Încheiat"
+        } for assignment in page])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        pagination.page_nav('assignments_list', pager, next_cursor)
         
-        # Sortare după start_date
-        filtered.sort(key=lambda x: x.get('start_date', datetime.min), reverse=True)
+        # Acțiunile sunt create doar pentru asignarea selectată
+        by_id = {assignment['id']: assignment for assignment in page}
+        selected_id = st.selectbox(
+            "Selectează asignarea", [None] + list(by_id),
+            format_func=lambda assignment_id: "—" if assignment_id is None else
+            f"{by_id[assignment_id].get('employee_name', 'N/A')} @ {by_id[assignment_id].get('site_name', 'N/A')} "
+            f"({' → '.join(period(by_id[assignment_id]))})",
+            key='assignments_list_selected'
+        )
         
-        # Afișare cards
-        for assignment in filtered:
+        assignment = by_id.get(selected_id)
+        if assignment is not None:
             is_active = assignment.get('end_date') is None
+            start_str, end_str = period(assignment)
             status_color = "#10b981" if is_active else "#6b7280"
             status_text = "🟢 Activ" if is_active else "⚫ Încheiat"
             
-            start_date = assignment.get('start_date')
-            end_date = assignment.get('end_date')
-            
-            start_str = start_date.strftime('%d.%m.%Y') if isinstance(start_date, datetime) else 'N/A'
-            end_str = end_date.strftime('%d.%m.%Y') if isinstance(end_date, datetime) else 'În curs'
-            
             with st.container():
                 col1, col2, col3 = st.columns([3, 1, 1])
                 
@@ -161,6 +150,11 @@ with tab1:
                             st.error("❌ Nu se poate șterge! Există pontaje asociate acestei asignări.")
                         else:
                             db.collection('assignments').document(assignment['id']).delete()
+                            assignment_index.get_index(db).remove(assignment['id'])
+                            replica.remove(db, 'assignments', assignment['id'])
+                            staffing.invalidate()
+                            reconciliation.invalidate()
+                            aggregations.bump_counter(db, 'assignments', total=-1, active=-1 if is_active else 0)
                             log_audit(
                                 st.session_state.user_email,
                                 'delete',
@@ -198,6 +192,13 @@ with tab1:
                             'updated_at': datetime.now(),
                             'updated_by': st.session_state.user_email
                         })
+                        if assignment_data.get('end_date') is None:
+                            aggregations.bump_counter(db, 'assignments', active=-1)
+                        assignment_index.get_index(db).upsert(st.session_state.end_assignment_id,
+                                                              dict(assignment_data, end_date=end_date_dt))
+                        replica.remove(db, 'assignments', st.session_state.end_assignment_id)
+                        staffing.invalidate()
+                        reconciliation.invalidate()
                         
                         log_audit(
                             st.session_state.user_email,
@@ -217,12 +218,14 @@ with tab1:
                     st.rerun()
     else:
         st.info("📭 Nu există asignări care să corespundă filtrelor")
+        if len(pager['cursors']) > 1:
+            pagination.page_nav('assignments_list', pager, None)
 
-with tab2:
+elif active_tab == TABS[1]:
     st.subheader("➕ Creare Asignare Nouă")
     
-    employees = get_employees()
-    sites = get_sites()
+    employees = get_employees(db)
+    sites = get_sites(db)
     
     if not employees:
         st.error("❌ Nu există angajați activi. Adăugați angajați mai întâi.")
@@ -265,20 +268,20 @@ with tab2:
                     st.error("❌ Data de sfârșit nu poate fi înainte de data de început!")
                 else:
                     # Verificare suprapuneri
-                    has_overlap, overlap_id = check_overlap(selected_employee, selected_site, 
-                                                           start_date_dt, end_date_dt)
+                    has_overlap, overlap_id, overlap_data = check_overlap(selected_employee,
+                                                                         start_date_dt, end_date_dt)
                     
                     if has_overlap:
                         st.error(f"""
                         ❌ **Conflict detectat!** 
                         
                         Există deja o asignare pentru **{employees[selected_employee]}** 
-                        la **{sites[selected_site]}** care se suprapune cu intervalul selectat.
+                        la **{overlap_data.get('site_name', 'N/A')}** care se suprapune cu intervalul selectat.
                         
                         **Soluții:**
                         - Încheiați asignarea existentă mai întâi
                         - Modificați datele acestei asignări
-                        - Alegeți un alt șantier
+                        - Alegeți alt interval
                         """)
                     else:
                         assignment_data = {
@@ -293,6 +296,11 @@ with tab2:
                         }
                         
                         doc_ref = db.collection('assignments').add(assignment_data)
+                        assignment_index.get_index(db).upsert(doc_ref[1].id, assignment_data)
+                        replica.upsert(db, 'assignments', doc_ref[1].id, assignment_data)
+                        staffing.invalidate()
+                        reconciliation.invalidate()
+                        aggregations.bump_counter(db, 'assignments', total=1, active=1 if end_date_dt is None else 0)
                         
                         log_audit(
                             st.session_state.user_email,
@@ -305,9 +313,47 @@ with tab2:
                         st.success(f"✅ Asignare creată: {employees[selected_employee]} → {sites[selected_site]}!")
                         st.balloons()
 
-with tab3:
+elif active_tab == TABS[2]:
     st.subheader("📊 Vizualizare Asignări")
     
+    # Necesar de personal: angajați asignați pe șantier și zi
+    st.markdown("### 📅 Personal pe Șantier și Zi")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        horizon_start = st.date_input("De la data", value=datetime.now(), key='staffing_start')
+    with col2:
+        horizon_days = st.selectbox("Orizont (zile)", [30, 90, 180, 365], index=1, key='staffing_days')
+    
+    headcount = staffing.get_headcount(db, horizon_start, horizon_days)
+    
+    if not headcount.empty:
+        import plotly.express as px
+        
+        fig_staffing = px.imshow(
+            headcount,
+            labels={'x': 'Data', 'y': 'Șantier', 'color': 'Angajați'},
+            color_continuous_scale='Purples',
+            aspect='auto',
+            title='Număr de angajați asignați pe zi'
+        )
+        fig_staffing.update_layout(height=max(300, 28 * len(headcount) + 120))
+        st.plotly_chart(fig_staffing, use_container_width=True)
+        
+        export = headcount.copy()
+        export.columns = [day.strftime('%Y-%m-%d') for day in export.columns]
+        st.download_button(
+            label="📥 Descarcă CSV",
+            data=export.to_csv().encode('utf-8'),
+            file_name=f"personal_santiere_{horizon_start.strftime('%Y%m%d')}_{horizon_days}z.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+    else:
+        st.info("📭 Nu există asignări în intervalul selectat")
+    
+    st.markdown("---")
+    
     # Vizualizare pe angajat
     st.markdown("### 👤 Asignări pe Angajat")
     
@@ -426,10 +472,13 @@ with tab3:
         
         st.plotly_chart(fig2, use_container_width=True)
 
+section_timing('assignments_section', active_tab)
+
 # Footer statistici
 st.markdown("---")
-total_assignments = len(list(db.collection('assignments').stream()))
-active_assignments = len(list(db.collection('assignments').where('end_date', '==', None).stream()))
+total_assignments = aggregations.count(db, db.collection('assignments'), counter=('assignments', 'total'))
+active_assignments = aggregations.count(db, db.collection('assignments').where('end_date', '==', None),
+                                        counter=('assignments', 'active'))
 
 col1, col2, col3 = st.columns(3)
 with col1:
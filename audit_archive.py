@@ -0,0 +1,245 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import audit_log
+import pagination
+
+# Arhivă locală pentru intrările de audit mai vechi de RETENTION_DAYS zile. Intrările sunt mutate
+# din colecția audit_log în fișiere JSONL comprimate (gzip), câte un shard per zi și rulare:
+#   <ARCHIVE_DIR>/<YYYY>/<MM>/<YYYY-MM-DD>-<id>.jsonl.gz
+# manifest.json indexează shard-urile (zi, număr intrări, entități și acțiuni prezente) și limita
+# `archived_before`. Un shard e scris și înregistrat în manifest înainte de ștergerea intrărilor
+# din Firestore; o arhivare întreruptă poate duplica intrări, eliminate la citire după ID.
+# Statisticile pre-agregate (audit_stats.py) rămân neschimbate: acoperă tot istoricul, iar
+# recalcularea lor citește și arhiva (iter_entries).
+ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               'audit_archive'))
+RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', 90))
+READ_PAGE = 2000
+DELETE_BATCH = 500
+MANIFEST = 'manifest.json'
+
+_state = {}
+_lock = threading.Lock()
+
+
+class ArchivedEntry:
+    """Intrare din arhivă cu aceeași interfață ca un DocumentSnapshot (id, to_dict, get)"""
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+    def get(self, field):
+        return self._data.get(field)
+
+
+def load_manifest(archive_dir=ARCHIVE_DIR):
+    """Manifestul arhivei (reîncărcat doar când fișierul se schimbă)"""
+    path = os.path.join(archive_dir, MANIFEST)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {'archived_before': None, 'shards': []}
+    with _lock:
+        cached = _state.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, encoding='utf-8') as f:
+                cached = _state[path] = (mtime, json.load(f))
+        return cached[1]
+
+
+def _save_manifest(manifest, archive_dir):
+    path = os.path.join(archive_dir, MANIFEST)
+    tmp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def archive_boundary(archive_dir=ARCHIVE_DIR):
+    """Data (datetime) înaintea căreia intrările se află în arhivă, sau None"""
+    archived_before = load_manifest(archive_dir).get('archived_before')
+    return datetime.fromisoformat(archived_before) if archived_before else None
+
+
+def _write_shard(archive_dir, day, snapshots):
+    relative = os.path.join(day.strftime('%Y'), day.strftime('%m'),
+                            f"{day.isoformat()}-{uuid.uuid4().hex[:8]}.jsonl.gz")
+    path = os.path.join(archive_dir, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(f'{path}.tmp', 'wt', encoding='utf-8') as f:
+        for snapshot in snapshots:
+            f.write(audit_log.dumps(dict(snapshot.to_dict(), id=snapshot.id)) + '\n')
+    os.replace(f'{path}.tmp', path)
+    entries = [snapshot.to_dict() for snapshot in snapshots]
+    return {
+        'day': day.isoformat(),
+        'file': relative,
+        'count': len(snapshots),
+        'entities': sorted({e.get('entity') or 'Unknown' for e in entries}),
+        'actions': sorted({e.get('action') or 'unknown' for e in entries})
+    }
+
+
+def _delete(db, snapshots):
+    for start in range(0, len(snapshots), DELETE_BATCH):
+        batch = db.batch()
+        for snapshot in snapshots[start:start + DELETE_BATCH]:
+            batch.delete(snapshot.reference)
+        batch.commit()
+
+
+def _advance(manifest, boundary):
+    previous = manifest.get('archived_before')
+    if previous is None or datetime.fromisoformat(previous) < boundary:
+        manifest['archived_before'] = boundary.isoformat()
+
+
+def archive(db, retention_days=RETENTION_DAYS, archive_dir=ARCHIVE_DIR, today=None):
+    """Mută intrările mai vechi de `retention_days` zile în arhivă; returnează numărul lor"""
+    cutoff = datetime.combine((today or datetime.now()).date() - timedelta(days=retention_days),
+                              datetime.min.time())
+    os.makedirs(archive_dir, exist_ok=True)
+    manifest = load_manifest(archive_dir)
+    manifest = {'archived_before': manifest.get('archived_before'), 'shards': list(manifest['shards'])}
+
+    def flush(groups):
+        # Shard-urile zilelor complete din pagina curentă, un singur manifest, apoi ștergerea.
+        # Limita avansează odată cu zilele scrise, înainte ca intrările lor să dispară din
+        # audit_log: o rulare întreruptă nu lasă zile șterse invizibile pentru istoric
+        for day, snapshots in groups:
+            manifest['shards'].append(_write_shard(archive_dir, day, snapshots))
+        _advance(manifest, datetime.combine(groups[-1][0] + timedelta(days=1), datetime.min.time()))
+        _save_manifest(manifest, archive_dir)
+        _delete(db, [snapshot for _, snapshots in groups for snapshot in snapshots])
+        return sum(len(snapshots) for _, snapshots in groups)
+
+    query = db.collection('audit_log').where('timestamp', '<', cutoff).order_by('timestamp').order_by('__name__')
+    day, pending, archived, cursor = None, [], 0, None
+    while True:
+        page = query.start_after(cursor) if cursor else query
+        snapshots = list(page.limit(READ_PAGE).stream())
+        completed = []
+        for snapshot in snapshots:
+            snapshot_day = snapshot.get('timestamp').date()
+            if pending and snapshot_day != day:
+                completed.append((day, pending))
+                pending = []
+            day = snapshot_day
+            pending.append(snapshot)
+        if len(snapshots) < READ_PAGE:
+            break
+        if completed:
+            archived += flush(completed)
+        cursor = [snapshots[-1].get('timestamp'), snapshots[-1].id]
+    if completed or pending:
+        archived += flush(completed + ([(day, pending)] if pending else []))
+
+    _advance(manifest, cutoff)
+    _save_manifest(manifest, archive_dir)
+    return archived
+
+
+@lru_cache(maxsize=64)
+def _read_shard(path):
+    # Shard-urile nu se mai modifică după scriere, deci pot fi păstrate în memorie
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return tuple(audit_log.loads(line) for line in f if line.strip())
+
+
+def _utc(value):
+    # Ca în interogările Firestore, datele fără fus orar sunt considerate UTC
+    if not isinstance(value, datetime):
+        return datetime.combine(value, datetime.min.time())
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def iter_entries(archive_dir=ARCHIVE_DIR):
+    """Toate intrările arhivate (dict-uri cu `id`), citite shard cu shard, fără cache"""
+    for shard in load_manifest(archive_dir)['shards']:
+        with gzip.open(os.path.join(archive_dir, shard['file']), 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield audit_log.loads(line)
+
+
+def fetch_page(page_size, cursor=None, date_from=None, entity=None, action=None, predicate=None,
+               archive_dir=ARCHIVE_DIR):
+    """Intrări din arhivă descrescător după (timestamp, id), după `cursor`; ca pagination.fetch_page"""
+    first_day = date_from.date() if isinstance(date_from, datetime) else date_from
+    since = _utc(date_from) if date_from is not None else None
+    last_day = cursor[0].date() if cursor is not None else None
+    days = {}
+    for shard in load_manifest(archive_dir)['shards']:
+        if first_day is not None and shard['day'] < first_day.isoformat():
+            continue
+        if last_day is not None and shard['day'] > last_day.isoformat():
+            continue
+        if (entity and entity not in shard['entities']) or (action and action not in shard['actions']):
+            continue
+        days.setdefault(shard['day'], []).append(shard['file'])
+
+    items = []
+    for day in sorted(days, reverse=True):
+        entries = {}
+        for relative in days[day]:
+            for entry in _read_shard(os.path.join(archive_dir, relative)):
+                entries[entry['id']] = entry
+        matched = []
+        for doc_id, entry in entries.items():
+            if (entity and entry.get('entity') != entity) or (action and entry.get('action') != action):
+                continue
+            # Shard-ul primei zile conține și intrările de dinaintea orei din `date_from`
+            if since is not None and _utc(entry['timestamp']) < since:
+                continue
+            key = (entry.get('timestamp'), doc_id)
+            if cursor is not None and key >= tuple(cursor):
+                continue
+            item = ArchivedEntry(doc_id, {k: v for k, v in entry.items() if k != 'id'})
+            if predicate is None or predicate(item):
+                matched.append((key, item))
+        matched.sort(key=lambda pair: pair[0], reverse=True)
+        items.extend(item for _, item in matched)
+        if len(items) > page_size:
+            break
+
+    page = items[:page_size]
+    if len(items) <= page_size:
+        return page, None
+    return page, ((page[-1].get('timestamp'), page[-1].id) if page else cursor)
+
+
+def history_page(query, page_size, cursor=None, predicate=None, date_from=None, entity=None, action=None,
+                 archive_dir=ARCHIVE_DIR):
+    """O pagină din audit_log, continuată transparent în arhivă când `date_from` ajunge înaintea ei"""
+    items, next_cursor = pagination.fetch_page(query, 'timestamp', page_size, cursor=cursor, predicate=predicate)
+    archived_before = archive_boundary(archive_dir)
+    if next_cursor is not None or archived_before is None or \
+            (date_from is not None and date_from >= archived_before):
+        return items, next_cursor
+    if items:
+        cursor = (items[-1].get('timestamp'), items[-1].id)
+    more, next_cursor = fetch_page(page_size - len(items), cursor=cursor, date_from=date_from,
+                                   entity=entity, action=action, predicate=predicate, archive_dir=archive_dir)
+    return items + more, next_cursor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Arhivare jurnal de audit")
+    parser.add_argument('command', choices=['archive'])
+    parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS,
+                        help="Intrările mai vechi de atâtea zile sunt mutate în arhivă")
+    args = parser.parse_args()
+
+    from backend import get_db
+    moved = archive(get_db(), retention_days=args.retention_days)
+    print(f"{moved} intrări arhivate în {ARCHIVE_DIR}")
@@ -0,0 +1,222 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from google.api_core.exceptions import AlreadyExists
+import audit_search
+import audit_stats
+import backend
+
+# Scrierea jurnalului de audit în afara căii cererii: log_audit() doar pune intrarea într-o
+# coadă mărginită, iar un fir de fundal o scrie în Firestore în WriteBatch-uri (la FLUSH_SIZE
+# intrări sau după FLUSH_INTERVAL secunde). Livrare cel puțin o dată: intrările care nu pot fi
+# scrise (Firestore indisponibil, coadă plină) sunt adăugate într-un fișier JSONL local și
+# reîncercate periodic. ID-ul documentului e generat la înregistrare și intrările sunt create
+# (batch.create), deci o reluare nu creează duplicate și nu incrementează de două ori statisticile:
+# intrările existente deja sunt omise din lot. La oprirea procesului coada e golită (atexit).
+# Fiecare lot actualizează și statisticile pre-agregate (audit_stats.py), atomic cu intrările,
+# iar fiecare intrare primește tokenurile indexului de căutare (audit_search.py).
+AUDIT_COLLECTION = 'audit_log'
+QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10_000))
+FLUSH_SIZE = 200
+FLUSH_INTERVAL = 2.0
+RETRY_INTERVAL = 30.0
+SHUTDOWN_TIMEOUT = 10.0
+SPILL_PATH = os.environ.get('AUDIT_SPILL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             '.audit_spill.jsonl'))
+
+_STOP = object()
+logger = logging.getLogger(__name__)
+_state = {}
+_lock = threading.Lock()
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _decode(value):
+    if set(value) == {'__datetime__'}:
+        return datetime.fromisoformat(value['__datetime__'])
+    return value
+
+
+def dumps(entry):
+    """O intrare de audit ca linie JSON (datele calendaristice sunt păstrate explicit)"""
+    return json.dumps(entry, default=_encode, ensure_ascii=False)
+
+
+def loads(line):
+    return json.loads(line, object_hook=_decode)
+
+
+class _Writer:
+    def __init__(self, db, spill_path=SPILL_PATH):
+        self.db = db
+        self.spill_path = spill_path
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._spill_lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(spill_path) or '.', exist_ok=True)
+        except OSError:
+            logger.exception("Jurnal audit: directorul fișierului local %s nu poate fi creat", spill_path)
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self._spill([entry])
+
+    def _create(self, chunk):
+        collection = self.db.collection(AUDIT_COLLECTION)
+        batch = self.db.batch()
+        for entry in chunk:
+            data = {key: value for key, value in entry.items() if key != 'id'}
+            data[audit_search.SEARCH_FIELD] = audit_search.tokens(data)
+            batch.create(collection.document(entry['id']), data)
+        audit_stats.apply_deltas(batch, self.db, audit_stats.stats_deltas(chunk))
+        batch.commit()
+
+    def _commit(self, chunk):
+        try:
+            self._create(chunk)
+        except AlreadyExists:
+            # Reluare: o parte din intrări (cu statisticile lor) au fost deja scrise; se scrie doar restul
+            collection = self.db.collection(AUDIT_COLLECTION)
+            existing = {snap.id for snap in self.db.get_all([collection.document(e['id']) for e in chunk])
+                        if snap.exists}
+            remaining = [entry for entry in chunk if entry['id'] not in existing]
+            if remaining:
+                self._create(remaining)
+
+    def _write(self, entries):
+        for start in range(0, len(entries), FLUSH_SIZE):
+            try:
+                self._commit(entries[start:start + FLUSH_SIZE])
+            except Exception:
+                # Orice eroare de scriere (rețea, cote, permisiuni): se păstrează local doar loturile
+                # nescrise, ca o reluare să nu le repete pe cele deja comise
+                self._spill(entries[start:])
+                return
+
+    def _spill(self, entries):
+        with self._spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(dumps(entry) + '\n')
+
+    def replay_spill(self):
+        """Rescrie intrările din fișierul local; cele care eșuează din nou rămân în fișier"""
+        with self._spill_lock:
+            # Fișierele .replay rămase de la un proces oprit în timpul reluării sunt preluate și ele
+            directory, name = os.path.split(self.spill_path)
+            files = [os.path.join(directory, f) for f in os.listdir(directory or '.')
+                     if f.startswith(f'{name}.') and f.endswith('.replay')]
+            if os.path.exists(self.spill_path):
+                replaying = f'{self.spill_path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.replay'
+                os.replace(self.spill_path, replaying)
+                files.append(replaying)
+        replayed = 0
+        for path in files:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entries = [loads(line) for line in f if line.strip()]
+                os.remove(path)
+            except FileNotFoundError:
+                continue  # preluat între timp de alt proces
+            self._write(entries)
+            replayed += len(entries)
+        return replayed
+
+    def _safely(self, step, *args):
+        # O eroare neprevăzută (disc plin, cale invalidă) e raportată, iar firul continuă
+        try:
+            step(*args)
+        except Exception:
+            logger.exception("Jurnal audit: %s a eșuat", step.__name__)
+
+    def _run(self):
+        last_retry = time.monotonic()
+        self._safely(self.replay_spill)
+        while True:
+            pending, stop = [], False
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(pending) < FLUSH_SIZE:
+                try:
+                    entry = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                pending.append(entry)
+            if pending:
+                self._safely(self._write, pending)
+            if stop:
+                return
+            if time.monotonic() - last_retry > RETRY_INTERVAL:
+                last_retry = time.monotonic()
+                self._safely(self.replay_spill)
+
+    def close(self, timeout=SHUTDOWN_TIMEOUT):
+        """Scrie ce a rămas în coadă și oprește firul; restul ajunge în fișierul local"""
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        leftover = []
+        while True:
+            try:
+                entry = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                leftover.append(entry)
+        if leftover:
+            self._spill(leftover)
+
+
+def _writer(db):
+    with _lock:
+        writer = _state.get(id(db))
+        if writer is None:
+            writer = _state[id(db)] = _Writer(db)
+        return writer
+
+
+def log_audit(actor, action, entity, entity_id, details, db=None):
+    """Înregistrare în log audit (fără blocare: intrarea e scrisă în fundal)"""
+    db = db if db is not None else backend.get_db()
+    _writer(db).enqueue({
+        'id': uuid.uuid4().hex,
+        'timestamp': datetime.now(),
+        'actor': actor,
+        'action': action,
+        'entity': entity,
+        'entity_id': entity_id,
+        'details': details
+    })
+
+
+def shutdown(timeout=SHUTDOWN_TIMEOUT):
+    """Golește cozile tuturor scriitorilor (apelat automat la ieșirea procesului)"""
+    with _lock:
+        writers = list(_state.values())
+        _state.clear()
+    for writer in writers:
+        writer.close(timeout)
+
+
+atexit.register(shutdown)
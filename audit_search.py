@@ -0,0 +1,113 @@
+import argparse
+import string
+
+# Căutare după subșir/prefix în jurnalul de audit fără scanarea colecției. Fiecare intrare poartă
+# în câmpul `search_tokens` trigramele (n-grame de NGRAM caractere) ale valorilor căutabile,
+# normalizate (litere mici) și marcate cu ^ la început și $ la sfârșit, cu prefixul câmpului:
+#   actor 'ana@x.ro'  →  'a:^an', 'a:ana', 'a:na@', ..., 'a:ro$'
+# Un subșir de cel puțin NGRAM caractere conține cel puțin o trigramă a valorii, deci interogarea
+# `array_contains` pe trigrama cea mai selectivă a termenului întoarce un superset mic al
+# rezultatelor, ordonat după timestamp; potrivirea exactă e verificată client-side (predicat).
+# Termenii mai scurți (1–2 caractere) se potrivesc cu o mare parte din jurnal: pentru ei se
+# folosește doar predicatul, iar scanarea se oprește repede.
+# Tokenurile sunt scrise odată cu intrarea (audit_log.py, bulk_timesheets.py); intrările mai
+# vechi se completează cu `python audit_search.py backfill`.
+SEARCH_FIELD = 'search_tokens'
+FIELDS = {'actor': 'a', 'entity_id': 'i', 'entity': 'e'}
+NGRAM = 3
+MAX_VALUE_LENGTH = 64
+BACKFILL_PAGE = 2000
+BATCH_LIMIT = 500
+# Caractere prezente în aproape orice adresă/ID; trigramele formate doar din ele sunt puțin selective
+_COMMON = set('aeiourlnstc.@-_^$ ')
+
+
+def normalize(value):
+    return str(value or '').strip().lower()[:MAX_VALUE_LENGTH]
+
+
+def _grams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def tokens(entry):
+    """Tokenurile de căutare (listă sortată) pentru o intrare de audit (dict)"""
+    result = set()
+    for field, prefix in FIELDS.items():
+        text = normalize(entry.get(field))
+        if text:
+            result.update(f"{prefix}:{gram}" for gram in _grams(f"^{text}$"))
+    return sorted(result)
+
+
+def _selectivity(gram):
+    # Euristică: cifrele și literele rare restrâng cel mai mult rezultatele
+    return (sum(c in string.digits for c in gram), sum(c not in _COMMON for c in gram))
+
+
+def search_token(field, term, prefix=False):
+    """Tokenul folosit în interogare pentru `term`, sau None dacă termenul e prea scurt"""
+    text = normalize(term)
+    grams = sorted(_grams(f"^{text}" if prefix else text))
+    if not grams:
+        return None
+    return f"{FIELDS[field]}:{max(grams, key=_selectivity)}"
+
+
+def matches(entry, field, term, prefix=False):
+    value, text = normalize(entry.get(field)), normalize(term)
+    return value.startswith(text) if prefix else text in value
+
+
+def apply(query, terms, prefix=False):
+    """Restrânge `query` după termenii {câmp: text} și întoarce (interogare, predicat).
+
+    Firestore acceptă un singur `array_contains` per interogare: se folosește tokenul celui mai
+    lung termen, iar predicatul verifică toți termenii (inclusiv potrivirile false ale trigramei).
+    """
+    terms = {field: term for field, term in terms.items() if normalize(term)}
+    if not terms:
+        return query, None
+    field = max(terms, key=lambda f: len(normalize(terms[f])))
+    token = search_token(field, terms[field], prefix=prefix)
+    if token is not None:
+        query = query.where(SEARCH_FIELD, 'array_contains', token)
+
+    def predicate(snapshot):
+        data = snapshot.to_dict()
+        return all(matches(data, f, term, prefix=prefix) for f, term in terms.items())
+    return query, predicate
+
+
+def backfill(db):
+    """Completează `search_tokens` pentru intrările existente; returnează numărul celor actualizate"""
+    query = db.collection('audit_log').select(list(FIELDS) + [SEARCH_FIELD]).order_by('__name__')
+    updated, last = 0, None
+    while True:
+        page = query.start_after(last) if last is not None else query
+        snapshots = list(page.limit(BACKFILL_PAGE).stream())
+        stale = []
+        for snapshot in snapshots:
+            data = snapshot.to_dict()
+            entry_tokens = tokens(data)
+            if data.get(SEARCH_FIELD) != entry_tokens:
+                stale.append((snapshot.reference, entry_tokens))
+        for start in range(0, len(stale), BATCH_LIMIT):
+            batch = db.batch()
+            for reference, entry_tokens in stale[start:start + BATCH_LIMIT]:
+                batch.update(reference, {SEARCH_FIELD: entry_tokens})
+            batch.commit()
+        updated += len(stale)
+        if len(snapshots) < BACKFILL_PAGE:
+            return updated
+        last = snapshots[-1]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Index de căutare pentru jurnalul de audit")
+    parser.add_argument('command', choices=['backfill'])
+    args = parser.parse_args()
+
+    from backend import get_db
+    count = backfill(get_db())
+    print(f"Tokenuri de căutare completate pentru {count} intrări de audit")
@@ -0,0 +1,144 @@
+import argparse
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from firebase_admin import firestore
+import aggregations
+
+# Statistici pre-agregate ale jurnalului de audit, actualizate în același WriteBatch cu intrările.
+# Contoarele sunt împărțite pe NUM_SHARDS documente (shard ales aleator la fiecare lot), ca
+# scrierile concurente să nu concureze pe un singur document:
+#   totals_<shard>          total, actor.<email>, action.<acțiune>, entity.<entitate>
+#   days_<YYYY-MM>_<shard>  day.<DD> (număr de intrări pe zi, o lună per document)
+# Citirea adună shard-urile: câteva documente, indiferent de mărimea jurnalului.
+STATS_COLLECTION = 'audit_stats'
+NUM_SHARDS = 8
+DIMENSIONS = ['actor', 'action', 'entity']
+
+
+def _month_id(month):
+    return f"days_{month}"
+
+
+def stats_deltas(entries, deltas=None):
+    """Contribuția unor intrări de audit (dict-uri) la documentele de statistici, fără shard"""
+    if deltas is None:
+        deltas = {}
+    for entry in entries:
+        totals = deltas.setdefault('totals', {'total': 0, **{d: defaultdict(int) for d in DIMENSIONS}})
+        totals['total'] += 1
+        for dimension in DIMENSIONS:
+            totals[dimension][entry.get(dimension) or 'Unknown'] += 1
+        timestamp = entry.get('timestamp')
+        if isinstance(timestamp, datetime):
+            month = deltas.setdefault(_month_id(timestamp.strftime('%Y-%m')), {'day': defaultdict(int)})
+            month['day'][timestamp.strftime('%d')] += 1
+    return deltas
+
+
+def _stats_fields(delta, increment):
+    value = firestore.Increment if increment else (lambda v: v)
+    fields = {}
+    for key, item in delta.items():
+        if isinstance(item, dict):
+            fields[key] = {name: value(count) for name, count in item.items()}
+        else:
+            fields[key] = value(item)
+    return fields
+
+
+def apply_deltas(writer, db, deltas, shard=None):
+    """Adaugă incrementele într-un WriteBatch/tranzacție, pe un shard aleator"""
+    shard = random.randrange(NUM_SHARDS) if shard is None else shard
+    collection = db.collection(STATS_COLLECTION)
+    for doc_id, delta in deltas.items():
+        writer.set(collection.document(f"{doc_id}_{shard}"), _stats_fields(delta, increment=True), merge=True)
+
+
+def stats_documents(deltas):
+    """Documentele cu valori absolute (shard 0), pentru rescriere completă"""
+    return {f"{doc_id}_0": _stats_fields(delta, increment=False) for doc_id, delta in deltas.items()}
+
+
+def _months(first_day, last_day):
+    month = first_day.replace(day=1)
+    while month <= last_day:
+        yield month.strftime('%Y-%m')
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def read(db, today=None, days=30):
+    """Totaluri pe actor/acțiune/entitate și număr de intrări pe zi pentru ultimele `days` zile"""
+    today = (today or datetime.now()).date()
+    first_day = today - timedelta(days=days)
+    collection = db.collection(STATS_COLLECTION)
+    doc_ids = [f"totals_{shard}" for shard in range(NUM_SHARDS)] + \
+        [f"{_month_id(month)}_{shard}" for month in _months(first_day, today) for shard in range(NUM_SHARDS)]
+
+    stats = {'total': 0, **{d: defaultdict(int) for d in DIMENSIONS}, 'days': defaultdict(int)}
+    for doc in db.get_all([collection.document(doc_id) for doc_id in doc_ids]):
+        if not doc.exists:
+            continue
+        data = doc.to_dict()
+        stats['total'] += data.get('total', 0)
+        for dimension in DIMENSIONS:
+            for name, count in (data.get(dimension) or {}).items():
+                stats[dimension][name] += count
+        if doc.id.startswith('days_'):
+            month = doc.id.split('_')[1]
+            for day, count in (data.get('day') or {}).items():
+                stats['days'][datetime.strptime(f"{month}-{day}", '%Y-%m-%d').date()] += count
+    return stats
+
+
+def count_since(stats, since):
+    """Numărul de intrări din zilele >= `since` (date), din rezultatul read()"""
+    return sum(count for day, count in stats['days'].items() if day >= since)
+
+
+def rebuild(db):
+    """Recalculează statisticile din colecția audit_log și din arhiva ei (de ex. la prima activare)"""
+    import audit_archive  # audit_archive → audit_log → audit_stats
+
+    def entries():
+        # O arhivare întreruptă poate lăsa aceeași intrare în arhivă și în audit_log: se numără o dată
+        seen = set()
+        for entry in audit_archive.iter_entries():
+            if entry['id'] not in seen:
+                seen.add(entry['id'])
+                yield entry
+        for doc in db.collection('audit_log').select(['timestamp'] + DIMENSIONS).stream():
+            if doc.id not in seen:
+                yield doc.to_dict()
+
+    deltas = {}
+    stats_deltas(entries(), deltas=deltas)
+
+    # Rescriere pe loc, fără golirea colecției: pentru fiecare document (totaluri, lună) shard-ul 0
+    # primește valorile absolute și celelalte shard-uri sunt șterse în același lot, deci cititorii
+    # văd fie cifrele vechi, fie cele noi. La final se șterg doar lunile care nu mai există.
+    collection = db.collection(STATS_COLLECTION)
+    documents = stats_documents(deltas)
+    families = {doc_id.rsplit('_', 1)[0] for doc_id in documents}
+
+    def replace(batch, family):
+        batch.set(collection.document(f"{family}_0"), documents[f"{family}_0"])
+        for shard in range(1, NUM_SHARDS):
+            batch.delete(collection.document(f"{family}_{shard}"))
+
+    aggregations.commit_in_batches(db, (lambda batch, family=family: replace(batch, family) for family in families),
+                                   writes_per_operation=NUM_SHARDS)
+    stale_refs = [doc.reference for doc in collection.select([]).stream()
+                  if doc.id.rsplit('_', 1)[0] not in families]
+    aggregations.commit_in_batches(db, (lambda batch, ref=ref: batch.delete(ref) for ref in stale_refs))
+    return deltas.get('totals', {}).get('total', 0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Întreținere statistici audit")
+    parser.add_argument('command', choices=['rebuild'])
+    args = parser.parse_args()
+
+    from backend import get_db
+    total = rebuild(get_db())
+    print(f"Statistici recalculate din {total} intrări de audit")
@@ -0,0 +1,53 @@
+import os
+import threading
+import firebase_admin
+from firebase_admin import firestore
+
+# Backend de date selectat prin WORKFORCE_BACKEND:
+#   firestore (implicit) - Firestore real; respectă FIRESTORE_EMULATOR_HOST pentru emulator
+#   memory               - fake_firestore.MemoryClient, opțional populat cu WORKFORCE_SEED=<profil>
+BACKEND = os.environ.get('WORKFORCE_BACKEND', 'firestore')
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def is_memory():
+    return BACKEND == 'memory'
+
+
+def uses_firebase_app():
+    """True dacă backend-ul are nevoie de o aplicație firebase_admin inițializată"""
+    return not is_memory() and not os.environ.get('FIRESTORE_EMULATOR_HOST')
+
+
+def _memory_client():
+    from fake_firestore import MemoryClient
+    client = MemoryClient()
+    profile = os.environ.get('WORKFORCE_SEED')
+    if profile:
+        import seed_data
+        seed_data.seed(client, seed_data.PROFILES[profile])
+        client.reset_stats()
+    return client
+
+
+def _emulator_client():
+    from google.cloud import firestore as gcloud_firestore
+    return gcloud_firestore.Client(project=os.environ.get('GCLOUD_PROJECT', 'workforce-dev'))
+
+
+def get_db():
+    """Clientul de date al procesului (Firestore, emulator sau în memorie)"""
+    with _lock:
+        if 'db' not in _clients:
+            if is_memory():
+                _clients['db'] = _memory_client()
+            elif not uses_firebase_app():
+                _clients['db'] = _emulator_client()
+            else:
+                if not firebase_admin._apps:
+                    # Credențiale implicite (GOOGLE_APPLICATION_CREDENTIALS)
+                    firebase_admin.initialize_app()
+                _clients['db'] = firestore.client()
+        return _clients['db']
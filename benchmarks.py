@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from firebase_admin import firestore
+from fake_firestore import MemoryClient
+import seed_data
+import aggregations
+import audit_search
+import audit_stats
+import timesheet_frame
+import staffing
+import replica
+import dashboard_data
+import pagination
+from reference_data import get_employees
+
+# Benchmark-uri pe căile de date ale paginilor, rulate pe backend-ul în memorie.
+# Pentru fiecare caz se măsoară durata și numărul de citiri Firestore
+# (prima rulare = cache rece, ultima = regim staționar).
+
+
+def _week_range(today):
+    week_start = datetime.combine((today - timedelta(days=today.weekday())).date(), datetime.min.time())
+    return week_start, week_start + timedelta(days=6, hours=23, minutes=59, seconds=59)
+
+
+def bench_dashboard_cards(db):
+    """streamlit_app.show_dashboard: o reîmprospătare a snapshot-ului (carduri, recente, top șantiere)"""
+    dashboard_data.compute(db)
+
+
+def bench_dashboard_request(db):
+    """streamlit_app.show_dashboard: costul per cerere, cu snapshot-ul comun deja calculat"""
+    dashboard_data.get_snapshot(db)
+
+
+def bench_weekly_grid(db):
+    """timesheets.py, Pontaj Săptămânal: pivot angajat × zi și stilizarea grilei"""
+    week_start, week_end = _week_range(datetime.now())
+    frame = timesheet_frame.load(db.collection('timesheets')
+                                 .where('date', '>=', week_start)
+                                 .where('date', '<=', week_end))
+    grid = timesheet_frame.weekly_grid(frame, get_employees(db), week_start)
+    timesheet_frame.style_weekly_grid(grid).to_html()
+
+
+def bench_monthly_report(db):
+    """reports.py, Raport Lunar: DataFrame tipizat, statistici, evoluție zilnică, agregări, absențe"""
+    today = datetime.now()
+    month_start = datetime(today.year, today.month, 1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
+    frame = timesheet_frame.load(db.collection('timesheets')
+                                 .where('date', '>=', month_start)
+                                 .where('date', '<=', month_end))
+    timesheet_frame.summary(frame)
+    timesheet_frame.daily_hours(frame)
+    timesheet_frame.table(frame).to_dict('records')
+    timesheet_frame.aggregates(frame).to_dict('records')
+    timesheet_frame.absences(frame).to_dict('records')
+
+
+def bench_audit_stats(db):
+    """audit.py, Statistici Generale: activitate pe utilizatori, acțiuni, totaluri"""
+    stats = audit_stats.read(db)
+    sorted(stats['actor'].items(), key=lambda x: x[1], reverse=True)[:10]
+    today = datetime.now().date()
+    audit_stats.count_since(stats, today - timedelta(days=7))
+    audit_stats.count_since(stats, today - timedelta(days=30))
+
+
+def bench_audit_search(db):
+    """audit.py, Istoric Modificări: prima pagină a căutării după actor pe ultimele 30 de zile"""
+    query = db.collection('audit_log').where('timestamp', '>=', datetime.now() - timedelta(days=30))
+    query, predicate = audit_search.apply(query, {'actor': 'user07'})
+    query = query.order_by('timestamp', direction=firestore.Query.DESCENDING)
+    pagination.fetch_page(query, 'timestamp', pagination.DEFAULT_PAGE_SIZE, predicate=predicate)
+
+
+def bench_page_footers(db):
+    """Statisticile de subsol din paginile de angajați, șantiere, asignări și pontaje"""
+    for name in ['employees', 'sites']:
+        aggregations.count(db, db.collection(name), counter=(name, 'total'))
+        aggregations.count(db, db.collection(name).where('active', '==', True), counter=(name, 'active'))
+    aggregations.count(db, db.collection('assignments'), counter=('assignments', 'total'))
+    aggregations.count(db, db.collection('assignments').where('end_date', '==', None),
+                       counter=('assignments', 'active'))
+    aggregations.count(db, db.collection('timesheets'), counter=('timesheets', 'total'))
+    aggregations.sum_field(db, db.collection('timesheets'), 'hours', counter=('timesheets', 'hours'))
+
+
+def bench_staffing_timeline(db):
+    """assignments.py, Vizualizare: personal pe șantier și zi pe 365 de zile"""
+    staffing.compute(db, datetime.now().date(), 365)
+
+
+def bench_reference_lists(db):
+    """Listele de angajați/șantiere/asignări active citite la fiecare rerun al paginilor"""
+    get_employees(db)
+    replica.records(db, 'sites', active=True)
+    replica.records(db, 'employees', search='pop')
+    replica.records(db, 'assignments')
+
+
+def bench_typeahead(db):
+    """employees.py, Căutare: câte o căutare per tastă, fără diacritice, în indexul din replică"""
+    for text in ['s', 'st', 'ste', 'stef', 'stefa', 'stefan']:
+        replica.records(db, 'employees', search=text, fields=['full_name', 'email', 'phone'], limit=50)
+
+
+CASES = {
+    'dashboard_cards': bench_dashboard_cards,
+    'dashboard_request': bench_dashboard_request,
+    'weekly_grid': bench_weekly_grid,
+    'monthly_report': bench_monthly_report,
+    'audit_stats': bench_audit_stats,
+    'audit_search': bench_audit_search,
+    'page_footers': bench_page_footers,
+    'staffing_timeline': bench_staffing_timeline,
+    'reference_lists': bench_reference_lists,
+    'typeahead': bench_typeahead
+}
+
+
+def run_case(db, case, repeat):
+    """Rulează un caz de `repeat` ori; returnează durate (ms) și citiri per rulare"""
+    timings, reads = [], []
+    for _ in range(repeat):
+        db.reset_stats()
+        started = time.perf_counter()
+        case(db)
+        timings.append((time.perf_counter() - started) * 1000)
+        reads.append(db.reads)
+    return {
+        'reads_cold': reads[0],
+        'reads_warm': reads[-1],
+        'ms_min': min(timings),
+        'ms_mean': sum(timings) / len(timings)
+    }
+
+
+def run_excel_export(rows):
+    """Export Excel în flux într-un proces separat, pentru ca RSS-ul maxim să fie doar al exportului"""
+    output = subprocess.run([sys.executable, 'excel_export.py', 'bench', '--rows', str(rows)],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def run(profile, repeat=3, cases=None, seed=42):
+    db = MemoryClient()
+    started = time.perf_counter()
+    sizes = seed_data.seed(db, seed_data.PROFILES[profile], seed=seed)
+    seed_seconds = time.perf_counter() - started
+
+    results = {}
+    for name in cases or CASES:
+        results[name] = run_case(db, CASES[name], repeat)
+    return {'profile': profile, 'sizes': sizes, 'seed_seconds': seed_seconds, 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark-uri căi de date WorkForce Pro")
+    parser.add_argument('--profile', choices=list(seed_data.PROFILES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--case', action='append', choices=list(CASES), help="Rulează doar cazurile indicate")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Salvează rezultatele în fișierul indicat")
+    parser.add_argument('--excel-rows', type=int, nargs='+',
+                        help="Rulează doar benchmark-ul exportului Excel pentru numărul de rânduri indicat")
+    args = parser.parse_args()
+
+    if args.excel_rows:
+        print(f"{'Rânduri':>10}{'Secunde':>10}{'Rânduri/s':>12}{'RSS max (MB)':>14}")
+        for rows in args.excel_rows:
+            result = run_excel_export(rows)
+            print(f"{result['rows']:>10}{result['seconds']:>10.1f}{result['rows_per_second']:>12.0f}"
+                  f"{result['peak_rss_mb']:>14.1f}")
+        sys.exit(0)
+
+    report = run(args.profile, repeat=args.repeat, cases=args.case, seed=args.seed)
+    print(f"Profil {report['profile']}: {report['sizes']} (generare {report['seed_seconds']:.1f}s)")
+    print(f"{'Caz':<20}{'Citiri (rece)':>15}{'Citiri (cald)':>15}{'ms min':>12}{'ms medie':>12}")
+    for name, result in report['results'].items():
+        print(f"{name:<20}{result['reads_cold']:>15}{result['reads_warm']:>15}"
+              f"{result['ms_min']:>12.1f}{result['ms_mean']:>12.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
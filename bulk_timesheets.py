@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from google.api_core.exceptions import AlreadyExists
+import aggregations
+import audit_search
+import audit_stats
+import rollups
+from timesheet_store import timesheet_id
+
+# Operații în masă pe pontaje: planificare angajat×zi, omiterea pontajelor existente
+# și scriere în WriteBatch-uri (max 500 operații) comise în paralel.
+# Fiecare batch include propriile incremente de rollup/contoare și o singură
+# înregistrare de audit agregată.
+CHUNK_SIZE = 50  # 50 pontaje + max 8 rollup-uri/pontaj + contor + audit și statisticile lui < 500 operații
+COMMIT_WORKERS = 4
+
+
+def working_days(start, days=7):
+    """Zilele lucrătoare (Luni-Vineri) din intervalul [start, start + days)"""
+    start = datetime.combine(start.date() if isinstance(start, datetime) else start, datetime.min.time())
+    return [start + timedelta(days=i) for i in range(days) if (start + timedelta(days=i)).weekday() < 5]
+
+
+def _record(employee_id, employee_name, site_id, site_name, day, hours, status, actor, note=''):
+    return {
+        'date': day,
+        'employee_id': employee_id,
+        'employee_name': employee_name,
+        'site_id': site_id,
+        'site_name': site_name,
+        'hours': hours if status == 'present' else 0,
+        'status': status,
+        'note': note,
+        'created_at': datetime.now(),
+        'created_by': actor
+    }
+
+
+def plan_from_assignments(db, days, actor, hours=8):
+    """Pontaje 'prezent' pentru fiecare angajat cu asignare activă în zilele date"""
+    if not days:
+        return []
+    first_day, last_day = min(days), max(days)
+    assignments = db.collection('assignments')
+    candidates = list(assignments.where('end_date', '==', None).stream()) + \
+        list(assignments.where('end_date', '>=', first_day).stream())
+
+    planned = {}
+    for assignment in candidates:
+        data = assignment.to_dict()
+        start = data.get('start_date')
+        end = data.get('end_date')
+        if not isinstance(start, datetime):
+            continue
+        # Firestore returnează date cu fus orar (UTC); zilele planificate sunt fără fus orar
+        start = start.replace(tzinfo=None)
+        end = end.replace(tzinfo=None) if isinstance(end, datetime) else None
+        if start > last_day:
+            continue
+        for day in days:
+            if start <= day and (end is None or day <= end):
+                key = timesheet_id(data['employee_id'], day)
+                planned.setdefault(key, _record(
+                    data['employee_id'], data.get('employee_name', ''),
+                    data.get('site_id'), data.get('site_name', ''),
+                    day, hours, 'present', actor
+                ))
+    return list(planned.values())
+
+
+def plan_from_period(db, source_start, target_start, days, actor):
+    """Copiază pontajele din perioada sursă în perioada țintă (aceeași zi relativă)"""
+    source_start = datetime.combine(source_start, datetime.min.time())
+    target_start = datetime.combine(target_start, datetime.min.time())
+    offset = target_start - source_start
+    source = db.collection('timesheets')\
+        .where('date', '>=', source_start)\
+        .where('date', '<', source_start + timedelta(days=days))\
+        .stream()
+
+    planned = []
+    for ts in source:
+        data = ts.to_dict()
+        if not isinstance(data.get('date'), datetime):
+            continue
+        day = datetime.combine(data['date'].date(), datetime.min.time()) + offset
+        planned.append(_record(
+            data['employee_id'], data.get('employee_name', ''),
+            data.get('site_id'), data.get('site_name', ''),
+            day, data.get('hours', 0), data.get('status', 'present'), actor, data.get('note', '')
+        ))
+    return planned
+
+
+def skip_existing(db, records):
+    """Elimină înregistrările pentru care există deja pontaj.
+
+    ID-urile pontajelor sunt deterministe (angajat+zi), deci se citesc doar documentele candidate
+    cu get_all, nu toate pontajele din interval (o citire per înregistrare, nu per pontaj existent).
+    """
+    if not records:
+        return [], 0
+    collection = db.collection('timesheets')
+    ids = {timesheet_id(r['employee_id'], r['date']) for r in records}
+    existing = {snap.id for snap in db.get_all([collection.document(doc_id) for doc_id in ids]) if snap.exists}
+    remaining = [r for r in records if timesheet_id(r['employee_id'], r['date']) not in existing]
+    return remaining, len(records) - len(remaining)
+
+
+def _commit_chunk(db, records, actor, operation):
+    collection = db.collection('timesheets')
+    batch = db.batch()
+    for record in records:
+        batch.create(collection.document(timesheet_id(record['employee_id'], record['date'])), record)
+    rollups.apply_deltas(batch, db, rollups.rollup_deltas(records))
+    aggregations.bump_counter(db, 'timesheets', writer=batch,
+                              total=len(records), hours=sum(r['hours'] for r in records))
+    audit_entry = {
+        'timestamp': datetime.now(),
+        'actor': actor,
+        'action': 'create',
+        'entity': 'Timesheet',
+        'entity_id': f"bulk:{operation}",
+        'details': {
+            'operation': operation,
+            'count': len(records),
+            'ids': [timesheet_id(r['employee_id'], r['date']) for r in records]
+        }
+    }
+    audit_entry[audit_search.SEARCH_FIELD] = audit_search.tokens(audit_entry)
+    batch.set(db.collection('audit_log').document(), audit_entry)
+    audit_stats.apply_deltas(batch, db, audit_stats.stats_deltas([audit_entry]))
+    batch.commit()
+    return len(records)
+
+
+def _commit_with_retry(db, records, actor, operation):
+    try:
+        return _commit_chunk(db, records, actor, operation)
+    except AlreadyExists:
+        # Alt utilizator a creat între timp o parte din pontaje: se reia doar restul
+        refs = [db.collection('timesheets').document(timesheet_id(r['employee_id'], r['date'])) for r in records]
+        existing = {snap.id for snap in db.get_all(refs) if snap.exists}
+        remaining = [r for r in records if timesheet_id(r['employee_id'], r['date']) not in existing]
+        return _commit_chunk(db, remaining, actor, operation) if remaining else 0
+
+
+def commit_records(db, records, actor, operation):
+    """Scrie pontajele în batch-uri comise concurent; returnează (create, omise)"""
+    records, skipped = skip_existing(db, records)
+    chunks = [records[i:i + CHUNK_SIZE] for i in range(0, len(records), CHUNK_SIZE)]
+    with ThreadPoolExecutor(max_workers=COMMIT_WORKERS) as executor:
+        created = sum(executor.map(lambda chunk: _commit_with_retry(db, chunk, actor, operation), chunks))
+    return created, skipped + len(records) - created
+
+
+def fill_week(db, week_start, actor, hours=8):
+    """Completează Luni-Vineri cu 8h 'prezent' pentru toți angajații asignați"""
+    records = plan_from_assignments(db, working_days(week_start), actor, hours=hours)
+    return commit_records(db, records, actor, 'fill_week')
+
+
+def duplicate_period(db, source_start, target_start, days, actor, operation):
+    """Duplică pontajele unei perioade (ex: săptămâna anterioară, ziua de ieri)"""
+    records = plan_from_period(db, source_start, target_start, days, actor)
+    return commit_records(db, records, actor, operation)
@@ -0,0 +1,93 @@
+import threading
+import time
+from datetime import datetime
+from firebase_admin import firestore
+import replica
+import rollups
+
+# Datele dashboard-ului ca un singur snapshot pe proces, comun tuturor sesiunilor.
+# Fiecare set de date e citit o singură dată per reîmprospătare:
+#   - rollup-urile pe șantier ale săptămânii ISO curente → ore totale și absențe
+#   - rollup-urile totale pe șantier → top șantiere
+#   - ultimele pontaje → pontaje recente
+#   - angajații/șantierele active vin din replica în memorie (fără citiri)
+# După DASHBOARD_REFRESH secunde snapshot-ul e recalculat în fundal (cererile primesc imediat
+# varianta existentă); peste DASHBOARD_TTL secunde e considerat expirat și recalculat sincron.
+DASHBOARD_REFRESH = 30
+DASHBOARD_TTL = 300
+RECENT_LIMIT = 5
+TOP_SITES_LIMIT = 5
+ABSENCE_STATUSES = ['absent', 'medical', 'leave']
+
+_state = {}
+_lock = threading.Lock()
+
+
+def compute(db, today=None):
+    """Calculează snapshot-ul dashboard-ului (dict) din citirile de mai sus"""
+    today = today or datetime.now()
+    _, week_key, week_start = rollups.period_keys(today)[1]
+
+    week = db.collection(rollups.ROLLUPS_COLLECTION)\
+        .where('scope', '==', 'site')\
+        .where('period', '==', 'week')\
+        .where('key', '==', week_key)
+    week_rollups = [doc.to_dict() for doc in week.stream()]
+
+    recent = []
+    for doc in db.collection('timesheets').order_by('date', direction=firestore.Query.DESCENDING)\
+            .limit(RECENT_LIMIT).stream():
+        data = doc.to_dict()
+        recent.append({
+            'employee_name': data.get('employee_name', 'N/A'),
+            'site_name': data.get('site_name', 'N/A'),
+            'hours': data.get('hours', 0),
+            'status': data.get('status', 'present'),
+            'date': data.get('date')
+        })
+
+    return {
+        'computed_at': datetime.now(),
+        'week_start': week_start,
+        'total_hours': sum(r.get('hours', 0) or 0 for r in week_rollups),
+        'absences': sum((r.get('status') or {}).get(status, 0) or 0
+                        for r in week_rollups for status in ABSENCE_STATUSES),
+        'active_employees': len(replica.records(db, 'employees', active=True)),
+        'active_sites': len(replica.records(db, 'sites', active=True)),
+        'recent': recent,
+        'top_sites': rollups.top_entities(db, 'site', limit=TOP_SITES_LIMIT)
+    }
+
+
+def _refresh(db):
+    try:
+        snapshot = compute(db)
+    finally:
+        with _lock:
+            _state.pop(('refreshing', id(db)), None)
+    with _lock:
+        _state[('snapshot', id(db))] = (time.monotonic(), snapshot)
+    return snapshot
+
+
+def get_snapshot(db):
+    """Snapshot-ul curent; declanșează reîmprospătarea în fundal când e mai vechi de DASHBOARD_REFRESH"""
+    with _lock:
+        cached = _state.get(('snapshot', id(db)))
+        age = time.monotonic() - cached[0] if cached else None
+        stale = age is not None and DASHBOARD_REFRESH < age <= DASHBOARD_TTL
+        start_background = stale and ('refreshing', id(db)) not in _state
+        if start_background:
+            _state[('refreshing', id(db))] = True
+
+    if cached is None or age > DASHBOARD_TTL:
+        return _refresh(db)
+    if start_background:
+        threading.Thread(target=_refresh, args=(db,), name='dashboard-refresh', daemon=True).start()
+    return cached[1]
+
+
+def invalidate(db):
+    """Forțează recalcularea la următoarea cerere (după scrieri făcute din dashboard)"""
+    with _lock:
+        _state.pop(('snapshot', id(db)), None)
@@ -1,32 +1,28 @@
 import streamlit as st
 import firebase_admin
-from firebase_admin import firestore
 import pandas as pd
 from datetime import datetime
+from backend import get_db
+from audit_log import log_audit
+from sections import section_nav, section_timing
+import replica
+import aggregations
 
 # Verificare autentificare
 if 'user' not in st.session_state or st.session_state.user is None:
     st.warning("⚠️ Vă rugăm să vă autentificați")
     st.stop()
 
-db = firestore.client()
-
-def log_audit(actor, action, entity, entity_id, details):
-    db.collection('audit_log').add({
-        'timestamp': datetime.now(),
-        'actor': actor,
-        'action': action,
-        'entity': entity,
-        'entity_id': entity_id,
-        'details': details
-    })
+db = get_db()
 
 st.title("👥 Gestionare Angajați")
 
 # Tabs pentru diferite acțiuni
-tab1, tab2, tab3 = st.tabs(["📋 Lista Angajați", "➕ Adaugă Angajat", "🔍 Căutare"])
+TABS = ["📋 Lista Angajați", "➕ Adaugă Angajat", "🔍 Căutare"]
+SEARCH_LIMIT = 50
+active_tab = section_nav('employees_section', TABS)
 
-with tab1:
+if active_tab == TABS[0]:
     st.subheader("Lista Angajați")
     
     # Filtre
@@ -38,28 +34,11 @@ with tab1:
     with col3:
         search_name = st.text_input("🔍 Caută după nume", "")
     
-    # Obținere angajați
-    employees_ref = db.collection('employees')
-    
-    if filter_status == "Activ":
-        employees_ref = employees_ref.where('active', '==', True)
-    elif filter_status == "Inactiv":
-        employees_ref = employees_ref.where('active', '==', False)
-    
-    employees = list(employees_ref.stream())
-    
-    # Filtrare după nume și rol
-    filtered_employees = []
-    for emp in employees:
-        data = emp.to_dict()
-        data['id'] = emp.id
-        
-        if search_name and search_name.lower() not in data.get('full_name', '').lower():
-            continue
-        if filter_role != "Toate" and data.get('role') != filter_role:
-            continue
-        
-        filtered_employees.append(data)
+    # Obținere angajați din replica în memorie (fără citiri Firestore)
+    active = {"Activ": True, "Inactiv": False}.get(filter_status)
+    filtered_employees = [emp for emp in replica.records(db, 'employees', active=active, search=search_name,
+                                                         fields=['full_name'])
+                          if filter_role == "Toate" or emp.get('role') == filter_role]
     
     if filtered_employees:
         # Afișare ca tabel
@@ -97,6 +76,8 @@ with tab1:
                 db.collection('employees').document(selected_employee).update({
                     'active': not current_status
                 })
+                aggregations.bump_counter(db, 'employees', active=-1 if current_status else 1)
+                replica.upsert(db, 'employees', selected_employee, {'active': not current_status})
                 log_audit(
                     st.session_state.user_email,
                     'update',
@@ -117,6 +98,8 @@ with tab1:
                 else:
                     if st.button("⚠️ Confirmare Ștergere", type="primary"):
                         db.collection('employees').document(selected_employee).delete()
+                        aggregations.bump_counter(db, 'employees', total=-1, active=-1 if current_status else 0)
+                        replica.remove(db, 'employees', selected_employee)
                         log_audit(
                             st.session_state.user_email,
                             'delete',
@@ -132,53 +115,60 @@ with tab1:
             st.markdown("---")
             st.subheader("✏️ Editare Angajat")
             
-            emp_doc = db.collection('employees').document(st.session_state.edit_employee_id).get()
-            emp_data = emp_doc.to_dict()
-            
-            with st.form("edit_employee_form"):
-                edit_name = st.text_input("Nume Complet", value=emp_data.get('full_name', ''))
-                edit_role = st.selectbox("Rol", ["Muncitor", "Șef Șantier", "Inginer", "Manager"], 
-                                        index=["Muncitor", "Șef Șantier", "Inginer", "Manager"].index(emp_data.get('role', 'Muncitor')))
-                edit_email = st.text_input("Email", value=emp_data.get('email', ''))
-                edit_phone = st.text_input("Telefon", value=emp_data.get('phone', ''))
-                edit_active = st.checkbox("Activ", value=emp_data.get('active', True))
+            emp_data = replica.get(db, 'employees', st.session_state.edit_employee_id)
+            if emp_data is None:
+                # Șters între timp din altă sesiune/nod
+                del st.session_state.edit_employee_id
+                st.warning("⚠️ Angajatul a fost șters între timp")
+            else:
+                emp_data = {k: v for k, v in emp_data.items() if k != 'id'}
                 
-                col_save, col_cancel = st.columns(2)
-                with col_save:
-                    submit_edit = st.form_submit_button("💾 Salvează", use_container_width=True, type="primary")
-                with col_cancel:
-                    cancel_edit = st.form_submit_button("❌ Anulează", use_container_width=True)
+                with st.form("edit_employee_form"):
+                    edit_name = st.text_input("Nume Complet", value=emp_data.get('full_name', ''))
+                    edit_role = st.selectbox("Rol", ["Muncitor", "Șef Șantier", "Inginer", "Manager"], 
+                                            index=["Muncitor", "Șef Șantier", "Inginer", "Manager"].index(emp_data.get('role', 'Muncitor')))
+                    edit_email = st.text_input("Email", value=emp_data.get('email', ''))
+                    edit_phone = st.text_input("Telefon", value=emp_data.get('phone', ''))
+                    edit_active = st.checkbox("Activ", value=emp_data.get('active', True))
                 
-                if submit_edit:
-                    updated_data = {
-                        'full_name': edit_name,
-                        'role': edit_role,
-                        'email': edit_email,
-                        'phone': edit_phone,
-                        'active': edit_active,
-                        'updated_at': datetime.now()
-                    }
+                    col_save, col_cancel = st.columns(2)
+                    with col_save:
+                        submit_edit = st.form_submit_button("💾 Salvează", use_container_width=True, type="primary")
+                    with col_cancel:
+                        cancel_edit = st.form_submit_button("❌ Anulează", use_container_width=True)
+                
+                    if submit_edit:
+                        updated_data = {
+                            'full_name': edit_name,
+                            'role': edit_role,
+                            'email': edit_email,
+                            'phone': edit_phone,
+                            'active': edit_active,
+                            'updated_at': datetime.now()
+                        }
                     
-                    db.collection('employees').document(st.session_state.edit_employee_id).update(updated_data)
-                    log_audit(
-                        st.session_state.user_email,
-                        'update',
-                        'Employee',
-                        st.session_state.edit_employee_id,
-                        {'old': emp_data, 'new': updated_data}
-                    )
+                        db.collection('employees').document(st.session_state.edit_employee_id).update(updated_data)
+                        aggregations.bump_counter(db, 'employees', active=int(edit_active) - int(emp_data.get('active', True)))
+                        replica.upsert(db, 'employees', st.session_state.edit_employee_id, updated_data)
+                        log_audit(
+                            st.session_state.user_email,
+                            'update',
+                            'Employee',
+                            st.session_state.edit_employee_id,
+                            {'old': emp_data, 'new': updated_data}
+                        )
                     
-                    del st.session_state.edit_employee_id
-                    st.success("✅ Angajat actualizat!")
-                    st.rerun()
+                        del st.session_state.edit_employee_id
+                        st.success("✅ Angajat actualizat!")
+                        st.rerun()
                 
-                if cancel_edit:
-                    del st.session_state.edit_employee_id
-                    st.rerun()
+                    if cancel_edit:
+                        del st.session_state.edit_employee_id
+                        st.rerun()
     else:
         st.info("📭 Nu există angajați care să corespundă filtrelor")
 
-with tab2:
+elif active_tab == TABS[1]:
     st.subheader("➕ Adaugă Angajat Nou")
     
     with st.form("add_employee_form"):
@@ -211,6 +201,8 @@ with tab2:
                     }
                     
                     doc_ref = db.collection('employees').add(employee_data)
+                    aggregations.bump_counter(db, 'employees', total=1, active=int(new_active))
+                    replica.upsert(db, 'employees', doc_ref[1].id, employee_data)
                     
                     log_audit(
                         st.session_state.user_email,
@@ -223,27 +215,21 @@ with tab2:
                     st.success(f"✅ Angajat '{new_name}' adăugat cu succes!")
                     st.balloons()
 
-with tab3:
+elif active_tab == TABS[2]:
     st.subheader("🔍 Căutare Avansată")
     
     search_query = st.text_input("Caută după nume, email sau telefon", "")
     
     if search_query:
-        all_employees = list(db.collection('employees').stream())
-        results = []
-        
-        for emp in all_employees:
-            data = emp.to_dict()
-            data['id'] = emp.id
-            
-            search_lower = search_query.lower()
-            if (search_lower in data.get('full_name', '').lower() or
-                search_lower in data.get('email', '').lower() or
-                search_lower in data.get('phone', '').lower()):
-                results.append(data)
+        # Index de trigrame în memorie: fără diacritice/majuscule, ordonat după relevanță
+        results = replica.records(db, 'employees', search=search_query, fields=['full_name', 'email', 'phone'],
+                                  limit=SEARCH_LIMIT)
         
         if results:
-            st.success(f"✅ Găsite {len(results)} rezultate")
+            if len(results) == SEARCH_LIMIT:
+                st.success(f"✅ Primele {SEARCH_LIMIT} rezultate (restrângeți căutarea pentru altele)")
+            else:
+                st.success(f"✅ Găsite {len(results)} rezultate")
             
             for emp in results:
                 status_icon = "✅" if emp.get('active') else "❌"
@@ -261,10 +247,12 @@ with tab3:
     else:
         st.info("💡 Introduceți termeni de căutare")
 
+section_timing('employees_section', active_tab)
+
 # Footer cu statistici
 st.markdown("---")
-total_employees = len(list(db.collection('employees').stream()))
-active_employees = len(list(db.collection('employees').where('active', '==', True).stream()))
+total_employees = aggregations.count(db, db.collection('employees'), counter=('employees', 'total'))
+active_employees = aggregations.count(db, db.collection('employees').where('active', '==', True), counter=('employees', 'active'))
 
 col1, col2, col3 = st.columns(3)
 with col1:
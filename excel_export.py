@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+import xlsxwriter
+
+# Export Excel în flux: xlsxwriter în modul constant_memory scrie fiecare rând pe disc
+# imediat, deci memoria rămâne constantă indiferent de numărul de rânduri.
+# Foile care depășesc limita Excel continuă automat în "Nume (2)", "Nume (3)" etc.
+EXCEL_MAX_ROWS = 1_048_576
+DETAIL_HEADERS = ['Data', 'Angajat', 'Șantier', 'Ore', 'Status', 'Observații']
+AGGREGATE_HEADERS = ['Angajat', 'Șantier', 'Status', 'Total Ore']
+ABSENCE_HEADERS = ['Angajat', 'Tip Absență', 'Număr Zile']
+ABSENCE_LABELS = {'absent': 'Absent', 'medical': 'Concediu Medical', 'leave': 'Concediu'}
+
+
+class _SheetWriter:
+    """Scrie rânduri într-o foaie, deschizând foi noi cu același antet la limita de rânduri"""
+
+    def __init__(self, workbook, name, headers, formats, max_rows=EXCEL_MAX_ROWS):
+        self.workbook = workbook
+        self.name = name
+        self.headers = headers
+        self.header_format, self.cell_format = formats
+        self.max_rows = max_rows
+        self.parts = 0
+        self.rows = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.parts += 1
+        suffix = f" ({self.parts})" if self.parts > 1 else ''
+        self.sheet = self.workbook.add_worksheet(f"{self.name[:31 - len(suffix)]}{suffix}")
+        self.sheet.write_row(0, 0, self.headers, self.header_format)
+        self.row = 1
+
+    def write(self, values):
+        if self.row >= self.max_rows:
+            self._new_sheet()
+        self.sheet.write_row(self.row, 0, values, self.cell_format)
+        self.row += 1
+        self.rows += 1
+
+
+def write_workbook(path, sheets, max_rows=EXCEL_MAX_ROWS):
+    """Scrie în `path` foile date ca (nume, antet, iterabil de rânduri), în ordine.
+
+    Rândurile sunt consumate o singură dată; generatoarele nu sunt materializate.
+    Returnează numărul de rânduri scrise pe fiecare foaie logică.
+    """
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    formats = (
+        workbook.add_format({'bold': True, 'bg_color': '#4F46E5', 'font_color': 'white', 'border': 1}),
+        workbook.add_format({'border': 1})
+    )
+    written = {}
+    for name, headers, rows in sheets:
+        writer = _SheetWriter(workbook, name, headers, formats, max_rows=max_rows)
+        for values in rows:
+            writer.write(values)
+        written[name] = writer.rows
+    workbook.close()
+    return written
+
+
+def timesheet_rows(snapshots):
+    """Generator peste cursorul interogării (ex: `query.stream()`): un rând de export per pontaj"""
+    for snapshot in snapshots:
+        data = snapshot.to_dict()
+        date = data.get('date')
+        yield (
+            date.strftime('%d.%m.%Y') if isinstance(date, datetime) else 'N/A',
+            data.get('employee_name', 'N/A'),
+            data.get('site_name', 'N/A'),
+            data.get('hours', 0),
+            data.get('status', 'N/A'),
+            data.get('note', '')
+        )
+
+
+def export_timesheets(path, rows, max_rows=EXCEL_MAX_ROWS):
+    """Export complet (detalii, agregare, absențe) dintr-un singur flux de rânduri de detaliu.
+
+    Agregările se acumulează în timpul scrierii foii de detaliu; memoria depinde doar de
+    numărul de combinații angajat × șantier × status, nu de numărul de pontaje.
+    """
+    aggregates = defaultdict(float)
+    absences = defaultdict(int)
+
+    def detail():
+        for row in rows:
+            _, employee, site, hours, status, _ = row
+            aggregates[(employee, site, status)] += hours or 0
+            if status in ABSENCE_LABELS:
+                absences[(employee, status)] += 1
+            yield row
+
+    # Foile de sumar sunt generatoare leneșe: pornesc abia după ce foaia de detaliu a fost scrisă
+    def aggregate_rows():
+        for (employee, site, status), hours in aggregates.items():
+            yield employee, site, status, hours
+
+    def absence_rows():
+        for (employee, status), count in absences.items():
+            yield employee, ABSENCE_LABELS[status], count
+
+    return write_workbook(path, [
+        ('Pontaje Detaliate', DETAIL_HEADERS, detail()),
+        ('Agregare', AGGREGATE_HEADERS, aggregate_rows()),
+        ('Absențe', ABSENCE_HEADERS, absence_rows())
+    ], max_rows=max_rows)
+
+
+def _synthetic_rows(count):
+    start = datetime(2024, 1, 1)
+    statuses = ['present'] * 17 + ['absent', 'medical', 'leave']
+    for i in range(count):
+        status = statuses[i % len(statuses)]
+        yield (
+            (start + timedelta(days=i % 365)).strftime('%d.%m.%Y'),
+            f"Angajat {i % 500}",
+            f"Șantier {i % 80}",
+            8 if status == 'present' else 0,
+            status,
+            ''
+        )
+
+
+def bench(rows, path=None):
+    """Rânduri/secundă și memoria maximă (RSS) a procesului pentru un export sintetic"""
+    import resource  # doar Unix; modulul e importat și de paginile rulate pe Windows
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        started = time.perf_counter()
+        export_timesheets(path or os.path.join(tmp_dir, 'bench.xlsx'), _synthetic_rows(rows))
+        seconds = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds, 'peak_rss_mb': peak_kb / 1024}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export Excel în flux")
+    parser.add_argument('command', choices=['bench'])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--out', help="Fișierul rezultat (implicit unul temporar)")
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.rows, args.out)))
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Cache pe disc pentru fișierele exportate (Excel/PDF), cu evacuare LRU.
+# Cheia derivă din conținutul raportului (tip, interval, filtre, versiunea datelor),
+# deci mai mulți utilizatori care descarcă același raport primesc același fișier.
+CACHE_DIR = os.environ.get('EXPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'workforce_exports'))
+MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_MB', '256')) * 1024 * 1024
+MAX_ENTRIES = int(os.environ.get('EXPORT_CACHE_MAX_ENTRIES', '200'))
+
+# Generările aceleiași chei sunt serializate printr-un set fix de lock-uri (după hash-ul cheii),
+# ca memoria să nu crească cu fiecare raport nou într-un proces de lungă durată
+KEY_LOCKS = 64
+_key_locks = [threading.Lock() for _ in range(KEY_LOCKS)]
+_evict_lock = threading.Lock()
+
+
+def content_key(**parts):
+    """Cheie sha256 din părțile raportului (valorile non-JSON sunt convertite cu str)"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _path(key, suffix):
+    return os.path.join(CACHE_DIR, f"{key}{suffix}")
+
+
+def lookup(key, suffix):
+    """Calea fișierului din cache sau None; un acces reîmprospătează poziția LRU"""
+    path = _path(key, suffix)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def get_or_create(key, suffix, build):
+    """Returnează fișierul din cache, generându-l cu `build(cale)` dacă lipsește.
+
+    Generarea se face într-un fișier temporar mutat atomic, deci cititorii concurenți
+    nu văd niciodată un export incomplet.
+    """
+    with _key_locks[hash(key) % KEY_LOCKS]:
+        path = lookup(key, suffix)
+        if path is not None:
+            return path
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            build(tmp_path)
+            path = _path(key, suffix)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    evict()
+    return path
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def evict(max_bytes=None, max_entries=None):
+    """Șterge cele mai vechi fișiere (după ultimul acces) peste limitele cache-ului"""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    with _evict_lock:
+        try:
+            names = os.listdir(CACHE_DIR)
+        except FileNotFoundError:
+            return 0
+        entries = []
+        for name in names:
+            if name.endswith('.tmp'):
+                continue
+            try:
+                stat = os.stat(os.path.join(CACHE_DIR, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort(reverse=True)
+
+        kept_bytes, removed = 0, 0
+        for index, (_, size, name) in enumerate(entries):
+            kept_bytes += size
+            if index >= max_entries or kept_bytes > max_bytes:
+                try:
+                    os.remove(os.path.join(CACHE_DIR, name))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                kept_bytes -= size
+        return removed
@@ -0,0 +1,659 @@
+import copy
+import enum
+import math
+import random
+import string
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date
+from google.api_core.exceptions import AlreadyExists, NotFound
+
+# Înlocuitor Firestore în memorie pentru dezvoltare locală și benchmark-uri.
+# Acoperă apelurile folosite de aplicație (where/order_by/limit/cursoare/stream,
+# add/set/update/delete, batch, agregări count/sum, listenere on_snapshot) și numără
+# citirile după regulile de facturare Firestore.
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+DOCUMENT_ID = '__name__'
+AGGREGATION_PAGE = 1000
+
+
+def _auto_id():
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=20))
+
+
+def _type_rank(value):
+    # Ordinea tipurilor din Firestore: null < bool < număr < dată < text < referință < altele
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, (datetime, date)):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, MemoryDocumentReference):
+        return 5
+    return 6
+
+
+def _sort_value(value):
+    if isinstance(value, MemoryDocumentReference):
+        return (5, value.path)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    rank = _type_rank(value)
+    if rank == 6:
+        return (rank, repr(value))
+    return (rank, value)
+
+
+class _Missing:
+    pass
+
+
+MISSING = _Missing()
+
+
+def _get_field(data, doc_id, field):
+    if field == DOCUMENT_ID:
+        return doc_id
+    value = data
+    for part in field.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def _comparable(a, b):
+    return _type_rank(a) == _type_rank(b)
+
+
+def _matches(value, op, expected):
+    if value is MISSING:
+        return False
+    if op == '==':
+        return _comparable(value, expected) and value == expected
+    if op == '!=':
+        return value is not None and not (_comparable(value, expected) and value == expected)
+    if op == 'in':
+        return any(_comparable(value, e) and value == e for e in expected)
+    if op == 'not-in':
+        return value is not None and not any(_comparable(value, e) and value == e for e in expected)
+    if op == 'array_contains':
+        return isinstance(value, list) and expected in value
+    if op == 'array_contains_any':
+        return isinstance(value, list) and any(e in value for e in expected)
+    if not _comparable(value, expected):
+        return False
+    value, expected = _sort_value(value), _sort_value(expected)
+    if op == '<':
+        return value < expected
+    if op == '<=':
+        return value <= expected
+    if op == '>':
+        return value > expected
+    if op == '>=':
+        return value >= expected
+    raise ValueError(f"Operator necunoscut: {op}")
+
+
+def _is_transform(value, name):
+    return type(value).__name__ == name
+
+
+def _apply_value(current, value):
+    """Aplică transformările Firestore (Increment, ArrayUnion, ...) peste valoarea curentă"""
+    if _is_transform(value, 'Increment'):
+        base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+        return base + value.value
+    if _is_transform(value, 'ArrayUnion'):
+        base = list(current) if isinstance(current, list) else []
+        return base + [v for v in value.values if v not in base]
+    if _is_transform(value, 'ArrayRemove'):
+        base = list(current) if isinstance(current, list) else []
+        return [v for v in base if v not in value.values]
+    if _is_transform(value, 'Sentinel') and 'timestamp' in getattr(value, 'description', '').lower():
+        return datetime.now()
+    if isinstance(value, dict):
+        return {k: _apply_value(None, v) for k, v in value.items()}
+    return copy.deepcopy(value)
+
+
+def _is_delete(value):
+    return _is_transform(value, 'Sentinel') and 'delete' in getattr(value, 'description', '').lower()
+
+
+def _merge(target, data):
+    for key, value in data.items():
+        if _is_delete(value):
+            target.pop(key, None)
+        elif isinstance(value, dict) and not _is_transform(value, 'Increment'):
+            existing = target.get(key)
+            if not isinstance(existing, dict):
+                existing = target[key] = {}
+            _merge(existing, value)
+        else:
+            target[key] = _apply_value(target.get(key), value)
+
+
+def _update_paths(target, data):
+    for path, value in data.items():
+        parts = path.split('.')
+        node = target
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        if _is_delete(value):
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = _apply_value(node.get(parts[-1]), value)
+
+
+class MemoryDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        return dict(self._data)
+
+    def get(self, field):
+        value = _get_field(self._data or {}, self.id, field)
+        return None if value is MISSING else value
+
+
+class MemoryDocumentReference:
+    def __init__(self, client, collection_name, doc_id):
+        self._client = client
+        self._collection_name = collection_name
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._collection_name}/{self.id}"
+
+    @property
+    def parent(self):
+        return self._client.collection(self._collection_name)
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def get(self, transaction=None):
+        self._client.reads += 1
+        data = self._client._store(self._collection_name).get(self.id)
+        return MemoryDocumentSnapshot(self, data)
+
+    def create(self, data):
+        batch = self._client.batch()
+        batch.create(self, data)
+        return batch.commit()[0]
+
+    def set(self, data, merge=False):
+        batch = self._client.batch()
+        batch.set(self, data, merge=merge)
+        return batch.commit()[0]
+
+    def update(self, data):
+        batch = self._client.batch()
+        batch.update(self, data)
+        return batch.commit()[0]
+
+    def delete(self):
+        batch = self._client.batch()
+        batch.delete(self)
+        return batch.commit()[0]
+
+
+class MemoryWriteBatch:
+    MAX_WRITES = 500
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def _add(self, op, reference, data=None, merge=False):
+        if len(self._writes) >= self.MAX_WRITES:
+            raise ValueError("Un WriteBatch acceptă maximum 500 de operații")
+        self._writes.append((op, reference, data, merge))
+        return self
+
+    def create(self, reference, data):
+        return self._add('create', reference, data)
+
+    def set(self, reference, data, merge=False):
+        return self._add('set', reference, data, merge)
+
+    def update(self, reference, data):
+        return self._add('update', reference, data)
+
+    def delete(self, reference):
+        return self._add('delete', reference)
+
+    def commit(self):
+        return self._client._commit(self._writes)
+
+
+class MemoryAggregationResult:
+    def __init__(self, alias, value):
+        self.alias = alias
+        self.value = value
+        self.read_time = datetime.now()
+
+
+class MemoryAggregationQuery:
+    def __init__(self, query, kind, alias, field=None):
+        self._query = query
+        self._aggregations = [(kind, alias, field)]
+
+    def count(self, alias=None):
+        self._aggregations.append(('count', alias, None))
+        return self
+
+    def sum(self, field, alias=None):
+        self._aggregations.append(('sum', alias, field))
+        return self
+
+    def avg(self, field, alias=None):
+        self._aggregations.append(('avg', alias, field))
+        return self
+
+    def get(self, transaction=None):
+        docs = self._query._evaluate()
+        client = self._query._client
+        # Agregările sunt facturate la 1 citire per 1000 de intrări de index
+        client.reads += max(1, math.ceil(len(docs) / AGGREGATION_PAGE))
+        results = []
+        for index, (kind, alias, field) in enumerate(self._aggregations):
+            alias = alias or f'field_{index + 1}'
+            if kind == 'count':
+                value = len(docs)
+            else:
+                values = [_get_field(data, doc_id, field) for doc_id, data in docs]
+                values = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+                if kind == 'sum':
+                    value = sum(values)
+                else:
+                    value = sum(values) / len(values) if values else None
+            results.append(MemoryAggregationResult(alias, value))
+        return [results]
+
+    def stream(self, transaction=None):
+        yield from self.get()
+
+
+class ChangeType(enum.Enum):
+    ADDED = 1
+    REMOVED = 2
+    MODIFIED = 3
+
+
+class MemoryDocumentChange:
+    def __init__(self, type, document):
+        self.type = type
+        self.document = document
+
+
+class MemoryWatch:
+    """Listener pe o interogare (doar filtre); notificat sincron după fiecare commit"""
+
+    def __init__(self, query, callback):
+        self._query = query
+        self._callback = callback
+        self._matched = set()
+        self._closed = False
+
+    def _matches(self, doc_id, data):
+        return data is not None and all(_matches(_get_field(data, doc_id, f), op, v)
+                                        for f, op, v in self._query._filters)
+
+    def _snapshot(self, doc_id, data):
+        reference = MemoryDocumentReference(self._query._client, self._query._collection_name, doc_id)
+        return MemoryDocumentSnapshot(reference, copy.deepcopy(data))
+
+    def _start(self):
+        docs = self._query._evaluate()
+        self._matched = {doc_id for doc_id, _ in docs}
+        self._query._client.reads += max(1, len(docs))
+        snapshots = [self._snapshot(doc_id, data) for doc_id, data in docs]
+        self._callback(snapshots, [MemoryDocumentChange(ChangeType.ADDED, s) for s in snapshots], datetime.now())
+
+    def _notify(self, written):
+        """`written` sunt (id, date după commit) pentru documentele modificate în colecție"""
+        changes = []
+        for doc_id, data in written:
+            was_matched, matches = doc_id in self._matched, self._matches(doc_id, data)
+            if matches:
+                self._matched.add(doc_id)
+                kind = ChangeType.MODIFIED if was_matched else ChangeType.ADDED
+            elif was_matched:
+                self._matched.discard(doc_id)
+                kind = ChangeType.REMOVED
+            else:
+                continue
+            changes.append(MemoryDocumentChange(kind, self._snapshot(doc_id, data)))
+        if changes and not self._closed:
+            # Fiecare document modificat livrat listenerului e facturat ca o citire
+            self._query._client.reads += len(changes)
+            self._callback([], changes, datetime.now())
+
+    def unsubscribe(self):
+        self._closed = True
+        self._query._client._unwatch(self)
+
+
+class MemoryQuery:
+    def __init__(self, client, collection_name, filters=(), orders=(), limit=None,
+                 offset=0, start=None, end=None, projection=None):
+        self._client = client
+        self._collection_name = collection_name
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._offset = offset
+        self._start = start
+        self._end = end
+        self._projection = projection
+
+    def _copy(self, **changes):
+        params = {
+            'filters': self._filters, 'orders': self._orders, 'limit': self._limit,
+            'offset': self._offset, 'start': self._start, 'end': self._end,
+            'projection': self._projection
+        }
+        params.update(changes)
+        return MemoryQuery(self._client, self._collection_name, **params)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if field_path == DOCUMENT_ID:
+            value = [v.id if isinstance(v, MemoryDocumentReference) else v for v in value] \
+                if op_string in ('in', 'not-in') else \
+                (value.id if isinstance(value, MemoryDocumentReference) else value)
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def offset(self, num_to_skip):
+        return self._copy(offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, False))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, True))
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, False))
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, True))
+
+    def count(self, alias=None):
+        return MemoryAggregationQuery(self, 'count', alias)
+
+    def sum(self, field_ref, alias=None):
+        return MemoryAggregationQuery(self, 'sum', alias, field_ref)
+
+    def avg(self, field_ref, alias=None):
+        return MemoryAggregationQuery(self, 'avg', alias, field_ref)
+
+    def _effective_orders(self):
+        orders = list(self._orders)
+        if not orders:
+            inequality = next((f for f, op, _ in self._filters
+                               if op in ('<', '<=', '>', '>=', '!=', 'not-in')), None)
+            if inequality:
+                orders.append((inequality, ASCENDING))
+        if not any(field == DOCUMENT_ID for field, _ in orders):
+            direction = orders[-1][1] if orders else ASCENDING
+            orders.append((DOCUMENT_ID, direction))
+        return orders
+
+    def _cursor_values(self, cursor, orders):
+        if isinstance(cursor, MemoryDocumentSnapshot):
+            data = cursor._data or {}
+            return [_get_field(data, cursor.id, field) for field, _ in orders]
+        if isinstance(cursor, dict):
+            values = []
+            for field, _ in orders:
+                if field not in cursor:
+                    break
+                values.append(cursor[field])
+            return values
+        return list(cursor)
+
+    def _compare_to_cursor(self, key, cursor_values, orders):
+        for (field, direction), item, cursor_value in zip(orders, key, cursor_values):
+            if isinstance(cursor_value, MemoryDocumentReference):
+                cursor_value = cursor_value.id
+            cursor_value = _sort_value(cursor_value)
+            if item != cursor_value:
+                result = -1 if item < cursor_value else 1
+                return -result if direction == DESCENDING else result
+        return 0
+
+    def _candidates(self, store):
+        # Index sortat pe primul câmp cu filtru de interval, pentru a evita scanarea completă
+        range_filters = [(f, op, v) for f, op, v in self._filters if op in ('<', '<=', '>', '>=')]
+        if not range_filters or range_filters[0][0] == DOCUMENT_ID:
+            return store.items()
+        field = range_filters[0][0]
+        keys, ids = self._client._range_index(self._collection_name, field)
+        low, high = 0, len(keys)
+        for f, op, value in range_filters:
+            if f != field:
+                continue
+            probe = _sort_value(value)
+            if op == '>':
+                low = max(low, bisect_right(keys, probe))
+            elif op == '>=':
+                low = max(low, bisect_left(keys, probe))
+            elif op == '<':
+                high = min(high, bisect_left(keys, probe))
+            elif op == '<=':
+                high = min(high, bisect_right(keys, probe))
+        return ((doc_id, store[doc_id]) for doc_id in ids[low:high] if doc_id in store)
+
+    def _evaluate(self):
+        with self._client._lock:
+            store = self._client._store(self._collection_name)
+            orders = self._effective_orders()
+            matched = []
+            for doc_id, data in self._candidates(store):
+                if not all(_matches(_get_field(data, doc_id, f), op, v) for f, op, v in self._filters):
+                    continue
+                key = []
+                for field, _ in orders:
+                    value = _get_field(data, doc_id, field)
+                    if value is MISSING:
+                        break
+                    key.append(_sort_value(value))
+                else:
+                    matched.append((key, doc_id, data))
+
+        if len({direction for _, direction in orders}) == 1:
+            matched.sort(key=lambda item: item[0], reverse=orders[0][1] == DESCENDING)
+        else:
+            # Sortări stabile succesive, de la ultimul criteriu la primul
+            for index in range(len(orders) - 1, -1, -1):
+                reverse = orders[index][1] == DESCENDING
+                matched.sort(key=lambda item: item[0][index], reverse=reverse)
+
+        if self._start is not None:
+            cursor, exclusive = self._start
+            values = self._cursor_values(cursor, orders)
+            matched = [m for m in matched
+                       if (lambda c: c > 0 or (c == 0 and not exclusive))(
+                           self._compare_to_cursor(m[0], values, orders))]
+        if self._end is not None:
+            cursor, exclusive = self._end
+            values = self._cursor_values(cursor, orders)
+            matched = [m for m in matched
+                       if (lambda c: c < 0 or (c == 0 and not exclusive))(
+                           self._compare_to_cursor(m[0], values, orders))]
+
+        matched = matched[self._offset:]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        return [(doc_id, data) for _, doc_id, data in matched]
+
+    def stream(self, transaction=None):
+        docs = self._evaluate()
+        # O interogare fără rezultate este facturată ca o citire
+        self._client.reads += max(1, len(docs))
+        for doc_id, data in docs:
+            if self._projection is not None:
+                data = {f: data[f] for f in self._projection if f in data}
+            reference = MemoryDocumentReference(self._client, self._collection_name, doc_id)
+            yield MemoryDocumentSnapshot(reference, data)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+    def on_snapshot(self, callback):
+        watch = MemoryWatch(self, callback)
+        with self._client._lock:
+            self._client._watches.append(watch)
+        watch._start()
+        return watch
+
+
+class MemoryCollectionReference(MemoryQuery):
+    def __init__(self, client, name):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, document_id=None):
+        return MemoryDocumentReference(self._client, self.id, document_id or _auto_id())
+
+    def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        reference.create(document_data)
+        return datetime.now(), reference
+
+    def list_documents(self):
+        return [self.document(doc_id) for doc_id in list(self._client._store(self.id))]
+
+
+class MemoryClient:
+    """Client Firestore în memorie, cu contor de citiri/scrieri"""
+
+    def __init__(self):
+        self._collections = {}
+        self._range_indexes = {}
+        self._lock = threading.RLock()
+        self._watches = []
+        self.reads = 0
+        self.writes = 0
+
+    def _store(self, name):
+        return self._collections.setdefault(name, {})
+
+    def _range_index(self, collection_name, field):
+        key = (collection_name, field)
+        with self._lock:
+            index = self._range_indexes.get(key)
+            if index is None:
+                entries = sorted(
+                    (_sort_value(value), doc_id)
+                    for doc_id, data in self._store(collection_name).items()
+                    for value in [_get_field(data, doc_id, field)] if value is not MISSING
+                )
+                index = self._range_indexes[key] = ([k for k, _ in entries], [i for _, i in entries])
+            return index
+
+    def collection(self, name):
+        return MemoryCollectionReference(self, name)
+
+    def batch(self):
+        return MemoryWriteBatch(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference.get()
+
+    def reset_stats(self):
+        self.reads = 0
+        self.writes = 0
+
+    def load(self, collection_name, documents):
+        """Încărcare rapidă (fără copiere/contorizare) pentru date generate"""
+        with self._lock:
+            store = self._store(collection_name)
+            for doc_id, data in documents:
+                store[doc_id or _auto_id()] = data
+            self._invalidate(collection_name)
+
+    def _invalidate(self, collection_name):
+        for key in [k for k in self._range_indexes if k[0] == collection_name]:
+            del self._range_indexes[key]
+
+    def _unwatch(self, watch):
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _commit(self, writes):
+        written = {}
+        with self._lock:
+            watched = {watch._query._collection_name for watch in self._watches}
+            # Precondițiile se verifică înainte de orice scriere: batch-ul e atomic
+            for op, reference, _, _ in writes:
+                exists = reference.id in self._store(reference._collection_name)
+                if op == 'create' and exists:
+                    raise AlreadyExists(f"Document already exists: {reference.path}")
+                if op == 'update' and not exists:
+                    raise NotFound(f"No document to update: {reference.path}")
+
+            for op, reference, data, merge in writes:
+                store = self._store(reference._collection_name)
+                before = store.get(reference.id)
+                if op == 'delete':
+                    store.pop(reference.id, None)
+                elif op == 'update':
+                    document = copy.deepcopy(before)
+                    _update_paths(document, data)
+                    store[reference.id] = document
+                else:
+                    document = copy.deepcopy(before) if (merge and before is not None) else {}
+                    _merge(document, data)
+                    store[reference.id] = document
+                self._invalidate(reference._collection_name)
+                if reference._collection_name in watched:
+                    written.setdefault(reference._collection_name, {})[reference.id] = \
+                        copy.deepcopy(store.get(reference.id))
+            self.writes += len(writes)
+            watches = [w for w in self._watches if w._query._collection_name in written]
+
+        # Listenerele sunt notificate în afara lock-ului (callback-urile pot citi din client)
+        for watch in watches:
+            watch._notify(written[watch._query._collection_name].items())
+
+        return [MemoryAggregationResult('update_time', datetime.now()) for _ in writes]
@@ -0,0 +1,103 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from firebase_admin import firestore
+
+# Paginare keyset: interogările sunt ordonate descrescător după (câmp, ID document), iar pagina
+# următoare pornește cu `start_after([valoare, id])` de la ultimul element al paginii curente.
+# O pagină costă O(dimensiune pagină) citiri indiferent cât de departe în istoric se află.
+# Cursorii paginilor vizitate sunt păstrați într-o stivă în session_state (navigare înapoi).
+PAGE_SIZES = [25, 50, 100, 200]
+DEFAULT_PAGE_SIZE = 50
+FANOUT_WORKERS = 8
+MAX_SCAN_BATCHES = 20
+
+
+def _page_query(query, cursor, limit):
+    query = query.order_by('__name__', direction=firestore.Query.DESCENDING)
+    if cursor is not None:
+        query = query.start_after(list(cursor))
+    return query.limit(limit)
+
+
+def _merged(queries, order_field, cursor, limit):
+    """Primele `limit` documente după cursor din reuniunea interogărilor (k-way merge)"""
+    if not queries:
+        return []
+    if len(queries) == 1:
+        return list(_page_query(queries[0], cursor, limit).stream())
+    with ThreadPoolExecutor(max_workers=min(FANOUT_WORKERS, len(queries))) as executor:
+        pages = list(executor.map(lambda q: list(_page_query(q, cursor, limit).stream()), queries))
+    merged = heapq.merge(*pages, key=lambda snapshot: (snapshot.get(order_field), snapshot.id), reverse=True)
+    return [snapshot for _, snapshot in zip(range(limit), merged)]
+
+
+def _cursor(snapshot, order_field):
+    return snapshot.get(order_field), snapshot.id
+
+
+def fetch_page(queries, order_field, page_size, cursor=None, predicate=None):
+    """O pagină de rezultate și cursorul paginii următoare (None dacă nu mai există date).
+
+    Interogările trebuie să fie deja ordonate descrescător după `order_field`; ID-ul documentului
+    e adăugat ca al doilea criteriu. Cu `predicate` (filtru care nu poate fi exprimat în interogare)
+    se citesc loturi succesive până la umplerea paginii, cel mult MAX_SCAN_BATCHES loturi;
+    cursorul returnat continuă scanarea de unde a rămas.
+    """
+    queries = queries if isinstance(queries, (list, tuple)) else [queries]
+    if predicate is None:
+        batch = _merged(queries, order_field, cursor, page_size + 1)
+        items = batch[:page_size]
+        return items, _cursor(items[-1], order_field) if len(batch) > page_size else None
+
+    items = []
+    for _ in range(MAX_SCAN_BATCHES):
+        batch = _merged(queries, order_field, cursor, page_size)
+        for snapshot in batch:
+            cursor = _cursor(snapshot, order_field)
+            if predicate(snapshot):
+                items.append(snapshot)
+                if len(items) == page_size:
+                    return items, cursor
+        if len(batch) < page_size:
+            return items, None
+    return items, cursor
+
+
+def slice_page(items, page_size, cursor=None):
+    """Pagină dintr-o listă deja aflată în memorie (de ex. replica); cursorul e poziția de start"""
+    start = cursor or 0
+    end = start + page_size
+    return items[start:end], end if end < len(items) else None
+
+
+def pager(key, filters):
+    """Starea paginării pentru o listă; revine la prima pagină când se schimbă filtrele"""
+    state_key = f'{key}_pager'
+    state = st.session_state.get(state_key)
+    if state is None or state['filters'] != filters:
+        state = {'filters': filters, 'cursors': [None]}
+        st.session_state[state_key] = state
+    return state
+
+
+def page_size_select(key):
+    return st.selectbox("Rânduri pe pagină", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                        key=f'{key}_page_size')
+
+
+def page_nav(key, state, next_cursor):
+    """Butoanele Anterior/Următor; cursorii sunt împinși/scoși din stiva din session_state"""
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Anterior", key=f'{key}_prev', disabled=len(state['cursors']) == 1,
+                     use_container_width=True):
+            state['cursors'].pop()
+            st.rerun()
+    with col2:
+        st.markdown(f"<div style='text-align: center;'>Pagina {len(state['cursors'])}</div>",
+                    unsafe_allow_html=True)
+    with col3:
+        if st.button("Următor ➡️", key=f'{key}_next', disabled=next_cursor is None, use_container_width=True):
+            state['cursors'].append(next_cursor)
+            st.rerun()
@@ -0,0 +1,134 @@
+import atexit
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+# Rapoarte PDF complete (toate rândurile), randate într-un pool de procese separat de
+# thread-ul Streamlit. Tabelul de detaliu e împărțit în bucăți cu antet repetat pe fiecare
+# pagină, urmat de subtotaluri pe angajat și pe șantier. Progresul e publicat într-un
+# dicționar partajat (multiprocessing.Manager) citit de interfață.
+CHUNK_ROWS = 500
+WORKERS = 2
+DETAIL_HEADERS = ['Data', 'Angajat', 'Șantier', 'Ore', 'Status']
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F46E5')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+TOTAL_STYLE = TableStyle([
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#E0E7FF'))
+])
+
+_state = {}
+_lock = threading.Lock()
+
+
+def _table(headers, rows, total=None):
+    data = [headers] + [[str(value) for value in row] for row in rows]
+    if total is not None:
+        data.append([str(value) for value in total])
+    table = Table(data, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    if total is not None:
+        table.setStyle(TOTAL_STYLE)
+    return table
+
+
+def _subtotals(rows, index):
+    """(nume, zile, ore) pe coloana `index` (1 = angajat, 2 = șantier), ordonat după nume"""
+    days, hours = defaultdict(int), defaultdict(float)
+    for row in rows:
+        days[row[index]] += 1
+        hours[row[index]] += float(row[3] or 0)
+    return [(name, days[name], f"{hours[name]:.1f}") for name in sorted(days, key=str)]
+
+
+def build_pdf(path, title, rows, progress=None, job_id=None):
+    """Scrie în `path` raportul complet; `rows` sunt tupluri (data, angajat, șantier, ore, status)"""
+    def report(fraction):
+        if progress is not None:
+            progress[job_id] = fraction
+
+    styles = getSampleStyleSheet()
+    elements = [Paragraph(f"<b>{title}</b>", styles['Title']), Spacer(1, 12)]
+
+    for start in range(0, len(rows), CHUNK_ROWS):
+        elements.append(_table(DETAIL_HEADERS, rows[start:start + CHUNK_ROWS]))
+    if not rows:
+        elements.append(Paragraph("Nu există pontaje.", styles['Normal']))
+
+    total_hours = f"{sum(float(row[3] or 0) for row in rows):.1f}"
+    for label, index in [('Subtotal pe Angajat', 1), ('Subtotal pe Șantier', 2)]:
+        elements += [PageBreak(), Paragraph(f"<b>{label}</b>", styles['Heading2']), Spacer(1, 8)]
+        elements.append(_table([label.split()[-1], 'Zile', 'Ore'], _subtotals(rows, index),
+                               total=('Total', len(rows), total_hours)))
+    report(0.05)
+
+    # Estimarea reportlab (SIZE_EST) și progresul pe flowables, scalate în 5%..100%
+    estimate = {'size': max(len(elements), 1)}
+
+    def on_progress(kind, value):
+        if kind == 'SIZE_EST':
+            estimate['size'] = max(value, 1)
+        elif kind == 'PROGRESS':
+            report(0.05 + 0.95 * min(max(value, 0) / estimate['size'], 1.0))
+
+    doc = SimpleDocTemplate(path, pagesize=landscape(A4), title=title)
+    doc.setProgressCallBack(on_progress)
+    doc.build(elements)
+    report(1.0)
+    return path
+
+
+def _shutdown():
+    with _lock:
+        if 'pool' in _state:
+            _state.pop('pool').shutdown(wait=False, cancel_futures=True)
+        if 'manager' in _state:
+            _state.pop('manager').shutdown()
+
+
+def _runtime():
+    """Pool-ul de procese și dicționarul de progres partajat, create o singură dată per proces"""
+    with _lock:
+        if 'pool' not in _state:
+            # 'spawn': procesele copil nu moștenesc thread-urile serverului Streamlit
+            context = multiprocessing.get_context('spawn')
+            _state['manager'] = context.Manager()
+            _state['progress'] = _state['manager'].dict()
+            _state['pool'] = ProcessPoolExecutor(max_workers=WORKERS, mp_context=context)
+            atexit.register(_shutdown)
+        return _state['pool'], _state['progress']
+
+
+def render(path, title, rows, on_progress=None, poll_seconds=0.25):
+    """Randează PDF-ul în pool-ul de procese și așteaptă, raportând progresul (0..1) prin `on_progress`"""
+    pool, progress = _runtime()
+    job_id = uuid.uuid4().hex
+    progress[job_id] = 0.0
+    future = pool.submit(build_pdf, path, title, [tuple(row) for row in rows], progress, job_id)
+    try:
+        while not future.done():
+            if on_progress is not None:
+                on_progress(progress.get(job_id, 0.0))
+            time.sleep(poll_seconds)
+        future.result()
+        if on_progress is not None:
+            on_progress(1.0)
+    finally:
+        progress.pop(job_id, None)
+    return path
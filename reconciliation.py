@@ -0,0 +1,159 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import streamlit as st
+import timesheet_frame
+from reference_data import get_employee
+
+# Reconcilierea pontajelor cu asignările pentru o perioadă, pe coloane (pandas):
+#   - "lucrat fără asignare": pontaj prezent/remote fără asignare la acel șantier în acea zi
+#   - "asignat fără pontaj": zi lucrătoare (până azi) din asignare, fără niciun pontaj al angajatului
+# Șeful de șantier e angajatul cu rol "Șef Șantier" asignat la șantier în perioadă; altfel,
+# utilizatorul care a introdus cele mai multe pontaje pe șantier.
+RECONCILIATION_TTL = 300
+WORKED_STATUSES = ['present', 'remote']
+FOREMAN_ROLE = 'Șef Șantier'
+
+
+def load_assignments(db, period_start, period_end):
+    """Asignările care intersectează perioada, ca DataFrame cu capete închise ([start, end])"""
+    assignments = db.collection('assignments')
+    docs = list(assignments.where('end_date', '==', None).stream()) + \
+        list(assignments.where('end_date', '>=', period_start).stream())
+    rows = []
+    for doc in docs:
+        data = doc.to_dict()
+        start = data.get('start_date')
+        if not isinstance(start, datetime):
+            continue
+        end = data.get('end_date')
+        rows.append((doc.id, data.get('employee_id'), data.get('employee_name', 'N/A'),
+                     data.get('site_id'), data.get('site_name', 'N/A'),
+                     start.replace(tzinfo=None), end.replace(tzinfo=None) if isinstance(end, datetime) else None))
+    frame = pd.DataFrame(rows, columns=['assignment_id', 'employee_id', 'employee_name',
+                                        'site_id', 'site_name', 'start', 'end'])
+    frame['start'] = pd.to_datetime(frame['start']).dt.normalize()
+    frame['end'] = pd.to_datetime(frame['end']).dt.normalize().fillna(pd.Timestamp(period_end).normalize())
+    return frame[frame['start'] <= pd.Timestamp(period_end)].reset_index(drop=True)
+
+
+def worked_without_assignment(timesheets, assignments):
+    """Pontajele lucrate fără o asignare la același șantier care să acopere ziua"""
+    worked = timesheets[timesheets['status'].isin(WORKED_STATUSES)]
+    worked = pd.DataFrame({
+        'ts_id': worked.index.astype(str),
+        'employee_id': worked['employee_id'].astype(str).to_numpy(),
+        'employee_name': worked['employee_name'].astype(str).to_numpy(),
+        'site_id': worked['site_id'].astype(str).to_numpy(),
+        'site_name': worked['site_name'].astype(str).to_numpy(),
+        'day': worked['date'].dt.normalize().to_numpy(),
+        'hours': worked['hours'].astype(float).to_numpy()
+    })
+    joined = worked[['ts_id', 'employee_id', 'site_id', 'day']].merge(
+        assignments[['employee_id', 'site_id', 'start', 'end']].astype({'employee_id': str, 'site_id': str}),
+        on=['employee_id', 'site_id'], how='inner'
+    )
+    covered = joined.loc[(joined['start'] <= joined['day']) & (joined['day'] <= joined['end']), 'ts_id']
+    return worked[~worked['ts_id'].isin(covered)].reset_index(drop=True)
+
+
+def assigned_without_timesheet(timesheets, assignments, period_start, period_end):
+    """Zilele lucrătoare din asignări (până azi inclusiv) fără niciun pontaj al angajatului"""
+    last_day = min(pd.Timestamp(period_end).normalize(), pd.Timestamp(datetime.now().date()))
+    days = pd.bdate_range(pd.Timestamp(period_start).normalize(), last_day)
+    if assignments.empty or len(days) == 0:
+        return pd.DataFrame(columns=['employee_id', 'employee_name', 'site_id', 'site_name', 'day'])
+
+    # Produs asignări × zile lucrătoare, filtrat la intervalul fiecărei asignări
+    day_values = days.to_numpy()
+    repeat = len(day_values)
+    expanded = pd.DataFrame({
+        'employee_id': np.repeat(assignments['employee_id'].astype(str).to_numpy(), repeat),
+        'employee_name': np.repeat(assignments['employee_name'].to_numpy(), repeat),
+        'site_id': np.repeat(assignments['site_id'].astype(str).to_numpy(), repeat),
+        'site_name': np.repeat(assignments['site_name'].to_numpy(), repeat),
+        'start': np.repeat(assignments['start'].to_numpy(), repeat),
+        'end': np.repeat(assignments['end'].to_numpy(), repeat),
+        'day': np.tile(day_values, len(assignments))
+    })
+    expanded = expanded[(expanded['start'] <= expanded['day']) & (expanded['day'] <= expanded['end'])]
+
+    recorded = pd.MultiIndex.from_arrays([timesheets['employee_id'].astype(str).to_numpy(),
+                                          timesheets['date'].dt.normalize().to_numpy()])
+    keys = pd.MultiIndex.from_arrays([expanded['employee_id'].to_numpy(), expanded['day'].to_numpy()])
+    missing = expanded[~keys.isin(recorded)]
+    return missing.drop(columns=['start', 'end']).drop_duplicates(['employee_id', 'day']).reset_index(drop=True)
+
+
+def foremen(db, assignments, timesheets):
+    """Șeful de șantier pentru fiecare site_id (roluri din datele de referință, apoi autorul pontajelor)"""
+    names = {}
+    for employee_id, employee_name, site_id in zip(assignments['employee_id'], assignments['employee_name'],
+                                                   assignments['site_id']):
+        employee = get_employee(db, employee_id)
+        if employee and employee.get('role') == FOREMAN_ROLE:
+            names.setdefault(str(site_id), set()).add(employee_name)
+    result = {site_id: ', '.join(sorted(site_names)) for site_id, site_names in names.items()}
+
+    authors = timesheets.groupby('site_id', observed=True)['created_by'].agg(
+        lambda values: values.value_counts().index[0])
+    for site_id, author in authors.items():
+        result.setdefault(str(site_id), str(author))
+    return result
+
+
+def reconcile(db, period_start, period_end):
+    """Rezultatele reconcilierii pentru perioada [period_start, period_end]"""
+    period_start = datetime.combine(period_start, datetime.min.time())
+    period_end = datetime.combine(period_end, datetime.max.time())
+
+    timesheets = timesheet_frame.load(db.collection('timesheets')
+                                      .where('date', '>=', period_start)
+                                      .where('date', '<=', period_end))
+    assignments = load_assignments(db, period_start, period_end)
+
+    unassigned = worked_without_assignment(timesheets, assignments)
+    missing = assigned_without_timesheet(timesheets, assignments, period_start, period_end)
+    site_foremen = foremen(db, assignments, timesheets)
+    unassigned['foreman'] = unassigned['site_id'].map(site_foremen).fillna('-')
+    missing['foreman'] = missing['site_id'].map(site_foremen).fillna('-')
+
+    # Sumar pe șantier și șef de șantier
+    keys = ['site_name', 'foreman']
+    summary = pd.concat([
+        unassigned.groupby(keys).size().rename('Lucrat fără asignare'),
+        missing.groupby(keys).size().rename('Asignat fără pontaj')
+    ], axis=1).fillna(0).astype(int).reset_index()\
+        .rename(columns={'site_name': 'Șantier', 'foreman': 'Șef Șantier'})\
+        .sort_values(['Lucrat fără asignare', 'Asignat fără pontaj'], ascending=False)
+
+    return {
+        'summary': summary,
+        'worked_without_assignment': pd.DataFrame({
+            'Șantier': unassigned['site_name'],
+            'Șef Șantier': unassigned['foreman'],
+            'Angajat': unassigned['employee_name'],
+            'Data': pd.to_datetime(unassigned['day']).dt.strftime('%d.%m.%Y'),
+            'Ore': unassigned['hours']
+        }),
+        'assigned_without_timesheet': pd.DataFrame({
+            'Șantier': missing['site_name'],
+            'Șef Șantier': missing['foreman'],
+            'Angajat': missing['employee_name'],
+            'Data': pd.to_datetime(missing['day']).dt.strftime('%d.%m.%Y')
+        })
+    }
+
+
+@st.cache_data(ttl=RECONCILIATION_TTL, show_spinner=False)
+def _cached(_db, period_start, period_end):
+    return reconcile(_db, period_start, period_end)
+
+
+def get_reconciliation(db, period_start, period_end):
+    """Reconcilierea perioadei, din cache (per interval) cu TTL scurt"""
+    return _cached(db, period_start, period_end)
+
+
+def invalidate():
+    _cached.clear()
@@ -0,0 +1,27 @@
+import replica
+
+# Date de referință (angajați, șantiere) citite din replica în memorie a procesului,
+# ținută la zi de listenerele Firestore (vezi replica.py). Scrierile din pagini se
+# aplică local prin replica.upsert()/replica.remove().
+
+
+def get_employees(db, active_only=True):
+    """Hartă id → nume complet pentru angajați (implicit doar cei activi)"""
+    return {emp['id']: emp['full_name'] or '' for emp in
+            replica.records(db, 'employees', active=True if active_only else None)}
+
+
+def get_sites(db, active_only=True):
+    """Hartă id → nume pentru șantiere (implicit doar cele active)"""
+    return {site['id']: site['name'] or '' for site in
+            replica.records(db, 'sites', active=True if active_only else None)}
+
+
+def get_employee(db, employee_id):
+    """Returnează datele unui angajat (nume, rol, activ, contact) sau None"""
+    return replica.get(db, 'employees', employee_id)
+
+
+def get_site(db, site_id):
+    """Returnează datele unui șantier (nume, locație, activ) sau None"""
+    return replica.get(db, 'sites', site_id)
@@ -0,0 +1,172 @@
+import sys
+import threading
+from collections import namedtuple
+import search_index
+
+# Replică în memorie a colecțiilor mici (angajați, șantiere, asignări active), comună tuturor
+# sesiunilor Streamlit din proces. Fiecare tabel e încărcat o singură dată de un listener
+# on_snapshot și ținut la zi de modificările primite de la Firestore (o citire per document
+# modificat), deci paginile văd scrierile altor sesiuni/noduri fără reîncărcări periodice.
+# Înregistrările sunt tupluri cu numele de câmpuri (namedtuple); șirurile sunt internate.
+# Scrierile din proces sunt aplicate imediat și local prin upsert()/remove(), ca pagina
+# reîncărcată după st.rerun() să le vadă chiar înainte de notificarea listenerului.
+# Fiecare tabel întreține incremental un index de trigrame (search_index.py) pentru căutare.
+SNAPSHOT_TIMEOUT = 30
+
+# colecție → (câmpuri păstrate, câmpuri indexate pentru căutare, filtru pe interogare)
+TABLES = {
+    'employees': (['full_name', 'role', 'email', 'phone', 'active'], ['full_name', 'email', 'phone'], None),
+    'sites': (['name', 'location', 'active'], ['name', 'location'], None),
+    'assignments': (['employee_id', 'employee_name', 'site_id', 'site_name', 'start_date', 'end_date'],
+                    ['employee_name', 'site_name'], ('end_date', '==', None))
+}
+
+_state = {}
+_lock = threading.Lock()
+
+
+def _compact(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Table:
+    def __init__(self, name, fields, search_fields, query_filter):
+        self.name = name
+        self.query_filter = query_filter
+        self._record = namedtuple(f'{name.capitalize()}Record', ['id'] + fields)
+        self._defaults = {field: None for field in fields}
+        self._rows = {}
+        self._index = search_index.TrigramIndex(search_fields)
+        self._lock = threading.Lock()
+        self._watch = None
+        self.ready = threading.Event()
+
+    def _accepts(self, data):
+        if self.query_filter is None:
+            return True
+        field, _, value = self.query_filter
+        return data.get(field) == value
+
+    def _pack(self, doc_id, data):
+        values = {**self._defaults, **{k: _compact(v) for k, v in data.items() if k in self._defaults}}
+        return self._record(id=doc_id, **values)
+
+    def on_snapshot(self, docs, changes, read_time):
+        with self._lock:
+            for change in changes:
+                document = change.document
+                if change.type.name == 'REMOVED':
+                    self._drop(document.id)
+                else:
+                    self._store(self._pack(document.id, document.to_dict()))
+        self.ready.set()
+
+    def _store(self, row):
+        self._rows[row.id] = row
+        self._index.add(row.id, row._asdict())
+
+    def _drop(self, doc_id):
+        self._rows.pop(doc_id, None)
+        self._index.remove(doc_id)
+
+    def start(self, db):
+        query = db.collection(self.name)
+        if self.query_filter is not None:
+            query = query.where(*self.query_filter)
+        self._watch = query.on_snapshot(self.on_snapshot)
+        if not self.ready.wait(SNAPSHOT_TIMEOUT):
+            raise TimeoutError(f"Replica {self.name}: snapshot-ul inițial nu a sosit în {SNAPSHOT_TIMEOUT}s")
+
+    @property
+    def alive(self):
+        return self._watch is not None and not getattr(self._watch, '_closed', False)
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+
+    def upsert(self, doc_id, data):
+        with self._lock:
+            current = self._rows.get(doc_id)
+            merged = {**(current._asdict() if current else {}), **data}
+            if self._accepts(merged):
+                self._store(self._pack(doc_id, merged))
+            else:
+                self._drop(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._drop(doc_id)
+
+    def get(self, doc_id):
+        return self._rows.get(doc_id)
+
+    def records(self):
+        with self._lock:
+            return list(self._rows.values())
+
+    def search(self, text, fields=None, limit=None):
+        with self._lock:
+            return [self._rows[doc_id] for doc_id in self._index.search(text, fields, limit)]
+
+
+def _as_dict(row):
+    # Câmpurile lipsă rămân absente, ca în documentele Firestore (data.get(câmp, implicit))
+    return {field: value for field, value in row._asdict().items() if value is not None}
+
+
+def _is_active(row):
+    # Lipsa câmpului `active` înseamnă activ; asignările replicate sunt toate în curs
+    return getattr(row, 'active', True) is not False
+
+
+def _table(db, name):
+    """Tabelul replicat al colecției, pornind listenerul la prima folosire (sau dacă s-a oprit)"""
+    key = (id(db), name)
+    with _lock:
+        table = _state.get(key)
+        if table is None or not table.alive:
+            if table is not None:
+                table.stop()
+            table = _Table(name, *TABLES[name])
+            table.start(db)
+            _state[key] = table
+        return table
+
+
+def get(db, collection, doc_id):
+    """Înregistrarea cu ID-ul dat ca dict (cu cheia 'id') sau None"""
+    record = _table(db, collection).get(doc_id)
+    return _as_dict(record) if record else None
+
+
+def records(db, collection, active=None, search=None, fields=None, limit=None):
+    """Înregistrările colecției ca dict-uri, filtrate după `active` și textul căutat.
+
+    Căutarea e pe subșir, fără diferență de majuscule și diacritice, în câmpurile indexate ale
+    colecției (sau doar în `fields`); rezultatele sunt ordonate după relevanță, primele `limit`.
+    """
+    table = _table(db, collection)
+    rows = table.search(search, fields, None if active is not None else limit) if search else table.records()
+    if active is not None:
+        rows = [row for row in rows if _is_active(row) == active]
+    rows = rows[:limit] if limit is not None else rows
+    return [_as_dict(row) for row in rows]
+
+
+def upsert(db, collection, doc_id, data):
+    """Aplică local o scriere făcută de acest proces (date complete sau parțiale, ca la update)"""
+    _table(db, collection).upsert(doc_id, data)
+
+
+def remove(db, collection, doc_id):
+    """Aplică local o ștergere făcută de acest proces"""
+    _table(db, collection).remove(doc_id)
+
+
+def stop():
+    """Oprește toate listenerele (de exemplu la închiderea procesului sau în teste)"""
+    with _lock:
+        for table in _state.values():
+            table.stop()
+        _state.clear()
@@ -1,130 +1,77 @@
 import streamlit as st
-from firebase_admin import firestore
-import pandas as pd
 from datetime import datetime, timedelta
-from io import BytesIO
-import xlsxwriter
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from backend import get_db
+from sections import section_nav, section_timing
+from reference_data import get_employees, get_sites
+import timesheet_frame
+import timesheet_query
+import export_cache
+import excel_export
+import pdf_export
+import reconciliation
 
 if 'user' not in st.session_state or st.session_state.user is None:
     st.warning("⚠️ Vă rugăm să vă autentificați")
     st.stop()
 
-db = firestore.client()
+db = get_db()
 
 st.title("📊 Rapoarte și Export")
 
-tab1, tab2, tab3 = st.tabs(["📅 Raport Săptămânal", "📆 Raport Lunar", "📈 Rapoarte Personalizate"])
+TABS = ["📅 Raport Săptămânal", "📆 Raport Lunar", "📈 Rapoarte Personalizate", "🔎 Reconciliere"]
+active_tab = section_nav('reports_section', TABS)
 
-def generate_excel(timesheets_data, aggregates_data, absences_data, title):
-    """Generează fișier Excel cu multiple sheet-uri"""
-    output = BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-    
-    # Formatare
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#4F46E5',
-        'font_color': 'white',
-        'border': 1
-    })
-    
-    cell_format = workbook.add_format({
-        'border': 1
-    })
-    
-    # Sheet 1: Pontaje Detaliate
-    worksheet1 = workbook.add_worksheet('Pontaje Detaliate')
-    
-    headers1 = ['Data', 'Angajat', 'Șantier', 'Ore', 'Status', 'Observații']
-    for col, header in enumerate(headers1):
-        worksheet1.write(0, col, header, header_format)
-    
-    for row, ts in enumerate(timesheets_data, start=1):
-        worksheet1.write(row, 0, ts.get('date', ''), cell_format)
-        worksheet1.write(row, 1, ts.get('employee_name', ''), cell_format)
-        worksheet1.write(row, 2, ts.get('site_name', ''), cell_format)
-        worksheet1.write(row, 3, ts.get('hours', 0), cell_format)
-        worksheet1.write(row, 4, ts.get('status', ''), cell_format)
-        worksheet1.write(row, 5, ts.get('note', ''), cell_format)
-    
-    # Sheet 2: Agregare
-    worksheet2 = workbook.add_worksheet('Agregare')
-    
-    headers2 = ['Angajat', 'Șantier', 'Status', 'Total Ore']
-    for col, header in enumerate(headers2):
-        worksheet2.write(0, col, header, header_format)
-    
-    for row, agg in enumerate(aggregates_data, start=1):
-        worksheet2.write(row, 0, agg.get('employee', ''), cell_format)
-        worksheet2.write(row, 1, agg.get('site', ''), cell_format)
-        worksheet2.write(row, 2, agg.get('status', ''), cell_format)
-        worksheet2.write(row, 3, agg.get('hours', 0), cell_format)
-    
-    # Sheet 3: Absențe
-    worksheet3 = workbook.add_worksheet('Absențe')
-    
-    headers3 = ['Angajat', 'Tip Absență', 'Număr Zile']
-    for col, header in enumerate(headers3):
-        worksheet3.write(0, col, header, header_format)
-    
-    for row, abs_data in enumerate(absences_data, start=1):
-        worksheet3.write(row, 0, abs_data.get('employee', ''), cell_format)
-        worksheet3.write(row, 1, abs_data.get('type', ''), cell_format)
-        worksheet3.write(row, 2, abs_data.get('count', 0), cell_format)
-    
-    workbook.close()
-    output.seek(0)
+def generate_excel(timesheets_data, aggregates_data, absences_data, title, output):
+    """Generează fișierul Excel `output` cu multiple sheet-uri (scriere în flux, memorie constantă)"""
+    excel_export.write_workbook(output, [
+        ('Pontaje Detaliate', excel_export.DETAIL_HEADERS,
+         ((ts.get('date', ''), ts.get('employee_name', ''), ts.get('site_name', ''),
+           ts.get('hours', 0), ts.get('status', ''), ts.get('note', '')) for ts in timesheets_data)),
+        ('Agregare', excel_export.AGGREGATE_HEADERS,
+         ((agg.get('employee', ''), agg.get('site', ''), agg.get('status', ''), agg.get('hours', 0))
+          for agg in aggregates_data)),
+        ('Absențe', excel_export.ABSENCE_HEADERS,
+         ((abs_data.get('employee', ''), abs_data.get('type', ''), abs_data.get('count', 0))
+          for abs_data in absences_data))
+    ])
     return output
 
-def generate_pdf(timesheets_data, title):
-    """Generează fișier PDF"""
-    output = BytesIO()
-    doc = SimpleDocTemplate(output, pagesize=landscape(A4))
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Titlu
-    title_para = Paragraph(f"<b>{title}</b>", styles['Title'])
-    elements.append(title_para)
-    elements.append(Spacer(1, 12))
-    
-    # Tabel
-    table_data = [['Data', 'Angajat', 'Șantier', 'Ore', 'Status']]
-    
-    for ts in timesheets_data[:100]:  # Limitare la 100 rânduri pentru PDF
-        table_data.append([
-            ts.get('date', ''),
-            ts.get('employee_name', ''),
-            ts.get('site_name', ''),
-            str(ts.get('hours', 0)),
-            ts.get('status', '')
-        ])
-    
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F46E5')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
-    
-    output.seek(0)
+def generate_pdf(timesheets_data, title, output):
+    """Generează fișierul PDF `output` complet (în pool-ul de procese), cu bară de progres"""
+    progress_bar = st.progress(0.0, text="Se generează PDF-ul...")
+    pdf_export.render(
+        output, title,
+        [(ts.get('date', ''), ts.get('employee_name', ''), ts.get('site_name', ''),
+          ts.get('hours', 0), ts.get('status', '')) for ts in timesheets_data],
+        on_progress=lambda fraction: progress_bar.progress(fraction, text=f"Se generează PDF-ul... {fraction:.0%}")
+    )
+    progress_bar.empty()
     return output
 
-with tab1:
+EXPORT_FORMATS = {
+    'excel': ('.xlsx', "📊 Descarcă Excel (.xlsx)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    'pdf': ('.pdf', "📄 Descarcă PDF", "application/pdf")
+}
+
+def export_button(fmt, cache_key, file_name, build):
+    """Export generat doar la cerere și servit din cache-ul de pe disc la descărcările ulterioare"""
+    suffix, label, mime = EXPORT_FORMATS[fmt]
+    path = export_cache.lookup(cache_key, suffix)
+    if path is None:
+        if not st.button(f"⚙️ Pregătește {label.split(' ', 1)[1]}", key=f"prepare_{cache_key}", use_container_width=True):
+            return
+        with st.spinner("Se generează fișierul..."):
+            path = export_cache.get_or_create(cache_key, suffix, build)
+    st.download_button(
+        label=label,
+        data=export_cache.read(path),
+        file_name=file_name,
+        mime=mime,
+        key=f"download_{cache_key}",
+        use_container_width=True
+    )
+
+if active_tab == TABS[0]:
     st.subheader("📅 Raport Săptămânal")
     
     # Selectare săptămână
@@ -140,93 +87,49 @@ with tab1:
     week_start_dt = datetime.combine(week_start, datetime.min.time())
     week_end_dt = datetime.combine(week_end, datetime.max.time())
     
-    # Obținere pontaje
-    timesheets = list(db.collection('timesheets')\
-                     .where('date', '>=', week_start_dt)\
-                     .where('date', '<=', week_end_dt)\
-                     .stream())
+    # Obținere pontaje (o singură conversie în DataFrame)
+    frame = timesheet_frame.load(db.collection('timesheets')\
+                                 .where('date', '>=', week_start_dt)\
+                                 .where('date', '<=', week_end_dt))
     
-    if timesheets:
-        st.success(f"✅ Găsite {len(timesheets)} pontaje")
+    if not frame.empty:
+        st.success(f"✅ Găsite {len(frame)} pontaje")
         
         # Statistici
         col1, col2, col3, col4 = st.columns(4)
         
-        total_hours = sum(ts.to_dict().get('hours', 0) for ts in timesheets)
-        present_count = len([ts for ts in timesheets if ts.to_dict().get('status') == 'present'])
-        absent_count = len([ts for ts in timesheets if ts.to_dict().get('status') in ['absent', 'medical', 'leave']])
-        unique_employees = len(set(ts.to_dict().get('employee_id') for ts in timesheets))
+        stats = timesheet_frame.summary(frame)
         
         with col1:
-            st.metric("Ore Totale", f"{total_hours:.0f}h")
+            st.metric("Ore Totale", f"{stats['total_hours']:.0f}h")
         with col2:
-            st.metric("Zile Prezent", present_count)
+            st.metric("Zile Prezent", stats['present'])
         with col3:
-            st.metric("Absențe", absent_count)
+            st.metric("Absențe", stats['absences'])
         with col4:
-            st.metric("Angajați", unique_employees)
+            st.metric("Angajați", stats['employees'])
         
         # Pregătire date pentru tabel
-        timesheets_data = []
-        for ts in timesheets:
-            data = ts.to_dict()
-            timesheets_data.append({
-                'date': data['date'].strftime('%d.%m.%Y') if isinstance(data['date'], datetime) else 'N/A',
-                'employee_name': data.get('employee_name', 'N/A'),
-                'site_name': data.get('site_name', 'N/A'),
-                'hours': data.get('hours', 0),
-                'status': data.get('status', 'N/A'),
-                'note': data.get('note', '')
-            })
-        
-        df = pd.DataFrame(timesheets_data)
+        df = timesheet_frame.table(frame)
+        timesheets_data = df.to_dict('records')
         st.dataframe(df, use_container_width=True, hide_index=True)
         
         # Agregare
         st.markdown("---")
         st.subheader("📊 Agregare (Angajat × Șantier × Status)")
         
-        aggregates = {}
-        for ts in timesheets:
-            data = ts.to_dict()
-            key = (data.get('employee_name'), data.get('site_name'), data.get('status'))
-            if key not in aggregates:
-                aggregates[key] = 0
-            aggregates[key] += data.get('hours', 0)
-        
-        aggregates_data = []
-        for (emp, site, status), hours in aggregates.items():
-            aggregates_data.append({
-                'employee': emp,
-                'site': site,
-                'status': status,
-                'hours': hours
-            })
-        
-        df_agg = pd.DataFrame(aggregates_data)
+        df_agg = timesheet_frame.aggregates(frame)
+        aggregates_data = df_agg.to_dict('records')
         st.dataframe(df_agg, use_container_width=True, hide_index=True)
         
         # Absențe
         st.markdown("---")
         st.subheader("🏥 Absențe și Concedii")
         
-        absences = {}
-        for ts in timesheets:
-            data = ts.to_dict()
-            if data.get('status') in ['absent', 'medical', 'leave']:
-                key = (data.get('employee_name'), data.get('status'))
-                absences[key] = absences.get(key, 0) + 1
-        
-        absences_data = []
-        for (emp, abs_type), count in absences.items():
-            absences_data.append({
-                'employee': emp,
-                'type': {'absent': 'Absent', 'medical': 'Concediu Medical', 'leave': 'Concediu'}[abs_type],
-                'count': count
-            })
+        df_abs = timesheet_frame.absences(frame)
+        absences_data = df_abs.to_dict('records')
         
         if absences_data:
-            df_abs = pd.DataFrame(absences_data)
             st.dataframe(df_abs, use_container_width=True, hide_index=True)
         else:
             st.info("✅ Nu există absențe în această săptămână")
@@ -237,31 +140,27 @@ with tab1:
         
         col1, col2 = st.columns(2)
         
+        title = f"Raport Săptămânal {week_start.strftime('%d.%m.%Y')}-{week_end.strftime('%d.%m.%Y')}"
+        file_stem = f"raport_saptamanal_{week_start.strftime('%Y%m%d')}_{week_end.strftime('%Y%m%d')}"
+        data_version = timesheet_frame.version(frame)
+        
         with col1:
-            excel_file = generate_excel(timesheets_data, aggregates_data, absences_data, 
-                                       f"Raport Săptămânal {week_start.strftime('%d.%m.%Y')}-{week_end.strftime('%d.%m.%Y')}")
-            st.download_button(
-                label="📊 Descarcă Excel (.xlsx)",
-                data=excel_file,
-                file_name=f"raport_saptamanal_{week_start.strftime('%Y%m%d')}_{week_end.strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
+            export_button('excel',
+                          export_cache.content_key(fmt='excel', report='weekly', start=week_start, end=week_end,
+                                                   version=data_version),
+                          f"{file_stem}.xlsx",
+                          lambda path: generate_excel(timesheets_data, aggregates_data, absences_data, title, output=path))
         
         with col2:
-            pdf_file = generate_pdf(timesheets_data, 
-                                   f"Raport Săptămânal {week_start.strftime('%d.%m.%Y')}-{week_end.strftime('%d.%m.%Y')}")
-            st.download_button(
-                label="📄 Descarcă PDF",
-                data=pdf_file,
-                file_name=f"raport_saptamanal_{week_start.strftime('%Y%m%d')}_{week_end.strftime('%Y%m%d')}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
+            export_button('pdf',
+                          export_cache.content_key(fmt='pdf', report='weekly', start=week_start, end=week_end,
+                                                   version=data_version),
+                          f"{file_stem}.pdf",
+                          lambda path: generate_pdf(timesheets_data, title, output=path))
     else:
         st.warning("⚠️ Nu există pontaje pentru această săptămână")
 
-with tab2:
+elif active_tab == TABS[1]:
     st.subheader("📆 Raport Lunar")
     
     col1, col2 = st.columns(2)
@@ -283,42 +182,31 @@ with tab2:
     st.info(f"📅 Luna selectată: {month_start.strftime('%B %Y')}")
     
     # Obținere pontaje lunare
-    timesheets = list(db.collection('timesheets')\
-                     .where('date', '>=', month_start)\
-                     .where('date', '<=', month_end)\
-                     .stream())
+    frame = timesheet_frame.load(db.collection('timesheets')\
+                                 .where('date', '>=', month_start)\
+                                 .where('date', '<=', month_end))
     
-    if timesheets:
-        st.success(f"✅ Găsite {len(timesheets)} pontaje")
+    if not frame.empty:
+        st.success(f"✅ Găsite {len(frame)} pontaje")
         
         # Statistici lunare
         col1, col2, col3, col4 = st.columns(4)
         
-        total_hours = sum(ts.to_dict().get('hours', 0) for ts in timesheets)
-        working_days = len(set(ts.to_dict()['date'].date() for ts in timesheets if isinstance(ts.to_dict()['date'], datetime)))
-        unique_employees = len(set(ts.to_dict().get('employee_id') for ts in timesheets))
-        absent_count = len([ts for ts in timesheets if ts.to_dict().get('status') in ['absent', 'medical', 'leave']])
+        stats = timesheet_frame.summary(frame)
         
         with col1:
-            st.metric("Ore Totale", f"{total_hours:.0f}h")
+            st.metric("Ore Totale", f"{stats['total_hours']:.0f}h")
         with col2:
-            st.metric("Zile Lucrate", working_days)
+            st.metric("Zile Lucrate", stats['working_days'])
         with col3:
-            st.metric("Angajați Activi", unique_employees)
+            st.metric("Angajați Activi", stats['employees'])
         with col4:
-            st.metric("Total Absențe", absent_count)
+            st.metric("Total Absențe", stats['absences'])
         
         # Grafic evoluție zilnică
         import plotly.express as px
         
-        daily_hours = {}
-        for ts in timesheets:
-            data = ts.to_dict()
-            date_str = data['date'].strftime('%Y-%m-%d') if isinstance(data['date'], datetime) else 'N/A'
-            daily_hours[date_str] = daily_hours.get(date_str, 0) + data.get('hours', 0)
-        
-        df_daily = pd.DataFrame(list(daily_hours.items()), columns=['Data', 'Ore'])
-        df_daily = df_daily.sort_values('Data')
+        df_daily = timesheet_frame.daily_hours(frame)
         
         fig = px.line(df_daily, x='Data', y='Ore', title='Evoluție Ore Lucrate (zilnic)',
                      markers=True)
@@ -326,40 +214,13 @@ with tab2:
         st.plotly_chart(fig, use_container_width=True)
         
         # Pregătire date pentru export
-        timesheets_data = []
-        for ts in timesheets:
-            data = ts.to_dict()
-            timesheets_data.append({
-                'date': data['date'].strftime('%d.%m.%Y') if isinstance(data['date'], datetime) else 'N/A',
-                'employee_name': data.get('employee_name', 'N/A'),
-                'site_name': data.get('site_name', 'N/A'),
-                'hours': data.get('hours', 0),
-                'status': data.get('status', 'N/A'),
-                'note': data.get('note', '')
-            })
+        timesheets_data = timesheet_frame.table(frame).to_dict('records')
         
         # Agregare lunară
-        aggregates = {}
-        for ts in timesheets:
-            data = ts.to_dict()
-            key = (data.get('employee_name'), data.get('site_name'), data.get('status'))
-            if key not in aggregates:
-                aggregates[key] = 0
-            aggregates[key] += data.get('hours', 0)
-        
-        aggregates_data = [{'employee': emp, 'site': site, 'status': status, 'hours': hours}
-                          for (emp, site, status), hours in aggregates.items()]
+        aggregates_data = timesheet_frame.aggregates(frame).to_dict('records')
         
         # Absențe
-        absences = {}
-        for ts in timesheets:
-            data = ts.to_dict()
-            if data.get('status') in ['absent', 'medical', 'leave']:
-                key = (data.get('employee_name'), data.get('status'))
-                absences[key] = absences.get(key, 0) + 1
-        
-        absences_data = [{'employee': emp, 'type': abs_type, 'count': count}
-                        for (emp, abs_type), count in absences.items()]
+        absences_data = timesheet_frame.absences(frame).to_dict('records')
         
         # Export
         st.markdown("---")
@@ -367,30 +228,27 @@ with tab2:
         
         col1, col2 = st.columns(2)
         
+        title = f"Raport Lunar {month_start.strftime('%B %Y')}"
+        file_stem = f"raport_lunar_{selected_year}_{selected_month:02d}"
+        data_version = timesheet_frame.version(frame)
+        
         with col1:
-            excel_file = generate_excel(timesheets_data, aggregates_data, absences_data,
-                                       f"Raport Lunar {month_start.strftime('%B %Y')}")
-            st.download_button(
-                label="📊 Descarcă Excel (.xlsx)",
-                data=excel_file,
-                file_name=f"raport_lunar_{selected_year}_{selected_month:02d}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
+            export_button('excel',
+                          export_cache.content_key(fmt='excel', report='monthly', start=month_start, end=month_end,
+                                                   version=data_version),
+                          f"{file_stem}.xlsx",
+                          lambda path: generate_excel(timesheets_data, aggregates_data, absences_data, title, output=path))
         
         with col2:
-            pdf_file = generate_pdf(timesheets_data, f"Raport Lunar {month_start.strftime('%B %Y')}")
-            st.download_button(
-                label="📄 Descarcă PDF",
-                data=pdf_file,
-                file_name=f"raport_lunar_{selected_year}_{selected_month:02d}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
+            export_button('pdf',
+                          export_cache.content_key(fmt='pdf', report='monthly', start=month_start, end=month_end,
+                                                   version=data_version),
+                          f"{file_stem}.pdf",
+                          lambda path: generate_pdf(timesheets_data, title, output=path))
     else:
         st.warning("⚠️ Nu există pontaje pentru această lună")
 
-with tab3:
+elif active_tab == TABS[2]:
     st.subheader("📈 Rapoarte Personalizate")
     
     st.info("💡 Personalizați intervalul și filtrele pentru rapoarte custom")
@@ -402,61 +260,102 @@ with tab3:
         date_to = st.date_input("Până la data", value=datetime.now())
     
     # Filtre suplimentare
-    employees = {emp.id: emp.to_dict()['full_name'] 
-                for emp in db.collection('employees').where('active', '==', True).stream()}
-    sites = {site.id: site.to_dict()['name'] 
-            for site in db.collection('sites').where('active', '==', True).stream()}
+    employees = get_employees(db)
+    sites = get_sites(db)
     
     filter_employee = st.multiselect("Filtrează după angajați", options=list(employees.values()))
     filter_site = st.multiselect("Filtrează după șantiere", options=list(sites.values()))
     
+    report_params = (date_from, date_to, tuple(filter_employee), tuple(filter_site))
     if st.button("🔍 Generează Raport", use_container_width=True, type="primary"):
+        st.session_state.custom_report = report_params
+    
+    # Raportul rămâne afișat la reruns (ex: pregătirea exportului) cât timp filtrele nu se schimbă
+    if st.session_state.get('custom_report') == report_params:
         date_from_dt = datetime.combine(date_from, datetime.min.time())
         date_to_dt = datetime.combine(date_to, datetime.max.time())
         
-        timesheets = list(db.collection('timesheets')\
-                         .where('date', '>=', date_from_dt)\
-                         .where('date', '<=', date_to_dt)\
-                         .stream())
+        # Filtrele pe angajați/șantiere sunt aplicate în interogări (după ID)
+        queries = timesheet_query.build_queries(
+            db, date_from=date_from_dt, date_to=date_to_dt,
+            employee_ids=timesheet_query.ids_for_names(employees, filter_employee) if filter_employee else None,
+            site_ids=timesheet_query.ids_for_names(sites, filter_site) if filter_site else None
+        )
+        filtered = timesheet_frame.from_snapshots(timesheet_query.fetch(queries))
         
-        # Aplicare filtre
-        filtered = []
-        for ts in timesheets:
-            data = ts.to_dict()
-            if filter_employee and data.get('employee_name') not in filter_employee:
-                continue
-            if filter_site and data.get('site_name') not in filter_site:
-                continue
-            filtered.append(data)
-        
-        if filtered:
+        if not filtered.empty:
             st.success(f"✅ Găsite {len(filtered)} pontaje")
             
             # Statistici
-            total_hours = sum(ts.get('hours', 0) for ts in filtered)
-            st.metric("Ore Totale", f"{total_hours:.0f}h")
+            st.metric("Ore Totale", f"{timesheet_frame.summary(filtered)['total_hours']:.0f}h")
             
             # Tabel
-            timesheets_data = [{
-                'date': ts['date'].strftime('%d.%m.%Y') if isinstance(ts['date'], datetime) else 'N/A',
-                'employee_name': ts.get('employee_name', 'N/A'),
-                'site_name': ts.get('site_name', 'N/A'),
-                'hours': ts.get('hours', 0),
-                'status': ts.get('status', 'N/A'),
-                'note': ts.get('note', '')
-            } for ts in filtered]
-            
-            df = pd.DataFrame(timesheets_data)
+            df = timesheet_frame.table(filtered)
             st.dataframe(df, use_container_width=True, hide_index=True)
             
             # Export
-            excel_file = generate_excel(timesheets_data, [], [],
-                                       f"Raport Personalizat {date_from.strftime('%d.%m.%Y')}-{date_to.strftime('%d.%m.%Y')}")
-            st.download_button(
-                label="📊 Descarcă Excel (.xlsx)",
-                data=excel_file,
-                file_name=f"raport_custom_{date_from.strftime('%Y%m%d')}_{date_to.strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            export_button('excel',
+                          export_cache.content_key(fmt='excel', report='custom', start=date_from, end=date_to,
+                                                   employees=sorted(filter_employee), sites=sorted(filter_site),
+                                                   version=timesheet_frame.version(filtered)),
+                          f"raport_custom_{date_from.strftime('%Y%m%d')}_{date_to.strftime('%Y%m%d')}.xlsx",
+                          lambda path: excel_export.export_timesheets(
+                              path, excel_export.timesheet_rows(timesheet_query.stream(queries))))
         else:
             st.warning("⚠️ Nu s-au găsit pontaje conform criteriilor")
+
+elif active_tab == TABS[3]:
+    st.subheader("🔎 Reconciliere Pontaje - Asignări")
+    
+    st.info("💡 Pontaje lucrate fără asignare la șantier și zile lucrătoare asignate fără pontaj")
+    
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        date_from = st.date_input("De la data", value=datetime.now().replace(day=1), key='reconciliation_from')
+    with col2:
+        date_to = st.date_input("Până la data", value=datetime.now(), key='reconciliation_to')
+    with col3:
+        st.write("")
+        if st.button("🔄 Recalculează", use_container_width=True):
+            reconciliation.invalidate()
+    
+    result = reconciliation.get_reconciliation(db, date_from, date_to)
+    summary = result['summary']
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Lucrat fără asignare", int(summary['Lucrat fără asignare'].sum()))
+    with col2:
+        st.metric("Asignat fără pontaj", int(summary['Asignat fără pontaj'].sum()))
+    
+    if summary.empty:
+        st.success("✅ Pontajele corespund asignărilor în perioada selectată")
+    else:
+        st.markdown("### 📊 Pe Șantier și Șef de Șantier")
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        
+        filter_site = st.multiselect("Filtrează după șantiere", options=sorted(summary['Șantier'].unique()),
+                                     key='reconciliation_sites')
+        period = f"{date_from.strftime('%Y%m%d')}_{date_to.strftime('%Y%m%d')}"
+        
+        for key, heading, file_name in [
+            ('worked_without_assignment', "### ⚠️ Lucrat fără Asignare", 'lucrat_fara_asignare'),
+            ('assigned_without_timesheet', "### 📭 Asignat fără Pontaj", 'asignat_fara_pontaj')
+        ]:
+            df = result[key]
+            if filter_site:
+                df = df[df['Șantier'].isin(filter_site)]
+            st.markdown(heading)
+            if df.empty:
+                st.info("Nicio înregistrare")
+                continue
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Descarcă CSV",
+                data=df.to_csv(index=False).encode('utf-8'),
+                file_name=f"{file_name}_{period}.csv",
+                mime="text/csv",
+                key=f'reconciliation_{key}_csv'
+            )
+
+section_timing('reports_section', active_tab)
@@ -0,0 +1,168 @@
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from firebase_admin import firestore
+import aggregations
+
+# Totaluri pre-agregate de ore și statusuri pe șantier/angajat și perioadă
+# (zi, săptămână ISO, lună, total). Un document per (scope, entitate, perioadă).
+ROLLUPS_COLLECTION = 'rollups'
+SCOPES = {'site': ('site_id', 'site_name'), 'employee': ('employee_id', 'employee_name')}
+
+
+def period_keys(date):
+    """Perioadele (tip, cheie, început) în care intră o dată"""
+    if not isinstance(date, datetime):
+        return [('all', 'all', None)]
+    day = datetime.combine(date.date(), datetime.min.time())
+    iso_year, iso_week, _ = day.isocalendar()
+    return [
+        ('day', day.strftime('%Y-%m-%d'), day),
+        ('week', f"{iso_year}-W{iso_week:02d}", day - timedelta(days=day.weekday())),
+        ('month', day.strftime('%Y-%m'), day.replace(day=1)),
+        ('all', 'all', None)
+    ]
+
+
+def rollup_id(scope, entity_id, period, key):
+    return f"{scope}_{entity_id}_{period}_{key}"
+
+
+def rollup_deltas(timesheets, sign=1, deltas=None):
+    """Calculează contribuția unor pontaje (dict-uri) la documentele de rollup"""
+    if deltas is None:
+        deltas = {}
+    for data in timesheets:
+        hours = data.get('hours', 0) or 0
+        status = data.get('status', 'present')
+        for period, key, start in period_keys(data.get('date')):
+            for scope, (id_field, name_field) in SCOPES.items():
+                entity_id = data.get(id_field)
+                if not entity_id:
+                    continue
+                doc_id = rollup_id(scope, entity_id, period, key)
+                delta = deltas.get(doc_id)
+                if delta is None:
+                    delta = deltas[doc_id] = {
+                        'scope': scope,
+                        'entity_id': entity_id,
+                        'name': data.get(name_field, 'Unknown'),
+                        'period': period,
+                        'key': key,
+                        'start': start,
+                        'hours': 0,
+                        'count': 0,
+                        'status': defaultdict(int)
+                    }
+                delta['hours'] += sign * hours
+                delta['count'] += sign
+                delta['status'][status] += sign
+    return deltas
+
+
+def merge_deltas(target, source):
+    """Adună deltele din source în target"""
+    for doc_id, delta in source.items():
+        existing = target.get(doc_id)
+        if existing is None:
+            target[doc_id] = delta
+            continue
+        existing['hours'] += delta['hours']
+        existing['count'] += delta['count']
+        for status, count in delta['status'].items():
+            existing['status'][status] += count
+    return target
+
+
+def _rollup_fields(delta, increment):
+    value = firestore.Increment if increment else (lambda v: v)
+    return {
+        'scope': delta['scope'],
+        'entity_id': delta['entity_id'],
+        'name': delta['name'],
+        'period': delta['period'],
+        'key': delta['key'],
+        'start': delta['start'],
+        'hours': value(delta['hours']),
+        'count': value(delta['count']),
+        'status': {status: value(count) for status, count in delta['status'].items()}
+    }
+
+
+def rollup_documents(deltas):
+    """Documentele de rollup cu valori absolute (pentru rescriere completă)"""
+    return {doc_id: _rollup_fields(delta, increment=False) for doc_id, delta in deltas.items()}
+
+
+def apply_deltas(writer, db, deltas):
+    """Adaugă incrementele de rollup într-un WriteBatch/tranzacție"""
+    collection = db.collection(ROLLUPS_COLLECTION)
+    for doc_id, delta in deltas.items():
+        writer.set(collection.document(doc_id), _rollup_fields(delta, increment=True), merge=True)
+
+
+def get_rollups(db, scope, period):
+    """Toate documentele de rollup pentru un scope și un tip de perioadă"""
+    query = db.collection(ROLLUPS_COLLECTION)\
+        .where('scope', '==', scope)\
+        .where('period', '==', period)
+    return [doc.to_dict() for doc in query.stream()]
+
+
+def top_entities(db, scope, limit=5):
+    """Top entități după totalul de ore: [(nume, ore)]"""
+    totals = [(r.get('name', 'Unknown'), r.get('hours', 0)) for r in get_rollups(db, scope, 'all')]
+    totals = [item for item in totals if item[1] > 0]
+    return sorted(totals, key=lambda x: x[1], reverse=True)[:limit]
+
+
+def monthly_hours(db, scope):
+    """Ore pe lună și entitate: [{'Luna', 'Nume', 'Ore'}]"""
+    return [{'Luna': r.get('key'), 'Nume': r.get('name', 'Unknown'), 'Ore': r.get('hours', 0)}
+            for r in get_rollups(db, scope, 'month')]
+
+
+def _month_partitions(first, last):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= last:
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        yield month, next_month
+        month = next_month
+
+
+def _rollup_month(db, month_start, month_end):
+    query = db.collection('timesheets')\
+        .where('date', '>=', month_start)\
+        .where('date', '<', month_end)
+    return rollup_deltas(doc.to_dict() for doc in query.stream())
+
+
+def rebuild(db, workers=8):
+    """Recalculează toate rollup-urile din pontaje, în paralel pe luni"""
+    timesheets = db.collection('timesheets')
+    first = list(timesheets.order_by('date').limit(1).stream())
+    last = list(timesheets.order_by('date', direction=firestore.Query.DESCENDING).limit(1).stream())
+
+    deltas = {}
+    if first and last:
+        partitions = list(_month_partitions(first[0].to_dict()['date'], last[0].to_dict()['date']))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda p: _rollup_month(db, *p), partitions)
+            for partial in results:
+                merge_deltas(deltas, partial)
+
+    # Rescriere pe loc: rollup-urile rămân lizibile în timpul rulării, se șterg doar cele dispărute
+    aggregations.replace_documents(db, ROLLUPS_COLLECTION, rollup_documents(deltas))
+    return len(deltas)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Întreținere rollup-uri pontaje")
+    parser.add_argument('command', choices=['rebuild'])
+    parser.add_argument('--workers', type=int, default=8, help="Număr de luni procesate în paralel")
+    args = parser.parse_args()
+
+    from backend import get_db
+    written = rebuild(get_db(), workers=args.workers)
+    print(f"Rollup-uri rescrise: {written}")
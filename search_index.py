@@ -0,0 +1,146 @@
+import heapq
+import re
+import unicodedata
+
+# Index de căutare în memorie pentru typeahead pe înregistrările replicate (replica.py).
+# Textele sunt "împăturite": descompuse NFKD și fără semne diacritice (ă/â → a, î → i, ș/ş → s,
+# ț/ţ → t), cu litere mici și spații comprimate; câmpurile de telefon sunt reduse la cifre.
+# Fiecare trigramă trimite la mulțimea ID-urilor care o conțin, iar fiecare început de cuvânt
+# la ID-urile cu cuvinte care încep cu cele 1–2 caractere respective (termenii scurți nu au
+# trigrame). Căutarea intersectează mulțimile termenului, pornind de la cea mai mică, verifică
+# potrivirea pe textele împăturite și ordonează rezultatele: valoare identică > început de
+# valoare > început de cuvânt > oriunde în text, apoi după ordinea câmpurilor și alfabetic.
+# Cu `limit` (typeahead) sunt verificate întâi înregistrările al căror câmp începe cu termenul;
+# dacă ajung pentru o pagină de rezultate, restul candidaților nu mai sunt verificați.
+NGRAM = 3
+DIGIT_FIELDS = {'phone'}
+
+_SPACES = re.compile(r'\s+')
+_NON_DIGITS = re.compile(r'\D+')
+
+
+def fold(value):
+    """Text fără diacritice, cu litere mici și spații comprimate"""
+    decomposed = unicodedata.normalize('NFKD', str(value or ''))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(' ', stripped.casefold()).strip()
+
+
+def normalize(field, value):
+    text = fold(value)
+    return _NON_DIGITS.sub('', text) if field in DIGIT_FIELDS else text
+
+
+def _word_starts(text):
+    return [i for i in range(len(text)) if text[i].isalnum() and (i == 0 or not text[i - 1].isalnum())]
+
+
+def _grams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _prefixes(text):
+    return {text[i:i + n] for i in _word_starts(text) for n in range(1, NGRAM) if i + n <= len(text)}
+
+
+def _quality(text, term):
+    """3 = identic, 2 = început de valoare, 1 = început de cuvânt, 0 = oriunde, -1 = deloc"""
+    position = text.find(term)
+    if position < 0:
+        return -1
+    if position == 0:
+        return 3 if len(text) == len(term) else 2
+    while position >= 0:
+        if not text[position - 1].isalnum():
+            return 1
+        position = text.find(term, position + 1)
+    return 0
+
+
+class TrigramIndex:
+    """Index trigrame → ID-uri peste câmpurile text `fields` ale unor înregistrări (dict-uri)"""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self._texts = {}
+        self._grams = {}
+        self._prefixes = {}
+        self._starts = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, doc_id, record):
+        """Indexează (sau reindexează) înregistrarea `doc_id`"""
+        self.remove(doc_id)
+        texts = {field: normalize(field, record.get(field)) for field in self.fields}
+        texts = {field: text for field, text in texts.items() if text}
+        self._texts[doc_id] = texts
+        for keys, postings in self._keys(texts):
+            for key in keys:
+                postings.setdefault(key, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        texts = self._texts.pop(doc_id, None)
+        if not texts:
+            return
+        for keys, postings in self._keys(texts):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del postings[key]
+
+    def _keys(self, texts):
+        grams, prefixes = set(), set()
+        for text in texts.values():
+            grams |= _grams(text)
+            prefixes |= _prefixes(text)
+        starts = {(field, text[:n]) for field, text in texts.items() for n in range(1, NGRAM)}
+        return [(grams, self._grams), (prefixes, self._prefixes), (starts, self._starts)]
+
+    def _candidates(self, term):
+        if len(term) < NGRAM:
+            return self._prefixes.get(term, set())
+        postings = sorted((self._grams.get(gram, set()) for gram in _grams(term)), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def search(self, query, fields=None, limit=None):
+        """ID-urile înregistrărilor care conțin `query` în `fields`, ordonate după relevanță"""
+        fields = [field for field in (fields or self.fields) if field in self.fields]
+        terms = [(field, normalize(field, query)) for field in fields]
+        terms = [(rank, field, term, 1 if len(term) < NGRAM else 0)
+                 for rank, (field, term) in enumerate(terms) if term]
+        candidates = set()
+        for term in {term for _, _, term, _ in terms}:
+            candidates |= self._candidates(term)
+
+        if limit is not None and len(candidates) > limit:
+            heads = set()
+            for _, field, term, _ in terms:
+                heads |= candidates & self._starts.get((field, term[:NGRAM - 1]), set())
+            ranked = self._rank(heads, terms)
+            if sum(1 for quality, *_ in ranked if quality <= -2) >= limit:
+                return [doc_id for _, _, _, doc_id in heapq.nsmallest(limit, ranked)]
+        ranked = self._rank(candidates, terms)
+        ranked = heapq.nsmallest(limit, ranked) if limit is not None else sorted(ranked)
+        return [doc_id for _, _, _, doc_id in ranked]
+
+    def _rank(self, candidates, terms):
+        ranked = []
+        texts_of = self._texts
+        for doc_id in candidates:
+            texts = texts_of[doc_id]
+            best = None
+            for rank, field, term, minimum in terms:
+                text = texts.get(field)
+                if text is None:
+                    continue
+                # Termenii scurți se potrivesc doar la început de cuvânt (minimum 1)
+                quality = _quality(text, term)
+                if quality >= minimum and (best is None or (-quality, rank) < best[:2]):
+                    best = (-quality, rank, text, doc_id)
+            if best is not None:
+                ranked.append(best)
+        return ranked
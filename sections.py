@@ -0,0 +1,36 @@
+import time
+import streamlit as st
+
+# Navigare pe secțiuni: spre deosebire de st.tabs, rulează doar secțiunea activă
+TIMINGS_KEY = 'section_timings'
+TIMINGS_HISTORY = 20
+
+
+def section_nav(key, labels):
+    """Afișează navigarea între secțiuni și returnează secțiunea activă"""
+    active = st.radio(
+        "Secțiune",
+        labels,
+        key=key,
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    st.session_state[f'{key}_started'] = time.perf_counter()
+    return active
+
+
+def section_timing(key, label):
+    """Înregistrează și afișează durata de execuție a secțiunii active"""
+    started = st.session_state.get(f'{key}_started')
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if TIMINGS_KEY not in st.session_state:
+        st.session_state[TIMINGS_KEY] = {}
+    history = st.session_state[TIMINGS_KEY].setdefault(f'{key}:{label}', [])
+    history.append(elapsed_ms)
+    del history[:-TIMINGS_HISTORY]
+
+    avg_ms = sum(history) / len(history)
+    st.caption(f"⏱️ {label}: {elapsed_ms:.0f} ms (medie {avg_ms:.0f} ms pe ultimele {len(history)} rulări)")
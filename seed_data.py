@@ -0,0 +1,182 @@
+import argparse
+import random
+from datetime import datetime, timedelta
+import audit_search
+import audit_stats
+import rollups
+from timesheet_store import timesheet_id
+
+# Generator determinist de date de test pentru backend-ul în memorie
+PROFILES = {
+    'small': {'employees': 100, 'sites': 15, 'timesheets': 20_000, 'audit': 10_000},
+    'medium': {'employees': 500, 'sites': 80, 'timesheets': 200_000, 'audit': 100_000},
+    'full': {'employees': 500, 'sites': 80, 'timesheets': 2_000_000, 'audit': 1_000_000}
+}
+
+FIRST_NAMES = ['Ion', 'Gheorghe', 'Vasile', 'Mihai', 'Ștefan', 'Andrei', 'Cătălin', 'Florin', 'Răzvan',
+               'Țică', 'Maria', 'Elena', 'Ioana', 'Ana', 'Cristina', 'Mădălina', 'Alexandru', 'Bogdan']
+LAST_NAMES = ['Popescu', 'Ionescu', 'Popa', 'Dumitru', 'Stan', 'Stoica', 'Gheorghe', 'Rusu', 'Munteanu',
+              'Matei', 'Constantin', 'Șerban', 'Țurcanu', 'Lazăr', 'Mocanu', 'Bălan', 'Nistor', 'Crăciun']
+CITIES = ['București', 'Cluj-Napoca', 'Iași', 'Timișoara', 'Constanța', 'Brașov', 'Craiova',
+          'Galați', 'Ploiești', 'Oradea', 'Sibiu', 'Târgu Mureș', 'Pitești', 'Bacău', 'Suceava']
+SITE_TYPES = ['Complex Rezidențial', 'Bloc', 'Hală Industrială', 'Pod', 'Școală', 'Spital', 'Mall', 'Depozit']
+ROLES = ['Muncitor'] * 14 + ['Șef Șantier'] * 3 + ['Inginer'] * 2 + ['Manager']
+STATUSES = ['present'] * 85 + ['remote'] * 3 + ['absent'] * 4 + ['medical'] * 4 + ['leave'] * 4
+ACTORS = [f'user{i:02d}@workforce.ro' for i in range(25)]
+
+
+def _weekdays_back(end, count):
+    """Ultimele `count` zile lucrătoare până la `end` inclusiv, în ordine crescătoare"""
+    days = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def generate(profile, seed=42, today=None):
+    """Generează colecțiile ca liste de (id, document)"""
+    rng = random.Random(seed)
+    today = datetime.combine((today or datetime.now()).date(), datetime.min.time())
+
+    employees = []
+    for i in range(profile['employees']):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i + 1}"
+        employees.append((f'emp{i:05d}', {
+            'full_name': name,
+            'role': rng.choice(ROLES),
+            'email': f"angajat{i}@workforce.ro",
+            'phone': f"+40 7{rng.randint(10, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)}",
+            'active': rng.random() < 0.92,
+            'created_at': today - timedelta(days=rng.randint(400, 4000)),
+            'created_by': rng.choice(ACTORS)
+        }))
+
+    sites = []
+    for i in range(profile['sites']):
+        city = rng.choice(CITIES)
+        sites.append((f'site{i:04d}', {
+            'name': f"{rng.choice(SITE_TYPES)} {city} {i + 1}",
+            'location': f"{city}, Str. {rng.choice(LAST_NAMES)} nr. {rng.randint(1, 200)}",
+            'active': rng.random() < 0.85,
+            'created_at': today - timedelta(days=rng.randint(400, 4000)),
+            'created_by': rng.choice(ACTORS)
+        }))
+    active_sites = [s for s in sites if s[1]['active']] or sites
+
+    # Fiecare angajat trece prin asignări consecutive, fără suprapuneri
+    per_employee = -(-profile['timesheets'] // max(len(employees), 1))
+    days = _weekdays_back(today, per_employee)
+    first_day = days[0] if days else today
+
+    assignments = []
+    employee_segments = {}
+    for emp_id, emp in employees:
+        segments = []
+        start = first_day
+        while start <= today:
+            end = start + timedelta(days=rng.randint(30, 180))
+            site_id, site = rng.choice(active_sites)
+            is_last = end >= today
+            segment_end = None if (is_last and emp['active']) else min(end, today)
+            segments.append((start, segment_end or today, site_id, site['name']))
+            assignments.append((f'asg{len(assignments):07d}', {
+                'employee_id': emp_id,
+                'employee_name': emp['full_name'],
+                'site_id': site_id,
+                'site_name': site['name'],
+                'start_date': start,
+                'end_date': segment_end,
+                'created_at': start,
+                'created_by': rng.choice(ACTORS)
+            }))
+            start = end + timedelta(days=1)
+        employee_segments[emp_id] = segments
+
+    timesheets = []
+    deltas = {}
+    for emp_id, emp in employees:
+        segments = employee_segments[emp_id]
+        segment_index = 0
+        for day in days:
+            if len(timesheets) >= profile['timesheets']:
+                break
+            while segments[segment_index][1] < day:
+                segment_index += 1
+            _, _, site_id, site_name = segments[segment_index]
+            status = rng.choice(STATUSES)
+            hours = rng.choice([8, 8, 8, 8, 6, 10]) if status in ('present', 'remote') else 0
+            timesheets.append((timesheet_id(emp_id, day), {
+                'date': day,
+                'employee_id': emp_id,
+                'employee_name': emp['full_name'],
+                'site_id': site_id,
+                'site_name': site_name,
+                'hours': hours,
+                'status': status,
+                'note': '',
+                'created_at': day + timedelta(hours=18),
+                'created_by': rng.choice(ACTORS)
+            }))
+    rollups.rollup_deltas((data for _, data in timesheets), deltas=deltas)
+
+    entity_ids = {
+        'Employee': [e[0] for e in employees],
+        'Site': [s[0] for s in sites],
+        'Assignment': [a[0] for a in assignments] or ['asg0000000'],
+        'Timesheet': [f'ts{i}' for i in range(1000)]
+    }
+    audit = []
+    for _ in range(profile['audit']):
+        entity = rng.choice(['Timesheet'] * 6 + ['Assignment', 'Employee', 'Site'])
+        action = rng.choice(['create'] * 6 + ['update'] * 3 + ['delete'])
+        entry = {
+            'timestamp': today - timedelta(seconds=rng.randint(0, 730 * 86400)),
+            'actor': rng.choice(ACTORS),
+            'action': action,
+            'entity': entity,
+            'entity_id': rng.choice(entity_ids[entity]),
+            'details': {'generated': True}
+        }
+        entry[audit_search.SEARCH_FIELD] = audit_search.tokens(entry)
+        audit.append((None, entry))
+
+    counters = [
+        ('employees', {'total': len(employees), 'active': sum(1 for _, e in employees if e['active'])}),
+        ('sites', {'total': len(sites), 'active': sum(1 for _, s in sites if s['active'])}),
+        ('assignments', {'total': len(assignments),
+                         'active': sum(1 for _, a in assignments if a['end_date'] is None)}),
+        ('timesheets', {'total': len(timesheets), 'hours': sum(t['hours'] for _, t in timesheets)})
+    ]
+
+    return {
+        'employees': employees,
+        'sites': sites,
+        'assignments': assignments,
+        'timesheets': timesheets,
+        'audit_log': audit,
+        'rollups': list(rollups.rollup_documents(deltas).items()),
+        'audit_stats': list(audit_stats.stats_documents(audit_stats.stats_deltas(data for _, data in audit)).items()),
+        'counters': counters
+    }
+
+
+def seed(client, profile, seed=42, today=None):
+    """Populează un MemoryClient cu datele generate; returnează numărul de documente pe colecție"""
+    collections = generate(profile, seed=seed, today=today)
+    for name, documents in collections.items():
+        client.load(name, documents)
+    return {name: len(documents) for name, documents in collections.items()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generare date de test")
+    parser.add_argument('--profile', choices=list(PROFILES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from fake_firestore import MemoryClient
+    for name, total in seed(MemoryClient(), PROFILES[args.profile], seed=args.seed).items():
+        print(f"{name}: {total}")
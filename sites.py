@@ -1,29 +1,27 @@
 import streamlit as st
-from firebase_admin import firestore
 import pandas as pd
 from datetime import datetime
+from backend import get_db
+from audit_log import log_audit
+from sections import section_nav, section_timing
+import pagination
+import replica
+import aggregations
+import rollups
+import search_index
 
 if 'user' not in st.session_state or st.session_state.user is None:
     st.warning("⚠️ Vă rugăm să vă autentificați")
     st.stop()
 
-db = firestore.client()
-
-def log_audit(actor, action, entity, entity_id, details):
-    db.collection('audit_log').add({
-        'timestamp': datetime.now(),
-        'actor': actor,
-        'action': action,
-        'entity': entity,
-        'entity_id': entity_id,
-        'details': details
-    })
+db = get_db()
 
 st.title("🏗️ Gestionare Șantiere")
 
-tab1, tab2, tab3 = st.tabs(["📋 Lista Șantiere", "➕ Adaugă Șantier", "📊 Statistici"])
+TABS = ["📋 Lista Șantiere", "➕ Adaugă Șantier", "📊 Statistici"]
+active_tab = section_nav('sites_section', TABS)
 
-with tab1:
+if active_tab == TABS[0]:
     st.subheader("Lista Șantiere")
     
     # Filtre
@@ -31,30 +29,46 @@ with tab1:
     with col1:
         filter_status = st.selectbox("Status", ["Toate", "Activ", "Inactiv"])
     with col2:
-        search_name = st.text_input("🔍 Caută după nume", "")
-    
-    sites_ref = db.collection('sites')
+        search_name = st.text_input("🔍 Caută după nume sau locație", "")
     
-    if filter_status == "Activ":
-        sites_ref = sites_ref.where('active', '==', True)
-    elif filter_status == "Inactiv":
-        sites_ref = sites_ref.where('active', '==', False)
+    # Șantierele vin din replica în memorie (fără citiri Firestore): ordonate după nume sau,
+    # la căutare, după relevanță; se afișează o pagină la un moment dat.
+    # Spre deosebire de pontaje/audit (pagination.fetch_page, cursor pe interogări), lista e
+    # paginată în memorie (slice_page): căutarea fără diacritice și ordonarea după relevanță nu
+    # pot fi exprimate ca interogare Firestore, iar replica ține deja toate șantierele, deci o
+    # pagină nu costă citiri. Cursorul e poziția în lista filtrată.
+    active = {"Activ": True, "Inactiv": False}.get(filter_status)
+    filtered_sites = replica.records(db, 'sites', active=active, search=search_name)
+    if not search_name:
+        filtered_sites.sort(key=lambda site: (search_index.fold(site.get('name')), site['id']))
     
-    sites = list(sites_ref.stream())
+    page_size = pagination.page_size_select('sites_list')
+    pager = pagination.pager('sites_list', (filter_status, search_name, page_size))
+    page, next_cursor = pagination.slice_page(filtered_sites, page_size, pager['cursors'][-1])
     
-    filtered_sites = []
-    for site in sites:
-        data = site.to_dict()
-        data['id'] = site.id
+    if page:
+        # Un singur tabel pentru pagina curentă
+        df = pd.DataFrame([{
+            'Nume': site.get('name', 'N/A'),
+            'Locație': site.get('location', 'N/A'),
+            'Status': "Activ" if site.get('active') else "Inactiv"
+        } for site in page])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        pagination.page_nav('sites_list', pager, next_cursor)
         
-        if search_name and search_name.lower() not in data.get('name', '').lower():
-            continue
+        st.markdown(f"**Total: {len(filtered_sites)} șantiere**")
         
-        filtered_sites.append(data)
-    
-    if filtered_sites:
-        # Afișare cards
-        for site_data in filtered_sites:
+        # Acțiunile sunt create doar pentru șantierul selectat
+        by_id = {site['id']: site for site in page}
+        selected_id = st.selectbox(
+            "Selectează șantierul", [None] + list(by_id),
+            format_func=lambda site_id: "—" if site_id is None else
+            f"{by_id[site_id].get('name', 'N/A')} ({by_id[site_id].get('location', 'N/A')})",
+            key='sites_list_selected'
+        )
+        
+        site_data = by_id.get(selected_id)
+        if site_data is not None:
             status_color = "#4CAF50" if site_data.get('active') else "#f44336"
             status_text = "Activ" if site_data.get('active') else "Inactiv"
             
@@ -84,6 +98,8 @@ with tab1:
                         db.collection('sites').document(site_data['id']).update({
                             'active': not current_status
                         })
+                        aggregations.bump_counter(db, 'sites', active=-1 if current_status else 1)
+                        replica.upsert(db, 'sites', site_data['id'], {'active': not current_status})
                         log_audit(
                             st.session_state.user_email,
                             'update',
@@ -94,55 +110,62 @@ with tab1:
                         st.success(f"✅ Șantier {action.lower()}!")
                         st.rerun()
         
-        st.markdown(f"**Total: {len(filtered_sites)} șantiere**")
-        
         # Editare inline
         if 'edit_site_id' in st.session_state:
             st.markdown("---")
             st.subheader("✏️ Editare Șantier")
             
-            site_doc = db.collection('sites').document(st.session_state.edit_site_id).get()
-            site_data = site_doc.to_dict()
-            
-            with st.form("edit_site_form"):
-                edit_name = st.text_input("Nume Șantier", value=site_data.get('name', ''))
-                edit_location = st.text_input("Locație", value=site_data.get('location', ''))
-                edit_active = st.checkbox("Activ", value=site_data.get('active', True))
+            site_data = replica.get(db, 'sites', st.session_state.edit_site_id)
+            if site_data is None:
+                # Șters între timp din altă sesiune/nod
+                del st.session_state.edit_site_id
+                st.warning("⚠️ Șantierul a fost șters între timp")
+            else:
+                site_data = {k: v for k, v in site_data.items() if k != 'id'}
                 
-                col_save, col_cancel = st.columns(2)
-                with col_save:
-                    submit_edit = st.form_submit_button("💾 Salvează", use_container_width=True, type="primary")
-                with col_cancel:
-                    cancel_edit = st.form_submit_button("❌ Anulează", use_container_width=True)
+                with st.form("edit_site_form"):
+                    edit_name = st.text_input("Nume Șantier", value=site_data.get('name', ''))
+                    edit_location = st.text_input("Locație", value=site_data.get('location', ''))
+                    edit_active = st.checkbox("Activ", value=site_data.get('active', True))
                 
-                if submit_edit:
-                    updated_data = {
-                        'name': edit_name,
-                        'location': edit_location,
-                        'active': edit_active,
-                        'updated_at': datetime.now()
-                    }
+                    col_save, col_cancel = st.columns(2)
+                    with col_save:
+                        submit_edit = st.form_submit_button("💾 Salvează", use_container_width=True, type="primary")
+                    with col_cancel:
+                        cancel_edit = st.form_submit_button("❌ Anulează", use_container_width=True)
+                
+                    if submit_edit:
+                        updated_data = {
+                            'name': edit_name,
+                            'location': edit_location,
+                            'active': edit_active,
+                            'updated_at': datetime.now()
+                        }
                     
-                    db.collection('sites').document(st.session_state.edit_site_id).update(updated_data)
-                    log_audit(
-                        st.session_state.user_email,
-                        'update',
-                        'Site',
-                        st.session_state.edit_site_id,
-                        {'old': site_data, 'new': updated_data}
-                    )
+                        db.collection('sites').document(st.session_state.edit_site_id).update(updated_data)
+                        aggregations.bump_counter(db, 'sites', active=int(edit_active) - int(site_data.get('active', True)))
+                        replica.upsert(db, 'sites', st.session_state.edit_site_id, updated_data)
+                        log_audit(
+                            st.session_state.user_email,
+                            'update',
+                            'Site',
+                            st.session_state.edit_site_id,
+                            {'old': site_data, 'new': updated_data}
+                        )
                     
-                    del st.session_state.edit_site_id
-                    st.success("✅ Șantier actualizat!")
-                    st.rerun()
+                        del st.session_state.edit_site_id
+                        st.success("✅ Șantier actualizat!")
+                        st.rerun()
                 
-                if cancel_edit:
-                    del st.session_state.edit_site_id
-                    st.rerun()
+                    if cancel_edit:
+                        del st.session_state.edit_site_id
+                        st.rerun()
     else:
         st.info("📭 Nu există șantiere care să corespundă filtrelor")
+        if len(pager['cursors']) > 1:
+            pagination.page_nav('sites_list', pager, None)
 
-with tab2:
+elif active_tab == TABS[1]:
     st.subheader("➕ Adaugă Șantier Nou")
     
     with st.form("add_site_form"):
@@ -170,6 +193,8 @@ with tab2:
                     }
                     
                     doc_ref = db.collection('sites').add(site_data)
+                    aggregations.bump_counter(db, 'sites', total=1, active=int(new_active))
+                    replica.upsert(db, 'sites', doc_ref[1].id, site_data)
                     
                     log_audit(
                         st.session_state.user_email,
@@ -182,12 +207,11 @@ with tab2:
                     st.success(f"✅ Șantier '{new_name}' adăugat cu succes!")
                     st.balloons()
 
-with tab3:
+elif active_tab == TABS[2]:
     st.subheader("📊 Statistici Șantiere")
     
-    all_sites = list(db.collection('sites').stream())
-    total_sites = len(all_sites)
-    active_sites = len([s for s in all_sites if s.to_dict().get('active', True)])
+    total_sites = aggregations.count(db, db.collection('sites'), counter=('sites', 'total'))
+    active_sites = aggregations.count(db, db.collection('sites').where('active', '==', True), counter=('sites', 'active'))
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -202,18 +226,9 @@ with tab3:
     # Top șantiere după ore lucrate
     st.subheader("🏆 Top Șantiere (Total Ore Lucrate)")
     
-    timesheets = list(db.collection('timesheets').stream())
-    site_hours = {}
+    sorted_sites = rollups.top_entities(db, 'site', limit=10)
     
-    for ts in timesheets:
-        data = ts.to_dict()
-        site_name = data.get('site_name', 'Unknown')
-        hours = data.get('hours', 0)
-        site_hours[site_name] = site_hours.get(site_name, 0) + hours
-    
-    if site_hours:
-        sorted_sites = sorted(site_hours.items(), key=lambda x: x[1], reverse=True)[:10]
-        
+    if sorted_sites:
         import plotly.graph_objects as go
         
         fig = go.Figure(data=[
@@ -245,33 +260,13 @@ with tab3:
     st.markdown("---")
     st.subheader("📅 Activitate Lunară pe Șantiere")
     
-    # Grupare după lună
-    from collections import defaultdict
-    monthly_data = defaultdict(lambda: defaultdict(float))
-    
-    for ts in timesheets:
-        data = ts.to_dict()
-        date = data.get('date')
-        if isinstance(date, datetime):
-            month_key = date.strftime('%Y-%m')
-            site_name = data.get('site_name', 'Unknown')
-            hours = data.get('hours', 0)
-            monthly_data[month_key][site_name] += hours
+    # Rollup-uri lunare (un document per șantier și lună)
+    monthly_data = rollups.monthly_hours(db, 'site')
     
     if monthly_data:
         import plotly.express as px
         
-        # Pregătire date pentru grafic
-        chart_data = []
-        for month, sites in sorted(monthly_data.items()):
-            for site, hours in sites.items():
-                chart_data.append({
-                    'Luna': month,
-                    'Șantier': site,
-                    'Ore': hours
-                })
-        
-        df_chart = pd.DataFrame(chart_data)
+        df_chart = pd.DataFrame(monthly_data).rename(columns={'Nume': 'Șantier'}).sort_values('Luna')
         
         fig2 = px.bar(df_chart, x='Luna', y='Ore', color='Șantier',
                      title='Ore Lucrate pe Șantiere - Evoluție Lunară',
@@ -281,9 +276,11 @@ with tab3:
     else:
         st.info("📭 Nu există suficiente date pentru graficul lunar")
 
+section_timing('sites_section', active_tab)
+
 st.markdown("---")
-total = len(list(db.collection('sites').stream()))
-active = len(list(db.collection('sites').where('active', '==', True).stream()))
+total = aggregations.count(db, db.collection('sites'), counter=('sites', 'total'))
+active = aggregations.count(db, db.collection('sites').where('active', '==', True), counter=('sites', 'active'))
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -0,0 +1,80 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Număr de angajați asignați pe fiecare șantier în fiecare zi, calculat printr-un sweep
+# vectorizat: +1 în ziua de start, -1 în ziua de după sfârșit, apoi suma cumulativă pe zile.
+# Rezultatul e păstrat în cache; scrierile în colecția assignments trebuie urmate de invalidate().
+STAFFING_TTL = 600
+HORIZON_DAYS = 90
+
+
+def headcount_matrix(starts, ends, site_index, horizon_start, days, site_count):
+    """Matricea șantiere × zile din vectori de start/sfârșit (datetime64[D], NaT = în curs)"""
+    origin = np.datetime64(horizon_start, 'D')
+    start_offsets = (starts - origin).astype(np.int64)
+    end_offsets = np.where(np.isnat(ends), days - 1, (ends - origin).astype(np.int64))
+
+    # Doar intervalele care intersectează orizontul, tăiate la marginile lui
+    visible = (start_offsets <= days - 1) & (end_offsets >= 0) & (end_offsets >= start_offsets)
+    first = np.clip(start_offsets[visible], 0, days - 1)
+    last = np.clip(end_offsets[visible], 0, days - 1)
+    sites = site_index[visible]
+
+    diff = np.zeros((site_count, days + 1), dtype=np.int32)
+    np.add.at(diff, (sites, first), 1)
+    np.add.at(diff, (sites, last + 1), -1)
+    return np.cumsum(diff[:, :days], axis=1)
+
+
+def compute(db, horizon_start, days=HORIZON_DAYS):
+    """DataFrame șantier × zi cu numărul de angajați asignați (doar șantierele cu asignări)"""
+    horizon_start = datetime.combine(horizon_start, datetime.min.time())
+    assignments = db.collection('assignments')
+    fields = ['site_id', 'site_name', 'start_date', 'end_date']
+    docs = list(assignments.where('end_date', '==', None).select(fields).stream()) + \
+        list(assignments.where('end_date', '>=', horizon_start).select(fields).stream())
+
+    site_ids, site_names = {}, []
+    starts, ends, site_index = [], [], []
+    for doc in docs:
+        data = doc.to_dict()
+        start = data.get('start_date')
+        if not isinstance(start, datetime):
+            continue
+        site_id = data.get('site_id')
+        if site_id not in site_ids:
+            site_ids[site_id] = len(site_names)
+            site_names.append(data.get('site_name', site_id))
+        end = data.get('end_date')
+        starts.append(start.replace(tzinfo=None))
+        ends.append(end.replace(tzinfo=None) if isinstance(end, datetime) else None)
+        site_index.append(site_ids[site_id])
+
+    dates = pd.date_range(horizon_start, periods=days, freq='D')
+    if not starts:
+        return pd.DataFrame(columns=dates, dtype=np.int32)
+    matrix = headcount_matrix(
+        np.array(starts, dtype='datetime64[D]'),
+        np.array(ends, dtype='datetime64[D]'),
+        np.array(site_index, dtype=np.int64),
+        horizon_start, days, len(site_names)
+    )
+    frame = pd.DataFrame(matrix, index=pd.Index(site_names, name='Șantier'), columns=dates)
+    return frame.sort_index()
+
+
+@st.cache_data(ttl=STAFFING_TTL, show_spinner=False)
+def _cached(_db, horizon_start, days):
+    return compute(_db, horizon_start, days)
+
+
+def get_headcount(db, horizon_start=None, days=HORIZON_DAYS):
+    """Numărul de angajați pe șantier și zi, din cache (implicit următoarele 90 de zile)"""
+    horizon_start = horizon_start or datetime.now().date()
+    return _cached(db, horizon_start, days)
+
+
+def invalidate():
+    _cached.clear()
@@ -7,6 +7,9 @@ import json
 from io import BytesIO
 import plotly.express as px
 import plotly.graph_objects as go
+import backend
+import bulk_timesheets
+import dashboard_data
 
 # Configurare pagină
 st.set_page_config(
@@ -19,7 +22,7 @@ st.set_page_config(
 # Inițializare Firebase
 @st.cache_resource
 def init_firebase():
-    if not firebase_admin._apps:
+    if backend.uses_firebase_app() and not firebase_admin._apps:
         # IMPORTANT: Înlocuiește cu credențialele tale Firebase
         cred_dict = {
             "type": "service_account",
@@ -34,7 +37,7 @@ def init_firebase():
         }
         cred = credentials.Certificate(cred_dict)
         firebase_admin.initialize_app(cred)
-    return firestore.client()
+    return backend.get_db()
 
 db = init_firebase()
 
@@ -85,44 +88,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Funcții helper
-def log_audit(actor, action, entity, entity_id, details):
-    """Înregistrare în log audit"""
-    db.collection('audit_log').add({
-        'timestamp': datetime.now(),
-        'actor': actor,
-        'action': action,
-        'entity': entity,
-        'entity_id': entity_id,
-        'details': details
-    })
-
-def get_current_week_hours():
-    """Calculează orele totale pentru săptămâna curentă"""
-    today = datetime.now()
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    
-    timesheets = db.collection('timesheets').where('date', '>=', week_start).where('date', '<=', week_end).stream()
-    total = sum(ts.to_dict().get('hours', 0) for ts in timesheets)
-    return total
-
-def get_active_counts():
-    """Număr angajați și șantiere active"""
-    employees = len([e for e in db.collection('employees').where('active', '==', True).stream()])
-    sites = len([s for s in db.collection('sites').where('active', '==', True).stream()])
-    return employees, sites
-
-def get_week_absences():
-    """Absențe săptămâna curentă"""
-    today = datetime.now()
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    
-    timesheets = db.collection('timesheets').where('date', '>=', week_start).where('date', '<=', week_end).stream()
-    absences = len([ts for ts in timesheets if ts.to_dict().get('status') in ['absent', 'medical', 'leave']])
-    return absences
-
 # Session state pentru autentificare
 if 'user' not in st.session_state:
     st.session_state.user = None
@@ -205,9 +170,12 @@ def show_dashboard():
     # Cards statistici
     col1, col2, col3, col4 = st.columns(4)
     
-    total_hours = get_current_week_hours()
-    employees, sites = get_active_counts()
-    absences = get_week_absences()
+    # Snapshot comun tuturor sesiunilor, reîmprospătat în fundal
+    snapshot = dashboard_data.get_snapshot(db)
+    total_hours = snapshot['total_hours']
+    employees = snapshot['active_employees']
+    sites = snapshot['active_sites']
+    absences = snapshot['absences']
     
     with col1:
         st.markdown(f"""
@@ -250,16 +218,15 @@ def show_dashboard():
     
     with col_left:
         st.subheader("📋 Pontaje Recente")
-        timesheets = list(db.collection('timesheets').order_by('date', direction=firestore.Query.DESCENDING).limit(5).stream())
+        timesheets = snapshot['recent']
         
         if timesheets:
-            for ts in timesheets:
-                data = ts.to_dict()
-                emp_name = data.get('employee_name', 'N/A')
-                site_name = data.get('site_name', 'N/A')
-                hours = data.get('hours', 0)
-                status = data.get('status', 'present')
-                date = data.get('date', datetime.now())
+            for data in timesheets:
+                emp_name = data['employee_name']
+                site_name = data['site_name']
+                hours = data['hours']
+                status = data['status']
+                date = data['date']
                 
                 status_color = "green" if status == "present" else "red"
                 st.markdown(f"""
@@ -275,20 +242,13 @@ def show_dashboard():
     with col_right:
         st.subheader("🏗️ Top Șantiere (Ore)")
         
-        # Calculare top șantiere
-        timesheets_all = db.collection('timesheets').stream()
-        site_hours = {}
-        for ts in timesheets_all:
-            data = ts.to_dict()
-            site = data.get('site_name', 'Unknown')
-            hours = data.get('hours', 0)
-            site_hours[site] = site_hours.get(site, 0) + hours
-        
-        sorted_sites = sorted(site_hours.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Top șantiere din rollup-urile totale (un document per șantier)
+        sorted_sites = snapshot['top_sites']
         
         if sorted_sites:
+            max_hours = sorted_sites[0][1]
             for site, hours in sorted_sites:
-                progress = min(hours / max(site_hours.values()) * 100, 100)
+                progress = min(hours / max_hours * 100, 100)
                 st.markdown(f"""
                 <div style='margin-bottom: 15px;'>
                     <div style='display: flex; justify-content: space-between;'>
@@ -314,7 +274,12 @@ def show_dashboard():
             st.rerun()
     with col2:
         if st.button("📋 Duplică Ieri", use_container_width=True):
-            st.info("Funcție în dezvoltare")
+            today = datetime.now().date()
+            created, skipped = bulk_timesheets.duplicate_period(
+                db, today - timedelta(days=1), today, 1, st.session_state.user_email, 'duplicate_day'
+            )
+            dashboard_data.invalidate(db)
+            st.success(f"✅ {created} pontaje copiate din ziua de ieri, {skipped} existente omise")
     with col3:
         if st.button("📥 Export Săptămânal", use_container_width=True):
             st.session_state.current_page = 'reports'
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Modulele aplicației sunt la rădăcina depozitului (fără pachet)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_firestore import MemoryClient  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    return MemoryClient()
@@ -0,0 +1,82 @@
+from google.api_core.exceptions import GoogleAPICallError
+
+import aggregations
+
+
+class _NoAggregations:
+    """Interogare fără count/sum server-side (SDK vechi): doar stream()"""
+
+    def __init__(self, query):
+        self._query = query
+
+    def stream(self):
+        return self._query.stream()
+
+
+class _FailingAggregations(_NoAggregations):
+    def count(self, alias=None):
+        raise GoogleAPICallError("aggregation unavailable")
+
+    def sum(self, field, alias=None):
+        raise GoogleAPICallError("aggregation unavailable")
+
+
+def _seed(db):
+    for i, hours in enumerate([8, 4, 6]):
+        db.collection('timesheets').document(f't{i}').set({'hours': hours})
+
+
+def test_server_side_aggregations(db):
+    _seed(db)
+    query = db.collection('timesheets')
+    assert aggregations.count(db, query) == 3
+    assert aggregations.sum_field(db, query, 'hours') == 18
+
+
+def test_fallback_to_counter(db):
+    _seed(db)
+    aggregations.bump_counter(db, 'timesheets', total=5, hours=40)
+    query = _FailingAggregations(db.collection('timesheets'))
+    assert aggregations.count(db, query, counter=('timesheets', 'total')) == 5
+    assert aggregations.sum_field(db, query, 'hours', counter=('timesheets', 'hours')) == 40
+
+
+def test_fallback_to_stream_without_counter(db):
+    _seed(db)
+    query = _NoAggregations(db.collection('timesheets'))
+    assert aggregations.count(db, query) == 3
+    assert aggregations.sum_field(db, query, 'hours') == 18
+
+
+def test_missing_counter_reads_as_zero(db):
+    query = _FailingAggregations(db.collection('timesheets'))
+    assert aggregations.count(db, query, counter=('timesheets', 'total')) == 0
+
+
+def test_commit_in_batches_keeps_operations_whole(db):
+    collection = db.collection('items')
+    sizes = []
+    new_batch = db.batch
+
+    def batch():
+        created = new_batch()
+        commit = created.commit
+        created.commit = lambda: (sizes.append(len(created)), commit())
+        return created
+    db.batch = batch
+
+    def write_group(batch, i):
+        for shard in range(8):
+            batch.set(collection.document(f'{i}_{shard}'), {'i': i})
+
+    aggregations.commit_in_batches(db, (lambda b, i=i: write_group(b, i) for i in range(70)), writes_per_operation=8)
+    assert sizes == [496, 64]
+    assert len(list(collection.stream())) == 560
+
+
+def test_replace_documents_deletes_only_stale(db):
+    collection = db.collection('rollups')
+    collection.document('kept').set({'value': 1})
+    collection.document('stale').set({'value': 2})
+    aggregations.replace_documents(db, 'rollups', {'kept': {'value': 10}, 'new': {'value': 3}})
+    assert {doc.id: doc.to_dict() for doc in collection.stream()} == {'kept': {'value': 10}, 'new': {'value': 3}}
@@ -0,0 +1,104 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import assignment_index
+from assignment_index import AssignmentIndex, find_conflicts
+
+
+def _assignment(employee_id, start, end=None, site_id='s1'):
+    return {'employee_id': employee_id, 'site_id': site_id, 'site_name': 'Șantier',
+            'start_date': start, 'end_date': end}
+
+
+def _overlaps(a, b):
+    a_end = a['end_date'] or datetime.max
+    b_end = b['end_date'] or datetime.max
+    return a['start_date'] <= b_end and b['start_date'] <= a_end
+
+
+def test_closed_intervals_overlap_on_shared_day():
+    index = AssignmentIndex([('a1', _assignment('e1', datetime(2024, 1, 1), datetime(2024, 1, 31)))])
+    assert index.overlap('e1', datetime(2024, 1, 31))[0] == 'a1'
+    assert index.overlap('e1', datetime(2024, 2, 1)) is None
+    assert index.overlap('e1', datetime(2023, 12, 1), datetime(2024, 1, 1))[0] == 'a1'
+    assert index.overlap('e1', datetime(2023, 12, 1), datetime(2023, 12, 31)) is None
+    assert index.overlap('e2', datetime(2024, 1, 10)) is None
+
+
+def test_open_assignment_and_exclusion():
+    index = AssignmentIndex([('a1', _assignment('e1', datetime(2024, 1, 1)))])
+    assert index.overlap('e1', datetime(2030, 1, 1))[0] == 'a1'
+    assert index.overlap('e1', datetime(2030, 1, 1), exclude_id='a1') is None
+
+
+def test_across_sites_and_time_zones():
+    index = AssignmentIndex([('a1', _assignment('e1', datetime(2024, 1, 1, tzinfo=timezone.utc),
+                                                datetime(2024, 1, 31, tzinfo=timezone.utc), site_id='s2'))])
+    assert index.overlap('e1', datetime(2024, 1, 15))[0] == 'a1'
+
+
+def test_upsert_and_remove():
+    index = AssignmentIndex()
+    index.upsert('a1', _assignment('e1', datetime(2024, 1, 1), datetime(2024, 1, 31)))
+    index.upsert('a1', _assignment('e1', datetime(2024, 3, 1), datetime(2024, 3, 31)))
+    assert index.overlap('e1', datetime(2024, 1, 15), datetime(2024, 1, 20)) is None
+    assert index.overlap('e1', datetime(2024, 1, 15))[0] == 'a1'
+    index.remove('a1')
+    assert index.overlap('e1', datetime(2024, 1, 15)) is None
+
+
+def test_overlap_matches_brute_force():
+    rng = random.Random(7)
+    base = datetime(2024, 1, 1)
+    assignments = []
+    for i in range(300):
+        start = base + timedelta(days=rng.randrange(365))
+        end = None if rng.random() < 0.1 else start + timedelta(days=rng.randrange(60))
+        assignments.append((f'a{i}', _assignment(f'e{rng.randrange(20)}', start, end)))
+    index = AssignmentIndex(assignments)
+    for _ in range(500):
+        query = _assignment(f'e{rng.randrange(20)}', base + timedelta(days=rng.randrange(400)))
+        query['end_date'] = query['start_date'] + timedelta(days=rng.randrange(30))
+        expected = {assignment_id for assignment_id, data in assignments
+                    if data['employee_id'] == query['employee_id'] and _overlaps(data, query)}
+        found = index.overlap(query['employee_id'], query['start_date'], query['end_date'])
+        assert (found[0] in expected) if found else not expected
+
+
+def test_find_conflicts_matches_brute_force():
+    rng = random.Random(11)
+    base = datetime(2024, 1, 1)
+    assignments = []
+    for i in range(200):
+        start = base + timedelta(days=rng.randrange(200))
+        end = None if rng.random() < 0.1 else start + timedelta(days=rng.randrange(30))
+        assignments.append((f'a{i}', _assignment(f'e{rng.randrange(15)}', start, end)))
+    expected = {frozenset((a_id, b_id)) for i, (a_id, a) in enumerate(assignments) for b_id, b in assignments[i + 1:]
+                if a['employee_id'] == b['employee_id'] and _overlaps(a, b)}
+    conflicts = find_conflicts(assignments)
+    assert {frozenset((a_id, b_id)) for a_id, b_id, _ in conflicts} == expected
+    assert len(conflicts) == len(expected)
+
+
+def test_check_employee_sees_writes_from_other_processes(db):
+    assignment_index.invalidate()
+    assignments = db.collection('assignments')
+    assignments.document('a1').set(_assignment('e1', datetime(2024, 1, 1), datetime(2024, 1, 31)))
+    index = assignment_index.get_index(db)
+
+    # Scrieri făcute după construirea indexului (alt proces), înainte de INDEX_TTL
+    assignments.document('a2').set(_assignment('e2', datetime(2024, 1, 1)))
+    assignments.document('a1').delete()
+    assert index.overlap('e2', datetime(2024, 1, 10)) is None
+
+    assert assignment_index.check_employee(db, 'e2', datetime(2024, 1, 10))[0] == 'a2'
+    assert assignment_index.check_employee(db, 'e1', datetime(2024, 1, 10)) is None
+    assert index.overlap('e2', datetime(2024, 1, 10))[0] == 'a2'
+    assignment_index.invalidate()
+
+
+def test_sort_key_mixes_naive_and_aware_dates():
+    assignments = [{'id': 'a', 'start_date': datetime(2024, 2, 1)},
+                   {'id': 'b', 'start_date': datetime(2024, 3, 1, tzinfo=timezone.utc)},
+                   {'id': 'c'}]
+    assert [a['id'] for a in sorted(assignments, key=assignment_index.sort_key)] == ['c', 'a', 'b']
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import pytest
+from firebase_admin import firestore
+
+import audit_archive
+
+TODAY = datetime(2024, 6, 30)
+ENTITIES = ['Employee', 'Site', 'Timesheet']
+ACTIONS = ['create', 'update', 'delete']
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    return str(tmp_path / 'archive')
+
+
+def _seed(db, days=40, per_day=4):
+    entries = {}
+    for day in range(days):
+        for i in range(per_day):
+            doc_id = f'log{day:02d}{i}'
+            entries[doc_id] = {
+                'timestamp': TODAY - timedelta(days=day, hours=3 * i + 1),
+                'actor': f'user{i}@firma.ro',
+                'action': ACTIONS[(day + i) % 3],
+                'entity': ENTITIES[i % 3],
+                'entity_id': f'id{day}',
+                'details': {'hours': {'old': day, 'new': i}}
+            }
+            db.collection('audit_log').document(doc_id).set(entries[doc_id])
+    return entries
+
+
+def _history_query(db, date_from):
+    return db.collection('audit_log').where('timestamp', '>=', date_from)\
+        .order_by('timestamp', direction=firestore.Query.DESCENDING)
+
+
+def _walk(page, page_size):
+    ids, cursor = [], None
+    while True:
+        items, cursor = page(page_size, cursor)
+        ids.extend(item.id for item in items)
+        if cursor is None:
+            return ids
+
+
+def _expected(entries, keep=lambda data: True):
+    return [doc_id for doc_id, data in sorted(entries.items(), key=lambda pair: (pair[1]['timestamp'], pair[0]),
+                                              reverse=True) if keep(data)]
+
+
+def test_archive_round_trip(db, archive_dir):
+    entries = _seed(db)
+    moved = audit_archive.archive(db, retention_days=10, archive_dir=archive_dir, today=TODAY)
+
+    cutoff = datetime(2024, 6, 20)
+    old = {doc_id for doc_id, data in entries.items() if data['timestamp'] < cutoff}
+    assert moved == len(old)
+    assert {doc.id for doc in db.collection('audit_log').stream()} == set(entries) - old
+    assert audit_archive.archive_boundary(archive_dir) == cutoff
+
+    archived = {entry.pop('id'): entry for entry in audit_archive.iter_entries(archive_dir)}
+    assert archived == {doc_id: entries[doc_id] for doc_id in old}
+
+    # A doua rulare nu mai are ce muta și nu mută limita înapoi
+    assert audit_archive.archive(db, retention_days=20, archive_dir=archive_dir, today=TODAY) == 0
+    assert audit_archive.archive_boundary(archive_dir) == cutoff
+
+
+def test_fetch_page_filters_and_cursors(db, archive_dir):
+    entries = _seed(db)
+    audit_archive.archive(db, retention_days=10, archive_dir=archive_dir, today=TODAY)
+    date_from = datetime(2024, 6, 5, 12)
+
+    def page(page_size, cursor):
+        return audit_archive.fetch_page(page_size, cursor=cursor, date_from=date_from, entity='Site',
+                                        archive_dir=archive_dir)
+    expected = _expected(entries, lambda data: data['entity'] == 'Site' and date_from <= data['timestamp']
+                         < datetime(2024, 6, 20))
+    assert _walk(page, 3) == expected
+
+
+def test_history_page_continues_into_archive(db, archive_dir):
+    entries = _seed(db)
+    audit_archive.archive(db, retention_days=10, archive_dir=archive_dir, today=TODAY)
+    date_from = datetime(2024, 6, 1)
+
+    def page(page_size, cursor):
+        return audit_archive.history_page(_history_query(db, date_from), page_size, cursor=cursor,
+                                          date_from=date_from, archive_dir=archive_dir)
+    assert _walk(page, 7) == _expected(entries, lambda data: data['timestamp'] >= date_from)
+
+
+def test_history_page_skips_archive_after_boundary(db, archive_dir):
+    entries = _seed(db)
+    audit_archive.archive(db, retention_days=10, archive_dir=archive_dir, today=TODAY)
+    date_from = datetime(2024, 6, 25)
+
+    def page(page_size, cursor):
+        return audit_archive.history_page(_history_query(db, date_from), page_size, cursor=cursor,
+                                          date_from=date_from, archive_dir=archive_dir)
+    assert _walk(page, 50) == _expected(entries, lambda data: data['timestamp'] >= date_from)
+
+
+def test_interrupted_archive_keeps_history_complete(db, archive_dir, monkeypatch):
+    entries = _seed(db)
+    monkeypatch.setattr(audit_archive, 'READ_PAGE', 10)
+    delete = audit_archive._delete
+    calls = []
+
+    def failing_delete(db, snapshots):
+        calls.append(len(snapshots))
+        if len(calls) == 3:
+            raise RuntimeError("întrerupt")
+        delete(db, snapshots)
+    monkeypatch.setattr(audit_archive, '_delete', failing_delete)
+    with pytest.raises(RuntimeError):
+        audit_archive.archive(db, retention_days=10, archive_dir=archive_dir, today=TODAY)
+
+    # Orice intrare ștearsă din audit_log e înaintea limitei, deci e căutată în arhivă
+    boundary = audit_archive.archive_boundary(archive_dir)
+    assert datetime(2024, 5, 21) < boundary < datetime(2024, 6, 20)
+    assert all(data['timestamp'] < boundary for doc_id, data in entries.items()
+               if not db.collection('audit_log').document(doc_id).get().exists)
+
+    date_from = datetime(2024, 5, 1)
+
+    def page(page_size, cursor):
+        return audit_archive.history_page(_history_query(db, date_from), page_size, cursor=cursor,
+                                          date_from=date_from, archive_dir=archive_dir)
+    assert _walk(page, 9) == _expected(entries, lambda data: data['timestamp'] >= date_from)
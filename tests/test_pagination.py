@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from firebase_admin import firestore
+
+import pagination
+
+START = datetime(2024, 1, 1)
+
+
+def _seed(db, count=23):
+    # Câte trei pontaje pe zi (valori egale ale câmpului de ordonare, departajate după ID)
+    for i in range(count):
+        db.collection('timesheets').document(f't{i:02d}').set({
+            'date': START + timedelta(days=i // 3), 'site_id': f's{i % 3}', 'hours': i % 9
+        })
+
+
+def _query(db, **filters):
+    query = db.collection('timesheets')
+    for field, value in filters.items():
+        query = query.where(field, '==', value)
+    return query.order_by('date', direction=firestore.Query.DESCENDING)
+
+
+def _walk(queries, page_size, predicate=None):
+    pages, cursor = [], None
+    while True:
+        items, cursor = pagination.fetch_page(queries, 'date', page_size, cursor=cursor, predicate=predicate)
+        pages.append([snapshot.id for snapshot in items])
+        if cursor is None:
+            return pages
+
+
+def _expected(db, keep=lambda data: True):
+    docs = [(doc.to_dict()['date'], doc.id) for doc in db.collection('timesheets').stream() if keep(doc.to_dict())]
+    return [doc_id for _, doc_id in sorted(docs, reverse=True)]
+
+
+def test_cursor_pages_cover_every_document_once(db):
+    _seed(db)
+    pages = _walk(_query(db), 5)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == _expected(db)
+
+
+def test_exact_multiple_has_no_empty_last_page(db):
+    _seed(db, count=10)
+    assert [len(page) for page in _walk(_query(db), 5)] == [5, 5]
+
+
+def test_page_cost_is_bounded_by_page_size(db):
+    _seed(db, count=200)
+    _, cursor = pagination.fetch_page(_query(db), 'date', 10)
+    db.reset_stats()
+    pagination.fetch_page(_query(db), 'date', 10, cursor=cursor)
+    assert db.reads <= 11
+
+
+def test_k_way_merge_of_several_queries(db):
+    _seed(db)
+    queries = [_query(db, site_id='s0'), _query(db, site_id='s2')]
+    pages = _walk(queries, 4)
+    assert all(len(page) <= 4 for page in pages)
+    assert sum(pages, []) == _expected(db, lambda data: data['site_id'] in ('s0', 's2'))
+
+
+def test_predicate_scans_until_page_is_full(db):
+    _seed(db)
+    even = lambda snapshot: snapshot.get('hours') % 2 == 0
+    pages = _walk(_query(db), 3, predicate=even)
+    assert sum(pages, []) == _expected(db, lambda data: data['hours'] % 2 == 0)
+
+
+def test_no_queries_means_no_results(db):
+    _seed(db)
+    assert pagination.fetch_page([], 'date', 10) == ([], None)
+
+
+def test_slice_page():
+    items = list(range(7))
+    assert pagination.slice_page(items, 3) == ([0, 1, 2], 3)
+    assert pagination.slice_page(items, 3, 3) == ([3, 4, 5], 6)
+    assert pagination.slice_page(items, 3, 6) == ([6], None)
+    assert pagination.slice_page([], 3) == ([], None)
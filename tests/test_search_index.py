@@ -0,0 +1,91 @@
+import random
+import string
+
+from search_index import TrigramIndex, fold, normalize
+
+RECORDS = {
+    'e1': {'name': 'Ștefan Țăranu', 'email': 'stefan@firma.ro', 'phone': '0722 111 222'},
+    'e2': {'name': 'Ana Stan', 'email': 'ana.stan@firma.ro', 'phone': '+40 733-444-555'},
+    'e3': {'name': 'Ioana Anastasiu', 'email': 'ioana@firma.ro', 'phone': ''},
+    'e4': {'name': 'Ana', 'email': 'ana@exemplu.ro', 'phone': '0744 000 111'},
+    'e5': {'name': 'Mihai Băncilă', 'email': 'mihai@firma.ro', 'phone': None},
+}
+FIELDS = ['name', 'email', 'phone']
+
+
+def _index(records=RECORDS):
+    index = TrigramIndex(FIELDS)
+    for doc_id, record in records.items():
+        index.add(doc_id, record)
+    return index
+
+
+def test_fold_strips_diacritics_case_and_spaces():
+    assert fold('  Ștefan   ŢĂRANU ') == 'stefan taranu'
+    assert fold('Şcoală Îngheţată') == 'scoala inghetata'
+    assert fold(None) == ''
+    assert normalize('phone', '+40 (733) 444-555') == '40733444555'
+    assert normalize('name', '0722 111') == '0722 111'
+
+
+def test_search_ignores_diacritics():
+    index = _index()
+    assert index.search('taranu') == ['e1']
+    assert index.search('ŢĂRAN') == ['e1']
+    assert index.search('banc') == ['e5']
+
+
+def test_relevance_order():
+    # identic > început de valoare > început de cuvânt > oriunde
+    assert _index().search('ana') == ['e4', 'e2', 'e3']
+
+
+def test_short_terms_match_word_starts_only():
+    index = _index()
+    assert set(index.search('an')) == {'e2', 'e3', 'e4'}
+    assert set(index.search('s', fields=['name'])) == {'e1', 'e2'}
+
+
+def test_phone_digits_and_field_restriction():
+    index = _index()
+    assert index.search('733444') == ['e2']
+    assert index.search('firma', fields=['name']) == []
+    assert index.search('') == []
+
+
+def test_reindex_and_remove():
+    index = _index()
+    index.add('e1', {'name': 'Radu Pop'})
+    assert index.search('stefan') == []
+    assert index.search('radu') == ['e1']
+    index.remove('e1')
+    index.remove('missing')
+    assert index.search('radu') == []
+    assert len(index) == len(RECORDS) - 1
+
+
+def test_matches_linear_scan():
+    rng = random.Random(3)
+    words = ['ana', 'anastasia', 'ștefan', 'țăran', 'popescu', 'ionescu', 'stan', 'băncilă', 'mihai']
+    records = {f'r{i}': {'name': ' '.join(rng.sample(words, 2)),
+                         'email': ''.join(rng.choices(string.ascii_lowercase, k=6)) + '@firma.ro',
+                         'phone': ''.join(rng.choices(string.digits, k=10))}
+               for i in range(300)}
+    index = _index(records)
+    for term in ['an', 'ana', 'stef', 'TARAN', 'escu', 'firma', '12', '345', 'xyz']:
+        for limit in (None, 5):
+            found = index.search(term, limit=limit)
+            expected = {doc_id for doc_id, record in records.items()
+                        for field in FIELDS if _matches(normalize(field, record[field]), normalize(field, term))}
+            assert set(found) <= expected
+            assert len(found) == (len(expected) if limit is None else min(limit, len(expected)))
+            if limit is not None:
+                assert found == index.search(term)[:limit]
+
+
+def _matches(text, term):
+    if not term:
+        return False
+    if len(term) >= 3:
+        return term in text
+    return any(text.startswith(term, i) for i in range(len(text)) if i == 0 or not text[i - 1].isalnum())
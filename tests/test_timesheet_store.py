@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import aggregations
+import rollups
+from timesheet_store import DUPLICATES_COLLECTION, create_timesheet, migrate, timesheet_id
+
+DAY = datetime(2024, 3, 4)
+
+
+def _timesheet(employee_id='e1', day=DAY, hours=8):
+    return {'employee_id': employee_id, 'employee_name': 'Ion', 'site_id': 's1', 'site_name': 'Șantier',
+            'date': day, 'hours': hours, 'status': 'present'}
+
+
+def test_timesheet_id_is_deterministic():
+    assert timesheet_id('e1', DAY) == 'e1_20240304'
+
+
+def test_create_if_absent(db):
+    ref = create_timesheet(db, _timesheet())
+    assert ref.id == 'e1_20240304'
+    assert create_timesheet(db, _timesheet(hours=4)) is None
+
+    assert db.collection('timesheets').document(ref.id).get().to_dict()['hours'] == 8
+    # Al doilea apel nu a aplicat nici contoarele, nici rollup-urile
+    assert aggregations.read_counter(db, 'timesheets', 'total') == 1
+    assert aggregations.read_counter(db, 'timesheets', 'hours') == 8
+    rollup = db.collection(rollups.ROLLUPS_COLLECTION).document(
+        rollups.rollup_id('employee', 'e1', 'day', '2024-03-04')).get().to_dict()
+    assert rollup['hours'] == 8
+
+
+def test_migrate_moves_random_ids_and_duplicates(db):
+    collection = db.collection('timesheets')
+    collection.document('random1').set(_timesheet(hours=8))
+    collection.document('random2').set(_timesheet(hours=6))
+    collection.document('random3').set(_timesheet('e2', hours=4))
+    collection.document('e3_20240304').set(_timesheet('e3'))
+    collection.document('broken').set({'employee_id': 'e4'})
+    aggregations.bump_counter(db, 'timesheets', total=5, hours=26)
+
+    assert migrate(db, dry_run=True) == {'scanned': 5, 'migrated': 2, 'duplicates': 1, 'skipped': 1}
+    assert collection.document('random1').get().exists
+
+    stats = migrate(db, page_size=2)
+    assert stats == {'scanned': 5, 'migrated': 2, 'duplicates': 1, 'skipped': 1}
+    ids = {doc.id for doc in collection.stream()}
+    assert ids == {'e1_20240304', 'e2_20240304', 'e3_20240304', 'broken'}
+    duplicates = {doc.id: doc.to_dict() for doc in db.collection(DUPLICATES_COLLECTION).stream()}
+    assert [data['duplicate_of'] for data in duplicates.values()] == ['e1_20240304']
+    assert aggregations.read_counter(db, 'timesheets', 'total') == 4
+    kept = collection.document('e1_20240304').get().to_dict()['hours']
+    assert aggregations.read_counter(db, 'timesheets', 'hours') == 26 - (14 - kept)
+
+    assert migrate(db) == {'scanned': 4, 'migrated': 0, 'duplicates': 0, 'skipped': 1}
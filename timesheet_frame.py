@@ -0,0 +1,137 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Pontajele unei interogări convertite o singură dată într-un DataFrame tipizat;
+# statisticile, agregările și absențele rapoartelor se calculează vectorizat.
+ABSENCE_STATUSES = ['absent', 'medical', 'leave']
+ABSENCE_LABELS = {'absent': 'Absent', 'medical': 'Concediu Medical', 'leave': 'Concediu'}
+TEXT_FIELDS = ['employee_id', 'employee_name', 'site_id', 'site_name', 'status', 'note', 'created_by']
+CATEGORY_FIELDS = ['employee_id', 'employee_name', 'site_id', 'site_name', 'status', 'created_by']
+DAY_NAMES = ['Luni', 'Marți', 'Miercuri', 'Joi', 'Vineri', 'Sâmbătă', 'Duminică']
+STATUS_EMOJI = {'present': '✅', 'absent': '❌', 'medical': '🏥', 'leave': '🏖️', 'remote': '💻'}
+STATUS_COLORS = {'✅': '#d1fae5', '💻': '#dbeafe', '❌': '#fee2e2', '🏥': '#fde68a', '🏖️': '#e9d5ff', '-': '#fff3cd'}
+
+
+def from_records(records, ids=None):
+    """DataFrame tipizat din dicționare de pontaj (o singură trecere prin date)"""
+    columns = {field: [] for field in TEXT_FIELDS}
+    dates, hours = [], []
+    for data in records:
+        dates.append(data.get('date'))
+        hours.append(data.get('hours', 0) or 0)
+        for field in TEXT_FIELDS:
+            columns[field].append(data.get(field) or ('' if field == 'note' else 'N/A'))
+
+    dates = pd.to_datetime(pd.Series(dates, dtype=object), errors='coerce')
+    if dates.dt.tz is not None:
+        # Firestore returnează datele în UTC; se păstrează ora locală a înregistrării, fără fus orar
+        dates = dates.dt.tz_localize(None)
+    df = pd.DataFrame({
+        'date': dates,
+        'hours': np.asarray(hours, dtype=np.float32),
+        **{field: pd.Categorical(columns[field]) if field in CATEGORY_FIELDS else columns[field]
+           for field in TEXT_FIELDS}
+    })
+    if ids is not None:
+        df.index = pd.Index(ids, name='id')
+    return df
+
+
+def from_snapshots(snapshots):
+    """DataFrame din documente Firestore, apelând `to_dict()` o singură dată per document"""
+    ids, records = [], []
+    for snapshot in snapshots:
+        ids.append(snapshot.id)
+        records.append(snapshot.to_dict())
+    return from_records(records, ids=ids)
+
+
+def load(query):
+    """Rulează interogarea și încarcă rezultatul într-un DataFrame"""
+    return from_snapshots(query.stream())
+
+
+def summary(df):
+    """Ore totale, zile prezent, absențe, angajați distincți și zile lucrate"""
+    status = df['status']
+    return {
+        'total_hours': float(df['hours'].sum()),
+        'present': int((status == 'present').sum()),
+        'absences': int(status.isin(ABSENCE_STATUSES).sum()),
+        'employees': int(df['employee_id'].nunique()),
+        'working_days': int(df['date'].dropna().dt.normalize().nunique())
+    }
+
+
+def table(df):
+    """Tabelul detaliat (Data, Angajat, Șantier, Ore, Status, Observații) ca în export"""
+    return pd.DataFrame({
+        'date': df['date'].dt.strftime('%d.%m.%Y').fillna('N/A'),
+        'employee_name': df['employee_name'].astype(str),
+        'site_name': df['site_name'].astype(str),
+        'hours': df['hours'].astype(float),
+        'status': df['status'].astype(str),
+        'note': df['note']
+    }).reset_index(drop=True)
+
+
+def aggregates(df):
+    """Total ore pe Angajat × Șantier × Status"""
+    grouped = df.groupby(['employee_name', 'site_name', 'status'], observed=True, sort=False)['hours'].sum()
+    result = grouped.reset_index().rename(columns={'employee_name': 'employee', 'site_name': 'site'})
+    for column in ['employee', 'site', 'status']:
+        result[column] = result[column].astype(str)
+    result['hours'] = result['hours'].astype(float)
+    return result
+
+
+def absences(df):
+    """Număr de zile de absență pe angajat și tip"""
+    absent = df[df['status'].isin(ABSENCE_STATUSES)]
+    grouped = absent.groupby(['employee_name', 'status'], observed=True, sort=False).size()
+    result = grouped.reset_index(name='count').rename(columns={'employee_name': 'employee', 'status': 'type'})
+    result['employee'] = result['employee'].astype(str)
+    result['type'] = result['type'].astype(str).map(ABSENCE_LABELS)
+    return result
+
+
+def daily_hours(df):
+    """Ore totale pe zi, ordonate cronologic (coloanele Data, Ore)"""
+    grouped = df['hours'].groupby(df['date'].dt.normalize()).sum().sort_index()
+    return pd.DataFrame({'Data': grouped.index.strftime('%Y-%m-%d'), 'Ore': grouped.to_numpy(dtype=float)})
+
+
+def version(df):
+    """Amprenta conținutului (folosită drept versiune a datelor în cheile de export)"""
+    hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+def weekly_grid(df, employees, week_start):
+    """Grila săptămânală angajat × zi ('✅ 8h', '-' fără pontaj), cu rândurile în ordinea din `employees`.
+
+    Celulele sunt indexate după (employee_id, zi) printr-un singur pivot, fără căutări per celulă.
+    Pontajele duplicate pe aceeași zi (ID-uri vechi, nemigrate) păstrează primul rând, ca înainte.
+    """
+    days = pd.date_range(week_start, periods=7, freq='D')
+    columns = [f"{DAY_NAMES[i]} {day.strftime('%d.%m')}" for i, day in enumerate(days)]
+    if df.empty:
+        cells = pd.DataFrame(index=pd.Index([], name='employee_id'), columns=days)
+    else:
+        emoji = df['status'].astype(str).map(STATUS_EMOJI).fillna('❓')
+        hours = df['hours'].astype(float).map('{:g}h'.format)
+        cells = pd.DataFrame({
+            'employee_id': df['employee_id'].astype(str).to_numpy(),
+            'day': df['date'].dt.normalize().to_numpy(),
+            'cell': (emoji + ' ' + hours).to_numpy()
+        }).drop_duplicates(['employee_id', 'day']).pivot(index='employee_id', columns='day', values='cell')
+    grid = cells.reindex(index=list(employees), columns=days).fillna('-')
+    grid.columns = columns
+    grid.index = pd.Index([employees[emp_id] for emp_id in employees], name='Angajat')
+    return grid
+
+
+def style_weekly_grid(grid):
+    """Culoarea de fundal a fiecărei celule după status"""
+    return grid.style.map(lambda cell: f"background-color: {STATUS_COLORS.get(cell.split(' ')[0], '#f0f0f0')}")
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from firebase_admin import firestore
+import aggregations
+
+# Filtrele pe angajat/șantier/status devin clauze indexate pe `employee_id`, `site_id`, `status`
+# (== pentru o valoare, `in` pentru mai multe), în loc de filtrare în Python pe tot intervalul.
+# Cea mai lungă listă de valori e împărțită în bucăți `in` de max 30; celelalte liste cu mai multe
+# valori se desfac în interogări cu egalitate. Interogările rezultate rulează concurent.
+# Indexurile compuse necesare sunt în firestore.indexes.json.
+IN_LIMIT = 30
+FANOUT_WORKERS = 8
+FILTER_FIELDS = ['employee_id', 'site_id', 'status']
+ABSENCE_STATUSES = ['absent', 'medical', 'leave']
+
+
+def build_queries(db, date_from=None, date_to=None, employee_ids=None, site_ids=None, statuses=None,
+                  descending=False):
+    """Interogările (disjuncte) care acoperă exact filtrele date.
+
+    None nu filtrează; o listă goală nu potrivește nimic (de ex. un nume fără ID în replică),
+    caz în care nu se întoarce nicio interogare.
+    """
+    values_by_field = dict(zip(FILTER_FIELDS, [employee_ids, site_ids, statuses]))
+    if any(values is not None and len(values) == 0 for values in values_by_field.values()):
+        return []
+    filters = {field: sorted(set(values)) for field, values in values_by_field.items() if values is not None}
+
+    base = db.collection('timesheets')
+    if date_from is not None:
+        base = base.where('date', '>=', date_from)
+    if date_to is not None:
+        base = base.where('date', '<=', date_to)
+
+    in_field = max((f for f in filters if len(filters[f]) > 1), key=lambda f: len(filters[f]), default=None)
+    equality_fields = [f for f in filters if f != in_field]
+    in_chunks = [filters[in_field][i:i + IN_LIMIT] for i in range(0, len(filters[in_field]), IN_LIMIT)] \
+        if in_field else [None]
+
+    queries = []
+    for values in product(*(filters[f] for f in equality_fields)):
+        for chunk in in_chunks:
+            query = base
+            for field, value in zip(equality_fields, values):
+                query = query.where(field, '==', value)
+            if chunk is not None:
+                query = query.where(in_field, 'in', chunk)
+            if date_from is not None or date_to is not None or descending:
+                query = query.order_by('date', direction=firestore.Query.DESCENDING if descending
+                                       else firestore.Query.ASCENDING)
+            queries.append(query)
+    return queries
+
+
+def _date_key(snapshot):
+    return snapshot.get('date')
+
+
+def fetch(queries, descending=False, limit=None):
+    """Rulează interogările concurent și le unește, ordonat după dată"""
+    if not queries:
+        return []
+    if len(queries) == 1:
+        results = list(queries[0].stream())
+    else:
+        with ThreadPoolExecutor(max_workers=min(FANOUT_WORKERS, len(queries))) as executor:
+            results = [snapshot for page in executor.map(lambda q: list(q.stream()), queries) for snapshot in page]
+        results.sort(key=_date_key, reverse=descending)
+    return results[:limit] if limit is not None else results
+
+
+def stream(queries):
+    """Parcurge interogările secvențial, fără a materializa rezultatele (pentru exporturi mari)"""
+    for query in queries:
+        yield from query.stream()
+
+
+def ids_for_names(reference, names):
+    """ID-urile entităților dintr-o hartă {id: nume} care au unul din numele date"""
+    names = set(names or [])
+    return [entity_id for entity_id, name in reference.items() if name in names]
+
+
+def totals(db, statuses=None, **filters):
+    """Număr pontaje, ore, zile prezent și absențe pentru filtre, prin interogări de agregare"""
+    def count(status_filter):
+        if status_filter is not None and not status_filter:
+            return 0
+        return sum(aggregations.count(db, q) for q in build_queries(db, statuses=status_filter, **filters))
+
+    def restrict(values):
+        return [v for v in values if v in statuses] if statuses else values
+
+    return {
+        'count': count(statuses),
+        'hours': sum(aggregations.sum_field(db, q, 'hours') for q in build_queries(db, statuses=statuses, **filters)),
+        'present': count(restrict(['present'])),
+        'absences': count(restrict(ABSENCE_STATUSES))
+    }
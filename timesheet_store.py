@@ -0,0 +1,113 @@
+import argparse
+from google.api_core.exceptions import AlreadyExists
+import aggregations
+import rollups
+
+# Pontajele au ID determinist `<employee_id>_<YYYYMMDD>`: un singur pontaj per angajat și zi.
+# Detectarea duplicatelor și reîncercările devin o singură citire/scriere pe document.
+DUPLICATES_COLLECTION = 'timesheets_duplicates'
+BATCH_OPS = 480
+
+
+def timesheet_id(employee_id, day):
+    """ID-ul determinist al pontajului unui angajat într-o zi"""
+    return f"{employee_id}_{day.strftime('%Y%m%d')}"
+
+
+def timesheet_ref(db, employee_id, day):
+    return db.collection('timesheets').document(timesheet_id(employee_id, day))
+
+
+def create_timesheet(db, timesheet_data):
+    """Creează pontajul dacă nu există (plus rollup-uri și contoare, atomic).
+
+    Returnează referința documentului sau None dacă angajatul are deja pontaj în ziua respectivă.
+    """
+    doc_ref = timesheet_ref(db, timesheet_data['employee_id'], timesheet_data['date'])
+    batch = db.batch()
+    batch.create(doc_ref, timesheet_data)
+    rollups.apply_deltas(batch, db, rollups.rollup_deltas([timesheet_data]))
+    aggregations.bump_counter(db, 'timesheets', writer=batch, total=1, hours=timesheet_data.get('hours', 0))
+    try:
+        batch.commit()
+    except AlreadyExists:
+        return None
+    return doc_ref
+
+
+def migrate(db, page_size=300, dry_run=False):
+    """Rescrie pontajele cu ID aleator sub ID-ul determinist, în batch-uri.
+
+    Duplicatele (același angajat și zi) sunt mutate în `timesheets_duplicates` pentru verificare,
+    iar rollup-urile și contoarele sunt corectate corespunzător.
+    """
+    collection = db.collection('timesheets')
+    duplicates = db.collection(DUPLICATES_COLLECTION)
+    stats = {'scanned': 0, 'migrated': 0, 'duplicates': 0, 'skipped': 0}
+    claimed = set()
+    last_id = None
+
+    while True:
+        query = collection.order_by('__name__').limit(page_size)
+        if last_id is not None:
+            query = query.start_after([last_id])
+        page = list(query.stream())
+        if not page:
+            break
+        last_id = page[-1].id
+        stats['scanned'] += len(page)
+
+        moves = []
+        for doc in page:
+            data = doc.to_dict()
+            if not data.get('employee_id') or not hasattr(data.get('date'), 'strftime'):
+                stats['skipped'] += 1
+                continue
+            target_id = timesheet_id(data['employee_id'], data['date'])
+            if target_id == doc.id:
+                claimed.add(target_id)
+                continue
+            moves.append((doc, data, target_id))
+
+        targets = [collection.document(target_id) for _, _, target_id in moves]
+        existing = {snap.id for snap in db.get_all(targets) if snap.exists} if targets else set()
+
+        batch, ops = db.batch(), 0
+        for doc, data, target_id in moves:
+            if target_id in existing or target_id in claimed:
+                stats['duplicates'] += 1
+                if dry_run:
+                    continue
+                deltas = rollups.rollup_deltas([data], sign=-1)
+                batch.set(duplicates.document(doc.id), dict(data, duplicate_of=target_id))
+                batch.delete(doc.reference)
+                rollups.apply_deltas(batch, db, deltas)
+                aggregations.bump_counter(db, 'timesheets', writer=batch,
+                                          total=-1, hours=-data.get('hours', 0))
+                ops += 3 + len(deltas)
+            else:
+                claimed.add(target_id)
+                stats['migrated'] += 1
+                if dry_run:
+                    continue
+                batch.create(collection.document(target_id), data)
+                batch.delete(doc.reference)
+                ops += 2
+            if ops >= BATCH_OPS:
+                batch.commit()
+                batch, ops = db.batch(), 0
+        if ops:
+            batch.commit()
+
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migrare pontaje la ID-uri deterministe")
+    parser.add_argument('command', choices=['migrate'])
+    parser.add_argument('--page-size', type=int, default=300)
+    parser.add_argument('--dry-run', action='store_true', help="Doar raportează, fără scrieri")
+    args = parser.parse_args()
+
+    from backend import get_db
+    print(migrate(get_db(), page_size=args.page_size, dry_run=args.dry_run))
@@ -1,89 +1,69 @@
 import streamlit as st
-from firebase_admin import firestore
 import pandas as pd
 from datetime import datetime, timedelta
+from backend import get_db
+from audit_log import log_audit
+from sections import section_nav, section_timing
+from reference_data import get_employees, get_sites
+import aggregations
+from timesheet_store import create_timesheet
+import bulk_timesheets
+import timesheet_query
+import pagination
+import timesheet_frame
 
 if 'user' not in st.session_state or st.session_state.user is None:
     st.warning("⚠️ Vă rugăm să vă autentificați")
     st.stop()
 
-db = firestore.client()
-
-def log_audit(actor, action, entity, entity_id, details):
-    db.collection('audit_log').add({
-        'timestamp': datetime.now(),
-        'actor': actor,
-        'action': action,
-        'entity': entity,
-        'entity_id': entity_id,
-        'details': details
-    })
+db = get_db()
 
 st.title("⏰ Gestionare Pontaje")
 
-tab1, tab2, tab3 = st.tabs(["📅 Pontaj Zilnic", "📊 Pontaj Săptămânal", "📋 Toate Pontajele"])
-
-# Helper functions
-def get_employees():
-    employees = list(db.collection('employees').where('active', '==', True).stream())
-    return {emp.id: emp.to_dict()['full_name'] for emp in employees}
+TABS = ["📅 Pontaj Zilnic", "📊 Pontaj Săptămânal", "📋 Toate Pontajele"]
+active_tab = section_nav('timesheets_section', TABS)
 
-def get_sites():
-    sites = list(db.collection('sites').where('active', '==', True).stream())
-    return {site.id: site.to_dict()['name'] for site in sites}
-
-with tab1:
+if active_tab == TABS[0]:
     st.subheader("📅 Înregistrare Pontaj Zilnic")
     
-    employees = get_employees()
-    sites = get_sites()
+    employees = get_employees(db)
+    sites = get_sites(db)
     
+    # Fără st.stop(): restul paginii (inclusiv section_timing) trebuie să ruleze
     if not employees:
         st.error("❌ Nu există angajați activi. Adăugați angajați mai întâi.")
-        st.stop()
-    
-    if not sites:
+    elif not sites:
         st.error("❌ Nu există șantiere active. Adăugați șantiere mai întâi.")
-        st.stop()
-    
-    with st.form("daily_timesheet"):
-        col1, col2 = st.columns(2)
+    else:
+        with st.form("daily_timesheet"):
+            col1, col2 = st.columns(2)
         
-        with col1:
-            selected_date = st.date_input("Data *", value=datetime.now())
-            selected_employee = st.selectbox("Angajat *", options=list(employees.keys()), 
-                                            format_func=lambda x: employees[x])
+            with col1:
+                selected_date = st.date_input("Data *", value=datetime.now())
+                selected_employee = st.selectbox("Angajat *", options=list(employees.keys()), 
+                                                format_func=lambda x: employees[x])
         
-        with col2:
-            selected_site = st.selectbox("Șantier *", options=list(sites.keys()),
-                                        format_func=lambda x: sites[x])
-            hours = st.number_input("Ore Lucrate", min_value=0.0, max_value=24.0, 
-                                   value=8.0, step=0.5)
+            with col2:
+                selected_site = st.selectbox("Șantier *", options=list(sites.keys()),
+                                            format_func=lambda x: sites[x])
+                hours = st.number_input("Ore Lucrate", min_value=0.0, max_value=24.0, 
+                                       value=8.0, step=0.5)
         
-        status = st.selectbox("Status", 
-                             ["present", "absent", "medical", "leave", "remote"],
-                             format_func=lambda x: {
-                                 "present": "Prezent",
-                                 "absent": "Absent",
-                                 "medical": "Concediu Medical",
-                                 "leave": "Concediu",
-                                 "remote": "Lucru Remote"
-                             }[x])
+            status = st.selectbox("Status", 
+                                 ["present", "absent", "medical", "leave", "remote"],
+                                 format_func=lambda x: {
+                                     "present": "Prezent",
+                                     "absent": "Absent",
+                                     "medical": "Concediu Medical",
+                                     "leave": "Concediu",
+                                     "remote": "Lucru Remote"
+                                 }[x])
         
-        note = st.text_area("Observații (opțional)", placeholder="Adăugați observații...")
+            note = st.text_area("Observații (opțional)", placeholder="Adăugați observații...")
         
-        submit = st.form_submit_button("💾 Salvează Pontaj", use_container_width=True, type="primary")
+            submit = st.form_submit_button("💾 Salvează Pontaj", use_container_width=True, type="primary")
         
-        if submit:
-            # Verificare duplicat
-            existing = list(db.collection('timesheets')\
-                          .where('date', '==', selected_date)\
-                          .where('employee_id', '==', selected_employee)\
-                          .limit(1).stream())
-            
-            if existing:
-                st.error(f"❌ Există deja un pontaj pentru {employees[selected_employee]} la data {selected_date}!")
-            else:
+            if submit:
                 timesheet_data = {
                     'date': datetime.combine(selected_date, datetime.min.time()),
                     'employee_id': selected_employee,
@@ -96,21 +76,25 @@ with tab1:
                     'created_at': datetime.now(),
                     'created_by': st.session_state.user_email
                 }
+            
+                # ID determinist angajat+zi: create eșuează atomic dacă pontajul există deja
+                doc_ref = create_timesheet(db, timesheet_data)
+            
+                if doc_ref is None:
+                    st.error(f"❌ Există deja un pontaj pentru {employees[selected_employee]} la data {selected_date}!")
+                else:
+                    log_audit(
+                        st.session_state.user_email,
+                        'create',
+                        'Timesheet',
+                        doc_ref.id,
+                        timesheet_data
+                    )
                 
-                doc_ref = db.collection('timesheets').add(timesheet_data)
-                
-                log_audit(
-                    st.session_state.user_email,
-                    'create',
-                    'Timesheet',
-                    doc_ref[1].id,
-                    timesheet_data
-                )
-                
-                st.success(f"✅ Pontaj salvat pentru {employees[selected_employee]}!")
-                st.balloons()
+                    st.success(f"✅ Pontaj salvat pentru {employees[selected_employee]}!")
+                    st.balloons()
 
-with tab2:
+elif active_tab == TABS[1]:
     st.subheader("📊 Vizualizare Săptămânală")
     
     # Selectare săptămână
@@ -121,63 +105,34 @@ with tab2:
     
     st.info(f"📅 Săptămâna: {week_start.strftime('%d.%m.%Y')} - {week_end.strftime('%d.%m.%Y')}")
     
-    # Obținere pontaje pentru săptămână
-    timesheets = list(db.collection('timesheets')\
-                     .where('date', '>=', week_start)\
-                     .where('date', '<=', week_end)\
-                     .stream())
+    # Obținere pontaje pentru săptămână (o singură conversie în DataFrame)
+    week_frame = timesheet_frame.load(db.collection('timesheets')\
+                                      .where('date', '>=', week_start)\
+                                      .where('date', '<=', week_end))
     
-    if timesheets:
-        # Grupare pe angajat și zi
-        employees = get_employees()
+    if not week_frame.empty:
+        employees = get_employees(db)
+        sites = get_sites(db)
         
-        # Creare grid săptămânal
-        days = ['Luni', 'Marți', 'Miercuri', 'Joi', 'Vineri', 'Sâmbătă', 'Duminică']
+        # Paginare pe șantier (angajații cu pontaje pe șantier în săptămâna selectată) și pe pagini
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            grid_site = st.selectbox("Șantier", ["Toate"] + list(sites), key='weekly_grid_site',
+                                     format_func=lambda site_id: sites.get(site_id, site_id))
+        if grid_site != "Toate":
+            site_employees = set(week_frame.loc[week_frame['site_id'] == grid_site, 'employee_id'].astype(str))
+            employees = {emp_id: name for emp_id, name in employees.items() if emp_id in site_employees}
+        with col2:
+            grid_page_size = st.selectbox("Angajați pe pagină", [25, 50, 100, 200], index=1, key='weekly_grid_page_size')
+        page_count = max(1, -(-len(employees) // grid_page_size))
+        with col3:
+            grid_page = st.selectbox("Pagina", range(1, page_count + 1), key='weekly_grid_page')
         
-        for emp_id, emp_name in employees.items():
-            st.markdown(f"### 👤 {emp_name}")
-            
-            cols = st.columns(7)
-            
-            for i, day in enumerate(days):
-                day_date = week_start + timedelta(days=i)
-                
-                # Caută pontaj pentru ziua respectivă
-                day_timesheet = next((ts.to_dict() for ts in timesheets 
-                                    if ts.to_dict()['employee_id'] == emp_id and 
-                                    ts.to_dict()['date'].date() == day_date.date()), None)
-                
-                with cols[i]:
-                    st.markdown(f"**{day}**<br>{day_date.strftime('%d.%m')}", unsafe_allow_html=True)
-                    
-                    if day_timesheet:
-                        hours = day_timesheet['hours']
-                        status = day_timesheet['status']
-                        site = day_timesheet.get('site_name', 'N/A')
-                        
-                        status_emoji = {
-                            'present': '✅',
-                            'absent': '❌',
-                            'medical': '🏥',
-                            'leave': '🏖️',
-                            'remote': '💻'
-                        }.get(status, '❓')
-                        
-                        st.markdown(f"""
-                        <div style='background: #f0f0f0; padding: 10px; border-radius: 5px; text-align: center;'>
-                            <div style='font-size: 24px;'>{status_emoji}</div>
-                            <div style='font-weight: bold;'>{hours}h</div>
-                            <div style='font-size: 10px; opacity: 0.7;'>{site[:15]}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown("""
-                        <div style='background: #fff3cd; padding: 10px; border-radius: 5px; text-align: center;'>
-                            <div style='font-size: 16px; opacity: 0.5;'>-</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            st.markdown("---")
+        page_ids = list(employees)[(grid_page - 1) * grid_page_size:grid_page * grid_page_size]
+        grid = timesheet_frame.weekly_grid(week_frame, {emp_id: employees[emp_id] for emp_id in page_ids}, week_start)
+        st.dataframe(timesheet_frame.style_weekly_grid(grid), use_container_width=True,
+                     height=min(38 + 35 * len(grid), 720))
+        st.caption(f"{len(employees)} angajați, pagina {grid_page} din {page_count}")
     else:
         st.warning("⚠️ Nu există pontaje pentru această săptămână")
     
@@ -187,7 +142,10 @@ with tab2:
     
     with col1:
         if st.button("📋 Completează Săptămână", use_container_width=True):
-            st.info("Funcție în dezvoltare - va completa automat 8h/zi prezent")
+            with st.spinner("Se completează pontajele..."):
+                created, skipped = bulk_timesheets.fill_week(db, week_start, st.session_state.user_email)
+            st.session_state.bulk_result = f"✅ {created} pontaje create (8h/zi prezent), {skipped} existente omise"
+            st.rerun()
     
     with col2:
         if st.button("📥 Export Săptămână Excel", use_container_width=True):
@@ -195,60 +153,67 @@ with tab2:
     
     with col3:
         if st.button("🔄 Duplică Săptămâna Anterioară", use_container_width=True):
-            st.info("Funcție în dezvoltare")
+            with st.spinner("Se duplică săptămâna anterioară..."):
+                created, skipped = bulk_timesheets.duplicate_period(
+                    db, week_start - timedelta(days=7), week_start, 7,
+                    st.session_state.user_email, 'duplicate_week'
+                )
+            st.session_state.bulk_result = f"✅ {created} pontaje copiate, {skipped} existente omise"
+            st.rerun()
+    
+    if st.session_state.get('bulk_result'):
+        st.success(st.session_state.pop('bulk_result'))
 
-with tab3:
+elif active_tab == TABS[2]:
     st.subheader("📋 Toate Pontajele")
     
     # Filtre
     col1, col2, col3, col4 = st.columns(4)
     
+    employees = get_employees(db)
+    sites = get_sites(db)
+    
     with col1:
-        filter_employee = st.selectbox("Angajat", ["Toți"] + list(get_employees().values()))
+        filter_employee = st.selectbox("Angajat", ["Toți"] + list(employees.values()))
     with col2:
-        filter_site = st.selectbox("Șantier", ["Toate"] + list(get_sites().values()))
+        filter_site = st.selectbox("Șantier", ["Toate"] + list(sites.values()))
     with col3:
         filter_status = st.selectbox("Status", ["Toate", "Prezent", "Absent", "Medical", "Concediu", "Remote"])
     with col4:
         date_from = st.date_input("De la data", value=datetime.now() - timedelta(days=30))
     
-    # Obținere pontaje
-    timesheets_ref = db.collection('timesheets')
+    status_map = {
+        "Prezent": "present",
+        "Absent": "absent",
+        "Medical": "medical",
+        "Concediu": "leave",
+        "Remote": "remote"
+    }
+    
+    page_size = pagination.page_size_select('timesheets_all')
     
+    # Obținere pontaje: filtrele devin clauze indexate pe employee_id/site_id/status
     date_from_dt = datetime.combine(date_from, datetime.min.time())
-    timesheets_ref = timesheets_ref.where('date', '>=', date_from_dt)
+    query_filters = {
+        'date_from': date_from_dt,
+        'employee_ids': timesheet_query.ids_for_names(employees, [filter_employee]) if filter_employee != "Toți" else None,
+        'site_ids': timesheet_query.ids_for_names(sites, [filter_site]) if filter_site != "Toate" else None,
+        'statuses': [status_map[filter_status]] if filter_status != "Toate" else None
+    }
+    queries = timesheet_query.build_queries(db, descending=True, **query_filters)
     
-    all_timesheets = list(timesheets_ref.order_by('date', direction=firestore.Query.DESCENDING).stream())
+    # O pagină la un moment dat (cursor pe data + ID), navigare înainte/înapoi
+    pager = pagination.pager('timesheets_all', (filter_employee, filter_site, filter_status, date_from, page_size))
+    page, next_cursor = pagination.fetch_page(queries, 'date', page_size, cursor=pager['cursors'][-1])
     
-    # Filtrare
-    filtered_timesheets = []
-    for ts in all_timesheets:
-        data = ts.to_dict()
-        data['id'] = ts.id
-        
-        if filter_employee != "Toți" and data.get('employee_name') != filter_employee:
-            continue
-        if filter_site != "Toate" and data.get('site_name') != filter_site:
-            continue
-        
-        status_map = {
-            "Prezent": "present",
-            "Absent": "absent",
-            "Medical": "medical",
-            "Concediu": "leave",
-            "Remote": "remote"
-        }
-        if filter_status != "Toate" and data.get('status') != status_map.get(filter_status):
-            continue
-        
-        filtered_timesheets.append(data)
-    
-    if filtered_timesheets:
-        st.success(f"✅ Găsite {len(filtered_timesheets)} pontaje")
+    if page:
+        totals = timesheet_query.totals(db, **query_filters)
+        st.success(f"✅ Găsite {totals['count']} pontaje")
         
         # Afișare ca tabel
         df_data = []
-        for ts in filtered_timesheets:
+        for ts in page:
+            ts = ts.to_dict()
             df_data.append({
                 'Data': ts['date'].strftime('%d.%m.%Y') if isinstance(ts['date'], datetime) else 'N/A',
                 'Angajat': ts.get('employee_name', 'N/A'),
@@ -266,32 +231,34 @@ with tab3:
         
         df = pd.DataFrame(df_data)
         st.dataframe(df, use_container_width=True, hide_index=True)
+        pagination.page_nav('timesheets_all', pager, next_cursor)
         
-        # Statistici
+        # Statistici (agregări pe toate pontajele filtrate, nu doar pe pagina curentă)
         st.markdown("---")
         st.subheader("📊 Statistici")
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            total_hours = sum(ts.get('hours', 0) for ts in filtered_timesheets)
-            st.metric("Ore Totale", f"{total_hours:.0f}h")
+            st.metric("Ore Totale", f"{totals['hours']:.0f}h")
         with col2:
-            present_count = len([ts for ts in filtered_timesheets if ts.get('status') == 'present'])
-            st.metric("Zile Prezent", present_count)
+            st.metric("Zile Prezent", totals['present'])
         with col3:
-            absent_count = len([ts for ts in filtered_timesheets if ts.get('status') in ['absent', 'medical', 'leave']])
-            st.metric("Absențe", absent_count)
+            st.metric("Absențe", totals['absences'])
         with col4:
-            avg_hours = total_hours / len(filtered_timesheets) if filtered_timesheets else 0
+            avg_hours = totals['hours'] / totals['count'] if totals['count'] else 0
             st.metric("Medie Ore/Zi", f"{avg_hours:.1f}h")
     else:
         st.warning("⚠️ Nu s-au găsit pontaje conform filtrelor")
+        if len(pager['cursors']) > 1:
+            pagination.page_nav('timesheets_all', pager, None)
+
+section_timing('timesheets_section', active_tab)
 
 # Footer statistici generale
 st.markdown("---")
-total_timesheets = len(list(db.collection('timesheets').stream()))
+total_timesheets = aggregations.count(db, db.collection('timesheets'), counter=('timesheets', 'total'))
 this_week_start = datetime.now() - timedelta(days=datetime.now().weekday())
-this_week_timesheets = len(list(db.collection('timesheets').where('date', '>=', this_week_start).stream()))
+this_week_timesheets = aggregations.count(db, db.collection('timesheets').where('date', '>=', this_week_start))
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -299,5 +266,5 @@ with col1:
 with col2:
     st.metric("📅 Pontaje Săptămâna Curentă", this_week_timesheets)
 with col3:
-    total_hours_all = sum(ts.to_dict().get('hours', 0) for ts in db.collection('timesheets').stream())
+    total_hours_all = aggregations.sum_field(db, db.collection('timesheets'), 'hours', counter=('timesheets', 'hours'))
     st.metric("⏰ Total Ore Lucrate", f"{total_hours_all:.0f}h")